@@ -28,16 +28,131 @@ class Settings(BaseSettings):
     whisper_compute_type: str = "int8"  # int8, float16, float32
     whisper_chunk_length_s: int = 10  # max segment length for chunked transcribe
 
+    # Whisper tiers: route each utterance to a faster or more accurate model by load
+    whisper_tiers: list[str] = []  # e.g. ["tiny", "base", "small"]; empty = whisper_model_size only
+    whisper_tier_preload: bool = False  # load every tier at startup (else on first use, in the background)
+    whisper_tier_memory_mb: int = 0  # budget for loaded tiers; least recently used evicted (0 = no limit)
+    whisper_tier_down_queue: int = 8  # step to a faster tier at this many transcriptions in flight...
+    whisper_tier_down_rtf: float = 0.5  # ...or when the tier's recent real-time factor reaches this
+    whisper_tier_up_queue: int = 2  # step back up only at or below this many in flight...
+    whisper_tier_up_rtf: float = 0.2  # ...and with recent real-time factor at or below this
+    whisper_tier_hold_s: float = 15.0  # minimum time between tier switches
+
+    # Inference placement: local = this process's thread pool; process = worker processes;
+    # remote = inference nodes over TCP (python -m app.services.inference_node)
+    inference_mode: str = "local"  # local, process or remote
+    inference_workers: int = 2  # worker processes in process mode (each loads its own models)
+    inference_max_retries: int = 1  # re-dispatches of a job whose worker died
+    inference_gateway_host: str = "127.0.0.1"  # remote mode: where nodes connect (0.0.0.0 for other machines)
+    inference_gateway_port: int = 9100
+    inference_token: str = ""  # shared secret nodes present when registering
+    inference_heartbeat_s: float = 2.0  # node heartbeat interval
+    inference_heartbeat_timeout_s: float = 6.0  # node dropped (jobs retried) after this long without a frame
+    inference_dispatch_timeout_s: float = 30.0  # fail jobs that find no ready node for this long
+
+    # Warmup: dummy Whisper + translation passes before reporting ready
+    model_warmup: bool = True
+    warmup_language_pairs: list[str] = ["en:hi", "hi:en"]  # "source:target" pairs to warm up
+
+    # Source-language pinning: skip Whisper language detection once a session is confident
+    language_pinning: bool = True
+    language_pin_threshold: float = 0.8  # mean detection probability needed to pin
+    language_pin_min_utterances: int = 2  # detections before a language can be pinned
+    language_recheck_every: int = 20  # re-run detection every N pinned utterances (0 = never)
+    language_recheck_logprob: float = -1.0  # re-check early when avg log-prob drops below this
+
+    # STT batching: run utterances from concurrent sessions as one Whisper batch
+    stt_batching: bool = True
+    stt_batch_window_ms: int = 20  # how long to gather utterances before running
+    stt_batch_max_size: int = 8  # max utterances per batch
+
     # Translation
-    translation_engine: str = "nllb"  # nllb or openai
+    translation_engine: str = "nllb"  # nllb (PyTorch), ct2 (NLLB on CTranslate2) or openai
     nllb_model: str = "facebook/nllb-200-distilled-600M"
+    nllb_quantize: bool = False  # dynamic int8 quantization of NLLB Linear layers (PyTorch, CPU)
+    ct2_model_dir: str = "models/nllb-200-distilled-600M-ct2"  # converted from nllb_model if missing
+    ct2_compute_type: str = "int8"  # int8, int8_float16, float16, float32
+    ct2_device: str = "cpu"  # cpu or cuda
+    ct2_intra_threads: int = 0  # CTranslate2 threads per translation call (0 = default)
+    ct2_beam_size: int = 1  # 1 = greedy, same as the PyTorch path
+    translation_split_chars: int = 150  # NLLB translates sentence by sentence; longer ones split at clauses (0 = off)
+    translation_max_new_tokens_ratio: float = 2.0  # NLLB decode budget per source token of a piece
+    translation_max_new_tokens_extra: int = 16  # ... plus this many tokens (capped at 512)
     openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None  # e.g. a local stand-in (benchmarks/openai_standin.py)
+    openai_model: str = "gpt-4o-mini"
+    openai_timeout_ms: int = 3000  # hard deadline per request (no retries)
+    openai_hedge_ms: int = 800  # also start local NLLB if no answer by then (0 = only on error/timeout)
+    openai_max_connections: int = 16  # pooled keep-alive connections to the API
+    openai_batching: bool = True  # send utterances from all sessions together in one request
+    openai_batch_window_ms: int = 15  # how long to gather utterances per request
+    openai_batch_max_size: int = 8  # max utterances per request
+    max_target_languages: int = 8  # per-session fan-out limit for {"target_langs": [...]}
+
+    # Translation batching: gather NLLB requests from all sessions into one generate
+    translation_batching: bool = True
+    translation_batch_window_ms: int = 10  # how long to gather requests before running
+    translation_batch_max_size: int = 16  # max requests per batch
+    translation_batch_max_latency_ms: int = 1500  # split batches expected to run longer
+
+    # Translation memory (LRU) in front of NLLB and OpenAI
+    translation_cache_size: int = 5000  # max entries; 0 disables the cache
+    translation_cache_max_mb: float = 16.0  # approximate memory cap; 0 = entries limit only
+    translation_cache_ttl_s: float = 0  # 0 = entries never expire
+    translation_cache_path: Optional[str] = None  # JSON-lines file loaded at start, saved at shutdown
 
     # Audio processing
     sample_rate: int = 16000
     chunk_duration_ms: int = 2000  # process every N ms of audio
     min_audio_length_s: float = 0.5  # skip chunks shorter than this
 
+    # Voice activity detection (frame energy vs adaptive noise floor)
+    vad_backend: str = "energy"  # energy, or silero (adds a model-based trim before STT)
+    vad_frame_ms: int = 20  # 10-30 ms frames
+    vad_start_db: float = 9.0  # speech starts this far above the noise floor
+    vad_stop_db: float = 5.0  # ...and continues while above this (hysteresis)
+    vad_hangover_ms: int = 200  # keep speech on this long after energy drops
+    vad_pad_ms: int = 150  # audio kept around speech when trimming
+    vad_min_rms: float = 0.003  # absolute floor so digital silence never counts as speech
+
+    # Threading: dedicated executors and model intra-op threads (0 = library default)
+    stt_executor_workers: int = 2  # threads calling Whisper concurrently
+    translation_executor_workers: int = 2  # threads calling NLLB / OpenAI concurrently
+    whisper_cpu_threads: int = 0  # CTranslate2 intra-op threads per Whisper call
+    whisper_num_workers: int = 2  # concurrent Whisper calls CTranslate2 runs in parallel
+    torch_num_threads: int = 0  # torch.set_num_threads for NLLB
+
+    # Admission control across all sessions
+    max_inflight_utterances: int = 64  # queued + processing; over this clients get "overloaded" (0 = no cap)
+
+    # Observability
+    caption_timings: bool = False  # attach per-stage timings to captions (clients can send {"timings": true})
+
+    # Offline file translation (POST /translate/file)
+    file_parallel_segments: int = 0  # segments in flight per upload (0 = CPU count)
+    file_max_segment_s: float = 20.0  # force a cut in continuous speech (capped at Whisper's 30 s window)
+
+    # Per-session pipeline: receive loop keeps going while utterances are processed
+    session_queue_size: int = 4  # finished utterances waiting per session
+    session_queue_policy: str = "drop_oldest"  # drop_oldest, drop_newest or merge when full
+    session_pipeline_workers: int = 2  # utterances in flight per session
+    session_buffer_s: float = 8.0  # preallocated float32 audio per session (grows if ever exceeded)
+
+    # Utterance scheduler: deadline-ordered, per-session-fair slots in front of STT + translation
+    scheduler_enabled: bool = True
+    scheduler_slots: int = 8  # utterances processed at once across all sessions
+    scheduler_slo_ms: int = 2500  # target from end of speech to caption; sets each utterance's deadline
+    scheduler_shorten: bool = True  # utterances that will miss it run on the fastest Whisper tier (needs WHISPER_TIERS)
+    scheduler_drop_late_ms: int = 10000  # drop utterances this far past their deadline before they start (0 = never)
+
+    # Broadcast rooms (/ws/speak/{room}, /ws/listen/{room})
+    room_listener_queue_size: int = 32  # per-listener outbox; oldest dropped when full
+
+    # Streaming captions: re-transcribe a rolling window and emit partials
+    streaming_captions: bool = False  # clients can also send {"streaming": true}
+    streaming_interval_ms: int = 1000  # cadence of re-transcription passes
+    streaming_max_window_s: float = 10.0  # force-commit if passes never agree within this window
+
     cors_origins: list[str] = [
         "http://localhost:5173",
         "http://127.0.0.1:5173",
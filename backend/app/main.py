@@ -1,11 +1,14 @@
 """
 FastAPI application: REST + WebSocket for real-time speech translation.
 """
+import json
 import logging
 from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, File, HTTPException, Query, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
 from app.config import get_settings
 from app.services.language_codes import TARGET_LANGUAGES
@@ -19,14 +22,29 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup/shutdown: preload models."""
+    """Startup/shutdown: preload models (in worker processes or on inference nodes, per INFERENCE_MODE)."""
     from app.services.model_loader import ModelLoader
+    from app.services.worker_pool import get_inference_pool
+    pool = None
     try:
-        ModelLoader.get_instance().start_loading()
+        pool = get_inference_pool()
+        if pool is None:
+            ModelLoader.get_instance().start_loading()
     except Exception as e:
         logger.error(f"Error triggering background model loading: {e}")
     yield
-    # Shutdown cleanup if needed
+    if pool is not None:
+        pool.shutdown()
+    from app.services.executors import shutdown_executors
+    shutdown_executors()
+    from app.services.openai_translator import OpenAITranslator
+    if OpenAITranslator._instance is not None:
+        await OpenAITranslator._instance.close()
+    # Shutdown: persist the translation memory if configured
+    from app.services.translation_cache import get_translation_cache
+    cache = get_translation_cache()
+    if cache is not None:
+        cache.save()
 
 
 app = FastAPI(
@@ -52,13 +70,69 @@ async def root():
         "service": "voice-translation",
         "docs": "/docs",
         "websocket": "/ws/audio",
+        "rooms": {"speak": "/ws/speak/{room_id}", "listen": "/ws/listen/{room_id}"},
         "health": "/health",
+        "stats": "/stats",
+        "metrics": "/metrics",
     }
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    """Liveness (the process is up), plus whether models are loaded and warmed up."""
+    from app.services.model_loader import readiness
+    return {"status": "ok", "models_ready": readiness()["ready"]}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once every model is loaded and warmed up, else 503; per-model state and timings."""
+    from app.services.model_loader import readiness
+    status = readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/stats")
+async def stats():
+    """Runtime counters for the inference services."""
+    from app.services.audio_buffer import buffer_stats
+    from app.services.batching import get_stt_batcher, get_translation_batcher
+    from app.services.language_tracker import language_stats
+    from app.services.translation_cache import get_translation_cache
+    from app.services.vad import vad_stats
+    from app.websocket.rooms import get_room_registry
+    from app.services.worker_pool import get_inference_pool
+    from app.websocket.pipeline import get_admission_control
+    from app.services.scheduler import get_scheduler
+    from app.services.openai_translator import OpenAITranslator
+    from app.services.whisper_tiers import get_tier_policy
+    from app.websocket.streaming import streaming_stats
+    cache = get_translation_cache()
+    pool = get_inference_pool()
+    tiers = get_tier_policy()
+    scheduler = get_scheduler()
+    return {
+        "stt_batcher": get_stt_batcher().stats(),
+        "translation_batcher": get_translation_batcher().stats(),
+        "translation_cache": cache.stats() if cache is not None else None,
+        "streaming": streaming_stats.as_dict(),
+        "audio_buffers": buffer_stats.as_dict(),
+        "vad": vad_stats.as_dict(),
+        "language_detection": language_stats.as_dict(),
+        "rooms": get_room_registry().stats(),
+        "inference_pool": pool.stats() if pool is not None else None,
+        "admission": get_admission_control().stats(),
+        "scheduler": scheduler.stats() if scheduler is not None else None,
+        "whisper_tiers": tiers.stats() if tiers is not None else None,
+        "openai": OpenAITranslator._instance.stats() if OpenAITranslator._instance is not None else None,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition: stage latency histograms, RTF, sessions, queues, executors."""
+    from app.services import metrics as app_metrics
+    return PlainTextResponse(app_metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/languages")
@@ -67,9 +141,76 @@ async def languages():
     return {"languages": [{"code": c, "name": n} for c, n in TARGET_LANGUAGES]}
 
 
+FILE_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+}
+
+
+@app.post("/translate/file")
+async def translate_file(
+    file: UploadFile = File(...),
+    target_langs: str = Query("en", description="Comma-separated target languages"),
+    source_lang: Optional[str] = Query(None, description="Spoken language; omit or 'auto' to detect"),
+    format: str = Query("ndjson", description="ndjson, sse, srt or vtt"),
+    subtitle_lang: Optional[str] = Query(None, description="srt/vtt language; 'original' for the transcript"),
+):
+    """Translate an uploaded recording: VAD segments in parallel, streamed back as they finish."""
+    from app.services.file_translation import subtitle_cue
+    from app.services.file_translation import translate_file as run_file
+    from app.services.model_loader import readiness
+    fmt = format.lower()
+    if fmt not in FILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FILE_FORMATS)}")
+    langs = [lang.strip() for lang in target_langs.split(",") if lang.strip()]
+    if not langs:
+        raise HTTPException(status_code=400, detail="target_langs is empty")
+    if not readiness()["ready"]:
+        raise HTTPException(status_code=503, detail="Models are still loading; see /ready", headers={"Retry-After": "5"})
+    subtitle_lang = subtitle_lang or langs[0]
+    if source_lang in ("", "auto"):
+        source_lang = None
+
+    async def body():
+        subtitles = fmt in ("srt", "vtt")
+        if fmt == "vtt":
+            yield "WEBVTT\n\n"
+        number = 0
+        async for event in run_file(file.file, langs, source_lang, ordered=subtitles):
+            if subtitles:
+                if event["type"] == "segment" and event.get("original"):
+                    number += 1
+                    yield subtitle_cue(event, number, subtitle_lang, fmt)
+                elif event["type"] == "error":
+                    logger.error("Subtitle job for %s failed: %s", file.filename, event["error"])
+                continue
+            line = json.dumps(event, ensure_ascii=False)
+            yield f"event: {event['type']}\ndata: {line}\n\n" if fmt == "sse" else line + "\n"
+
+    return StreamingResponse(body(), media_type=FILE_FORMATS[fmt])
+
+
 @app.websocket("/ws/audio")
 async def websocket_audio(websocket: WebSocket):
     """Real-time audio: delegate to handler."""
     await websocket.accept()
     from app.websocket.audio_handler import handle_audio_websocket
     await handle_audio_websocket(websocket)
+
+
+@app.websocket("/ws/speak/{room_id}")
+async def websocket_speak(websocket: WebSocket, room_id: str):
+    """Room speaker: same protocol as /ws/audio; captions are also broadcast to listeners."""
+    await websocket.accept()
+    from app.websocket.audio_handler import handle_audio_websocket
+    await handle_audio_websocket(websocket, room_id=room_id)
+
+
+@app.websocket("/ws/listen/{room_id}")
+async def websocket_listen(websocket: WebSocket, room_id: str):
+    """Room listener: receive the speaker's captions in ?target_lang=..."""
+    await websocket.accept()
+    from app.websocket.rooms import handle_listener_websocket
+    await handle_listener_websocket(websocket, room_id)
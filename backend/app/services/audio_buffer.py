@@ -0,0 +1,153 @@
+"""
+Preallocated float32 audio buffer for a session.
+
+Client PCM16 is converted to normalized float32 once, straight into the buffer. VAD,
+utterance cuts and STT read numpy views of it: no per-utterance `bytes()` copy and no
+int16 -> float32 -> /32768 conversions downstream. Consumed audio is reclaimed by
+moving the (short) unconsumed tail back to the front when the end is reached.
+
+Views handed out with `view()` stay valid while they are alive: memory under a live
+view is never rewritten. If the space is needed, the buffer moves to a fresh array
+and the old one lives on until the last view is dropped.
+"""
+import threading
+import weakref
+from typing import Optional, Union
+
+import numpy as np
+
+from app.services.metrics import registry
+from app.services.resampler import pcm16_to_float
+
+PCM16_SCALE = np.float32(1.0 / 32768.0)
+
+PCMLike = Union[bytes, bytearray, memoryview]
+
+
+def as_float32(audio: Union[np.ndarray, PCMLike]) -> np.ndarray:
+    """Normalized float32 samples: float arrays pass through, PCM16 is converted (one allocation)."""
+    if isinstance(audio, np.ndarray):
+        return audio.astype(np.float32, copy=False)
+    return pcm16_to_float(audio)
+
+
+class BufferStats:
+    """Process-wide counters for session audio buffers."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.buffers: "weakref.WeakSet[AudioBuffer]" = weakref.WeakSet()
+        self.compactions = 0  # tail moved to the front in place
+        self.relocations = 0  # moved to a fresh array because a live view pinned the old one
+        self.grows = 0  # unconsumed audio outgrew the capacity
+
+    def allocated_bytes(self) -> int:
+        with self._lock:
+            return sum(b.nbytes for b in list(self.buffers))
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            buffers = list(self.buffers)
+        return {
+            "buffers": len(buffers),
+            "allocated_mb": round(sum(b.nbytes for b in buffers) / 1e6, 2),
+            "buffered_s": round(sum(len(b) / b.sample_rate for b in buffers), 1),
+            "compactions": self.compactions,
+            "relocations": self.relocations,
+            "grows": self.grows,
+        }
+
+
+buffer_stats = BufferStats()
+
+
+class AudioBuffer:
+    """
+    Float32 sample buffer with a fixed preallocated capacity. Positions passed to
+    `view` and `consume` are relative to the oldest unconsumed sample.
+    """
+
+    def __init__(self, sample_rate: int, capacity_s: float) -> None:
+        self.sample_rate = sample_rate
+        self._buf = np.empty(max(int(sample_rate * capacity_s), 1), dtype=np.float32)
+        self._start = 0  # first unconsumed sample in _buf
+        self._end = 0  # one past the last written sample
+        self._views: list[tuple[weakref.ref, int, int]] = []  # handed-out views: (view, start, end) in _buf
+        buffer_stats.buffers.add(self)
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def nbytes(self) -> int:
+        return self._buf.nbytes
+
+    def write_pcm16(self, pcm: PCMLike) -> np.ndarray:
+        """Append PCM16, converted into the buffer; returns the new samples (valid until the next write)."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        out = self._reserve(len(samples))
+        np.multiply(samples, PCM16_SCALE, out=out)
+        return out
+
+    def write(self, audio: np.ndarray) -> np.ndarray:
+        """Append float32 samples; returns them as stored (valid until the next write)."""
+        out = self._reserve(len(audio))
+        out[:] = audio
+        return out
+
+    def view(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """
+        Zero-copy view of unconsumed samples [start, end). Its memory is not reused while
+        the returned array is alive; hold on to it (not just a slice of it) while reading.
+        """
+        end = len(self) if end is None else min(end, len(self))
+        lo, hi = self._start + start, self._start + max(end, start)
+        view = self._buf[lo:hi]
+        self._views.append((weakref.ref(view), lo, hi))
+        return view
+
+    def consume(self, samples: int) -> None:
+        """Drop the oldest `samples` (cut into an utterance, or discarded)."""
+        self._start += max(min(samples, len(self)), 0)
+
+    def _pinned(self, lo: int, hi: int) -> bool:
+        """True if a live view still covers part of _buf[lo:hi]."""
+        if not self._views:
+            return False
+        self._views = [v for v in self._views if v[0]() is not None]
+        return any(start < hi and end > lo for _, start, end in self._views)
+
+    def _reserve(self, n: int) -> np.ndarray:
+        """Room for `n` more samples at the end, reclaiming consumed space when needed."""
+        if self._end + n > len(self._buf):
+            live = len(self)
+            if live + n > len(self._buf):
+                buffer_stats.grows += 1
+                self._relocate(max(2 * len(self._buf), live + n))
+            elif self._pinned(0, live):
+                buffer_stats.relocations += 1
+                self._relocate(len(self._buf))
+            else:
+                buffer_stats.compactions += 1
+                self._buf[:live] = self._buf[self._start:self._end]
+                self._start, self._end = 0, live
+        if self._pinned(self._end, self._end + n):
+            # The write would land on audio someone is still reading (e.g. a queued utterance)
+            buffer_stats.relocations += 1
+            self._relocate(len(self._buf))
+        out = self._buf[self._end:self._end + n]
+        self._end += n
+        return out
+
+    def _relocate(self, capacity: int) -> None:
+        live = len(self)
+        fresh = np.empty(capacity, dtype=np.float32)
+        fresh[:live] = self._buf[self._start:self._end]
+        self._buf, self._start, self._end = fresh, 0, live
+        self._views = []  # the old array stays alive through its views
+
+
+registry.gauge(
+    "vt_audio_buffer_bytes", "Memory preallocated for session audio buffers",
+    buffer_stats.allocated_bytes,
+)
@@ -0,0 +1,302 @@
+"""
+Cross-session micro-batching for model inference.
+Requests from all WebSocket sessions are gathered for a short window and run as one batch.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.executors import get_stt_executor, get_translation_executor
+from app.services.metrics import BATCH_SIZE, STAGE_SECONDS, registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Pending:
+    """A queued request waiting to be batched."""
+
+    item: Any
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BatchStats:
+    """Running counters for batch sizes and queue wait."""
+
+    def __init__(self) -> None:
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def record(self, batch: list[_Pending], started_at: float) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        for pending in batch:
+            wait = started_at - pending.enqueued_at
+            self.total_wait_s += wait
+            self.max_wait_s = max(self.max_wait_s, wait)
+
+    def as_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "avg_queue_wait_ms": round(1000 * self.total_wait_s / self.items, 2) if self.items else 0.0,
+            "max_queue_wait_ms": round(1000 * self.max_wait_s, 2),
+        }
+
+
+class MicroBatcher:
+    """
+    Gather requests for up to `window_ms` (or until `max_batch_size`) and hand them
+    to `_run_batch` together. Subclasses implement `_run_batch`.
+    """
+
+    def __init__(self, name: str, window_ms: int, max_batch_size: int) -> None:
+        self.name = name
+        self._window_s = max(window_ms, 0) / 1000.0
+        self._max_batch_size = max(max_batch_size, 1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = BatchStats()
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._worker_loop(), name=f"{self.name}-batcher")
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one request and wait for its own result."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Pending(item=item, future=future))
+        return await future
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _collect(self) -> list[_Pending]:
+        first = await self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self._window_s
+        while len(batch) < self._max_batch_size:
+            # Anything already queued (e.g. while the previous batch ran) joins immediately
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker_loop(self) -> None:
+        while True:
+            batch = await self._collect()
+            batch = [p for p in batch if not p.future.cancelled()]
+            if not batch:
+                continue
+            started_at = time.perf_counter()
+            self._stats.record(batch, started_at)
+            BATCH_SIZE.observe(len(batch), batcher=self.name)
+            for pending in batch:
+                STAGE_SECONDS.observe(started_at - pending.enqueued_at, stage=f"{self.name}_batch_wait")
+            try:
+                await self._run_batch(batch)
+            except Exception as e:
+                logger.exception("%s batch failed: %s", self.name, e)
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+            # Release the requests (e.g. audio buffer views) before waiting for the next batch
+            batch = pending = None
+
+    async def _run_batch(self, batch: list[_Pending]) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _resolve(pending: _Pending, result: Any) -> None:
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+    def stats(self) -> dict:
+        return {**self._stats.as_dict(), "queue_depth": self.queue_depth()}
+
+
+@dataclass
+class TranslationRequest:
+    text: str
+    source_lang: str
+    target_lang: str
+
+
+class TranslationBatcher(MicroBatcher):
+    """
+    Batch NLLB translations across sessions: group by target language,
+    then run one padded, length-sorted `generate` per group.
+    """
+
+    _instance: Optional["TranslationBatcher"] = None
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        super().__init__(
+            "translation",
+            window_ms=settings.translation_batch_window_ms,
+            max_batch_size=settings.translation_batch_max_size,
+        )
+        self._max_latency_s = settings.translation_batch_max_latency_ms / 1000.0
+        self._row_cost_s: Optional[float] = None  # EMA of generate seconds per row
+
+    async def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        from app.services.translation_service import get_translation_service
+
+        # Translation memory hits skip the batch window entirely
+        cached = get_translation_service().lookup(text, source_lang, target_lang)
+        if cached is not None:
+            return cached
+        return await self.submit(TranslationRequest(text, source_lang, target_lang))
+
+    def _split_for_latency(self, group: list[_Pending]) -> list[list[_Pending]]:
+        """Split a group into sub-batches whose expected run time fits the latency budget."""
+        if not self._row_cost_s or self._max_latency_s <= 0:
+            return [group]
+        rows = max(1, int(self._max_latency_s / self._row_cost_s))
+        return [group[i:i + rows] for i in range(0, len(group), rows)]
+
+    async def _run_batch(self, batch: list[_Pending]) -> None:
+        from app.services.translation_service import get_translation_service
+
+        trans = get_translation_service()
+        loop = asyncio.get_running_loop()
+
+        groups: dict[str, list[_Pending]] = defaultdict(list)
+        for pending in batch:
+            groups[pending.item.target_lang].append(pending)
+
+        for target_lang, group in groups.items():
+            # Length-sorted so sub-batches pad to similar lengths
+            group.sort(key=lambda p: len(p.item.text), reverse=True)
+            for chunk in self._split_for_latency(group):
+                texts = [p.item.text for p in chunk]
+                sources = [p.item.source_lang for p in chunk]
+                started = time.perf_counter()
+                try:
+                    results = await loop.run_in_executor(
+                        get_translation_executor(), trans.translate_batch, texts, sources, target_lang
+                    )
+                except Exception as e:
+                    logger.warning("Batched translation failed: %s", e)
+                    results = texts
+                self._update_cost(time.perf_counter() - started, len(chunk))
+                for pending, result in zip(chunk, results):
+                    self._resolve(pending, result)
+
+    def _update_cost(self, elapsed_s: float, rows: int) -> None:
+        per_row = elapsed_s / max(rows, 1)
+        if self._row_cost_s is None:
+            self._row_cost_s = per_row
+        else:
+            self._row_cost_s = 0.8 * self._row_cost_s + 0.2 * per_row
+
+    def stats(self) -> dict:
+        data = super().stats()
+        data["row_cost_ms"] = round(1000 * self._row_cost_s, 2) if self._row_cost_s else None
+        return data
+
+
+@dataclass
+class TranscriptionRequest:
+    audio: np.ndarray  # float32 samples
+    sample_rate: int
+    language: Optional[str] = None
+    model_size: Optional[str] = None
+
+
+class STTBatcher(MicroBatcher):
+    """
+    Batch Whisper transcriptions across sessions: utterances from many sessions
+    share one padded encoder pass and one batched decode.
+    """
+
+    _instance: Optional["STTBatcher"] = None
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        super().__init__(
+            "stt",
+            window_ms=settings.stt_batch_window_ms,
+            max_batch_size=settings.stt_batch_max_size,
+        )
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        language: Optional[str] = None,
+        model_size: Optional[str] = None,
+    ):
+        return await self.submit(TranscriptionRequest(audio, sample_rate, language, model_size))
+
+    async def _run_batch(self, batch: list[_Pending]) -> None:
+        from app.services.stt_service import get_stt_service
+
+        stt = get_stt_service()
+        loop = asyncio.get_running_loop()
+
+        # One batch per sample rate and Whisper tier; usually a single group
+        groups: dict[tuple[int, Optional[str]], list[_Pending]] = defaultdict(list)
+        for pending in batch:
+            groups[pending.item.sample_rate, pending.item.model_size].append(pending)
+
+        for (sample_rate, model_size), group in groups.items():
+            audio = [p.item.audio for p in group]
+            languages = [p.item.language for p in group]
+            results = await loop.run_in_executor(
+                get_stt_executor(),
+                lambda: stt.transcribe_batch(audio, sample_rate, languages, model_size=model_size),
+            )
+            for pending, result in zip(group, results):
+                self._resolve(pending, result)
+
+
+def get_translation_batcher() -> TranslationBatcher:
+    """Singleton translation batcher."""
+    if TranslationBatcher._instance is None:
+        TranslationBatcher._instance = TranslationBatcher()
+    return TranslationBatcher._instance
+
+
+def get_stt_batcher() -> STTBatcher:
+    """Singleton STT batcher."""
+    if STTBatcher._instance is None:
+        STTBatcher._instance = STTBatcher()
+    return STTBatcher._instance
+
+
+registry.gauge(
+    "vt_batcher_queue_depth", "Requests waiting in a cross-session batcher",
+    lambda: [
+        ({"batcher": b.name}, b.queue_depth())
+        for b in (TranslationBatcher._instance, STTBatcher._instance)
+        if b is not None
+    ],
+)
@@ -0,0 +1,232 @@
+"""
+Utterance processing shared by live sessions and file translation: transcribe once
+(worker process, STT batcher or direct; Whisper tier chosen by load), then translate
+into every target language (OpenAI, NLLB batcher, multi-target decode or worker process).
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.batching import get_stt_batcher, get_translation_batcher
+from app.services.executors import get_stt_executor, get_translation_executor
+from app.services.language_codes import whisper_to_display
+from app.services.language_tracker import LanguageTracker
+from app.services.metrics import STAGE_SECONDS, STT_REQUESTS
+from app.services.model_loader import ModelLoader
+from app.services.openai_translator import get_openai_translator
+from app.services.stt_service import get_stt_service
+from app.services.translation_service import get_translation_service
+from app.services.vad import trim_with_model, vad_stats
+from app.services.whisper_tiers import get_tier_policy
+from app.services.worker_pool import get_inference_pool
+
+logger = logging.getLogger(__name__)
+
+
+def record_stage(timings: Optional[dict], stage: str, seconds: float) -> None:
+    """Observe a stage duration; also accumulate it (ms) into a caption's timings when given."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if timings is not None:
+        timings[f"{stage}_ms"] = round(timings.get(f"{stage}_ms", 0.0) + seconds * 1000, 2)
+
+
+async def transcribe(
+    audio: np.ndarray,
+    sample_rate: int,
+    language: Optional[str] = None,
+    word_timestamps: bool = False,
+    fastest: bool = False,
+):
+    """
+    Transcribe float32 samples in a worker process (process mode), via the cross-session
+    STT batcher, or directly when batching is off or word timestamps are needed
+    (streaming passes). With Whisper tiers, the tier policy picks the model from current
+    load; `fastest` (scheduler: utterance running late) takes the fastest tier instead.
+    """
+    policy = get_tier_policy()
+    if policy is None:
+        result = await _run_transcribe(audio, sample_rate, language, word_timestamps, None)
+        STT_REQUESTS.inc(model=result.model or get_settings().whisper_model_size)
+        return result
+    model_size = policy.tiers[0] if fastest else policy.choose()
+    if get_inference_pool() is None:
+        # Not loaded yet: use the nearest loaded tier while it loads in the background
+        loader = ModelLoader.get_instance()
+        chosen = model_size
+        model_size = loader.available_whisper_tier(chosen, policy.tiers)
+        if loader.whisper_tier_unavailable(chosen):
+            policy.remove(chosen)
+    policy.begin()
+    started = time.perf_counter()
+    result = None
+    try:
+        result = await _run_transcribe(audio, sample_rate, language, word_timestamps, model_size)
+        return result
+    finally:
+        model = (result.model if result is not None else None) or model_size
+        policy.end(model, time.perf_counter() - started, len(audio) / sample_rate)
+        STT_REQUESTS.inc(model=model)
+
+
+async def _run_transcribe(
+    audio: np.ndarray,
+    sample_rate: int,
+    language: Optional[str],
+    word_timestamps: bool,
+    model_size: Optional[str],
+):
+    settings = get_settings()
+    pool = get_inference_pool()
+    if pool is not None:
+        return await pool.transcribe(audio, sample_rate, language, word_timestamps, model_size)
+    if settings.stt_batching and not word_timestamps:
+        return await get_stt_batcher().transcribe(audio, sample_rate, language, model_size)
+    loop = asyncio.get_running_loop()
+    stt = get_stt_service()
+    return await loop.run_in_executor(
+        get_stt_executor(),
+        lambda: stt.transcribe(
+            audio, sample_rate=sample_rate, language=language,
+            word_timestamps=word_timestamps, model_size=model_size,
+        ),
+    )
+
+
+def _use_openai() -> bool:
+    settings = get_settings()
+    return settings.translation_engine == "openai" and bool(settings.openai_api_key)
+
+
+async def _translate(text: str, source_lang: str, target_lang: str) -> str:
+    """
+    Translate via the pooled async OpenAI client (with NLLB as hedge and fallback),
+    or locally: worker process, cross-session batcher, or directly when batching is off.
+    """
+    if _use_openai() and source_lang != target_lang and text.strip():
+        return await get_openai_translator().translate(
+            text, source_lang, target_lang, lambda: _translate_local(text, source_lang, target_lang)
+        )
+    return await _translate_local(text, source_lang, target_lang)
+
+
+async def _translate_local(text: str, source_lang: str, target_lang: str) -> str:
+    """NLLB (PyTorch or CTranslate2) translation."""
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    trans = get_translation_service()
+    pool = get_inference_pool()
+    if pool is not None:
+        return await pool.translate(text, source_lang, target_lang)
+    if not settings.translation_batching or source_lang == target_lang:
+        return await loop.run_in_executor(
+            get_translation_executor(), trans.translate, text, source_lang, target_lang
+        )
+    return await get_translation_batcher().translate(text, source_lang, target_lang)
+
+
+async def translate_many(text: str, source_lang: str, target_langs: list[str]) -> dict[str, str]:
+    """
+    Translate into every subscribed language. A single target goes through `_translate`;
+    with NLLB several targets share one encoder pass and one batched decode, with OpenAI
+    they go out together in one batched request.
+    """
+    if len(target_langs) == 1 or _use_openai():
+        results = await asyncio.gather(*(_translate(text, source_lang, tgt) for tgt in target_langs))
+        return dict(zip(target_langs, results))
+    loop = asyncio.get_running_loop()
+    trans = get_translation_service()
+    pool = get_inference_pool()
+    if pool is not None:
+        return await pool.translate_multi(text, source_lang, target_langs)
+    return await loop.run_in_executor(
+        get_translation_executor(), trans.translate_multi, text, source_lang, target_langs
+    )
+
+
+def build_caption(
+    original: str,
+    translations: dict[str, str],
+    target_langs: list[str],
+    detected_lang: Optional[str],
+    stt_model: Optional[str] = None,
+) -> dict:
+    """Caption payload; `translated` is the first target for single-language clients."""
+    return {
+        "original": original,
+        "translated": translations.get(target_langs[0]) or original,
+        "translations": {lang: text or original for lang, text in translations.items()},
+        "detected_lang": detected_lang,
+        "detected_lang_display": whisper_to_display(detected_lang),
+        "stt_model": stt_model,
+        "error": None,
+    }
+
+
+async def process_audio_buffer(
+    audio: np.ndarray,
+    target_langs: list[str],
+    sample_rate: int,
+    tracker: Optional[LanguageTracker] = None,
+    timings: Optional[dict] = None,
+    fastest: bool = False,
+) -> dict:
+    """
+    Process gathered float32 audio (a view of the session buffer): (optional model-based
+    trim) -> transcribe once -> translate into each target. With a tracker, a pinned source language skips
+    Whisper's language detection. Stage times go to metrics and, if given, `timings`.
+    `fastest` transcribes on the fastest Whisper tier.
+    """
+    settings = get_settings()
+    try:
+        if settings.vad_backend == "silero":
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            trimmed = await loop.run_in_executor(get_stt_executor(), trim_with_model, audio, sample_rate)
+            record_stage(timings, "vad_trim", time.perf_counter() - started)
+            vad_stats.sent_s -= (len(audio) - len(trimmed)) / sample_rate
+            if not len(trimmed):
+                return {"original": "", "translated": "", "detected_lang": None, "error": None}
+            audio = trimmed
+
+        language = tracker.language_for_next() if tracker else None
+        started = time.perf_counter()
+        result = await transcribe(audio, sample_rate, language=language, fastest=fastest)
+        stt_s = time.perf_counter() - started
+        record_stage(timings, "stt", stt_s)
+        if tracker is not None:
+            tracker.observe(
+                requested=language,
+                detected=result.detected_language,
+                probability=result.language_probability,
+                avg_logprob=result.avg_logprob,
+                elapsed_s=stt_s,
+                audio_s=len(audio) / sample_rate,
+            )
+        original = (result.text or "").strip()
+
+        # If Whisper returns empty or very short garbage
+        if not original or len(original) < 2:
+            return {
+                "original": "",
+                "translated": "",
+                "detected_lang": result.detected_language,
+                "error": None,
+            }
+
+        detected = result.detected_language or "en"
+        started = time.perf_counter()
+        translations = await translate_many(original, detected, target_langs)
+        record_stage(timings, "translate", time.perf_counter() - started)
+        return build_caption(original, translations, target_langs, result.detected_language, result.model)
+    except Exception as e:
+        logger.exception("Buffer processing failed: %s", e)
+        return {
+            "original": "",
+            "translated": "",
+            "detected_lang": None,
+            "error": str(e),
+        }
@@ -0,0 +1,111 @@
+"""
+Dedicated, bounded thread pools for blocking inference calls.
+STT and translation each get an executor sized from Settings instead of sharing the
+event loop's default one, so neither can starve the other and the number of threads
+entering the models stays fixed (the models run their own intra-op pools inside).
+Busy threads and busy seconds are exported as metrics (utilization = busy / threads).
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.config import get_settings
+from app.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_BUSY_SECONDS = registry.counter(
+    "vt_executor_busy_seconds_total", "Busy thread-seconds per executor (rate / threads = utilization)"
+)
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that tracks busy threads, queued calls and busy time."""
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        super().__init__(max_workers=max_workers, thread_name_prefix=name)
+        self.name = name
+        self.threads = max_workers
+        self.busy = 0
+        self.queued = 0
+        self.busy_s = 0.0
+        self._stats_lock = threading.Lock()
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        with self._stats_lock:
+            self.queued += 1
+        future = super().submit(self._timed, fn, *args, **kwargs)
+        # Cancelled before a thread picked it up (shutdown, or the awaiting task was cancelled)
+        future.add_done_callback(self._unqueue_cancelled)
+        return future
+
+    def _unqueue_cancelled(self, future: Future) -> None:
+        if future.cancelled():
+            with self._stats_lock:
+                self.queued -= 1
+
+    def _timed(self, fn: Callable, *args, **kwargs):
+        with self._stats_lock:
+            self.queued -= 1
+            self.busy += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self.busy -= 1
+                self.busy_s += elapsed
+            EXECUTOR_BUSY_SECONDS.inc(elapsed, executor=self.name)
+
+
+_stt_executor: Optional[InstrumentedExecutor] = None
+_translation_executor: Optional[InstrumentedExecutor] = None
+
+
+def get_stt_executor() -> InstrumentedExecutor:
+    """Executor for Whisper (and the model-based VAD trim)."""
+    global _stt_executor
+    if _stt_executor is None:
+        workers = max(get_settings().stt_executor_workers, 1)
+        _stt_executor = InstrumentedExecutor("stt", workers)
+        logger.info("STT executor: %d thread(s)", workers)
+    return _stt_executor
+
+
+def get_translation_executor() -> InstrumentedExecutor:
+    """Executor for NLLB / OpenAI translation calls."""
+    global _translation_executor
+    if _translation_executor is None:
+        workers = max(get_settings().translation_executor_workers, 1)
+        _translation_executor = InstrumentedExecutor("translate", workers)
+        logger.info("Translation executor: %d thread(s)", workers)
+    return _translation_executor
+
+
+def shutdown_executors() -> None:
+    global _stt_executor, _translation_executor
+    for executor in (_stt_executor, _translation_executor):
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    _stt_executor = _translation_executor = None
+
+
+def _executors() -> list[InstrumentedExecutor]:
+    return [e for e in (_stt_executor, _translation_executor) if e is not None]
+
+
+registry.gauge(
+    "vt_executor_threads", "Threads per inference executor",
+    lambda: [({"executor": e.name}, e.threads) for e in _executors()],
+)
+registry.gauge(
+    "vt_executor_busy_threads", "Executor threads currently running a call",
+    lambda: [({"executor": e.name}, e.busy) for e in _executors()],
+)
+registry.gauge(
+    "vt_executor_queued_calls", "Calls waiting for a free executor thread",
+    lambda: [({"executor": e.name}, e.queued) for e in _executors()],
+)
@@ -0,0 +1,206 @@
+"""
+Offline translation of long recordings (POST /translate/file).
+
+The upload is decoded as a stream with PyAV and resampled to 16 kHz mono, then cut at
+VAD boundaries using the same segmenter as the live socket. Segments run through the
+normal pipeline (`process_audio_buffer`: STT and translation batchers, or worker
+processes) several at a time. Only a bounded number of segments is decoded ahead of
+the ones in flight, so memory stays flat for inputs that run for hours. With the
+utterance scheduler on, segments take best-effort slots so live sessions go first.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, BinaryIO, Iterator, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.audio_buffer import AudioBuffer
+from app.services.caption_pipeline import process_audio_buffer
+from app.services.language_tracker import LanguageTracker
+from app.services.scheduler import get_scheduler
+from app.services.vad import MIN_BUFFER_DURATION_S, SILENCE_DURATION_MS, new_segmenter
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+DECODE_BLOCK_S = 0.5  # audio handed from the decoder thread per step
+
+
+def iter_pcm16(source: BinaryIO, sample_rate: int = SAMPLE_RATE, block_s: float = DECODE_BLOCK_S) -> Iterator[bytes]:
+    """Decode any container/codec PyAV supports into mono PCM16 blocks, without loading it whole."""
+    import av
+
+    block = int(sample_rate * block_s) * 2
+    pending = bytearray()
+    with av.open(source, mode="r") as container:
+        stream = next((s for s in container.streams if s.type == "audio"), None)
+        if stream is None:
+            raise ValueError("No audio stream in the uploaded file")
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+        frames = (f for packet in container.demux(stream) for f in packet.decode())
+        for frame in _with_flush(frames):
+            for out in resampler.resample(frame):
+                pending.extend(out.to_ndarray()[0, :out.samples].tobytes())
+            while len(pending) >= block:
+                yield bytes(pending[:block])
+                del pending[:block]
+    if pending:
+        yield bytes(pending)
+
+
+def _with_flush(frames: Iterator[Any]) -> Iterator[Any]:
+    """Frames followed by None, which flushes the resampler."""
+    yield from frames
+    yield None
+
+
+async def iter_segments(source: BinaryIO, totals: Optional[dict] = None) -> AsyncIterator[tuple[float, float, np.ndarray]]:
+    """
+    Yield (start_s, end_s, float32 samples) speech segments; the samples are views of
+    the decode buffer, valid for as long as they are held. Decoding runs in a thread, one block
+    at a time, so the decoder never gets further ahead than the consumer lets it.
+    `totals["audio_s"]` is kept up to date with the audio decoded so far.
+    """
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    max_segment_s = min(settings.file_max_segment_s, 30.0)  # one Whisper window
+    segmenter = new_segmenter(SAMPLE_RATE)
+    buffer = AudioBuffer(SAMPLE_RATE, 2 * max_segment_s)
+    blocks = iter_pcm16(source)
+
+    def cut(end: int) -> None:
+        buffer.consume(end)
+        segmenter.advance(end)
+
+    while True:
+        block = await loop.run_in_executor(None, next, blocks, None)
+        final = block is None
+        if not final:
+            segmenter.push(buffer.write_pcm16(block))
+            if totals is not None:
+                totals["audio_s"] = segmenter.total / SAMPLE_RATE
+            if not segmenter.has_speech:
+                cut(segmenter.preroll_start())
+                continue
+        duration = len(buffer) / SAMPLE_RATE
+        ended = segmenter.has_speech and segmenter.silence_ms >= SILENCE_DURATION_MS
+        if final or (ended and duration >= MIN_BUFFER_DURATION_S) or duration >= max_segment_s:
+            if segmenter.has_speech:
+                start, end = segmenter.span()
+                origin = segmenter.origin
+                yield (origin + start) / SAMPLE_RATE, (origin + end) / SAMPLE_RATE, buffer.view(start, end)
+                cut(end)
+            else:
+                cut(len(buffer))
+        if final:
+            return
+
+
+async def translate_file(
+    source: BinaryIO,
+    target_langs: list[str],
+    source_lang: Optional[str] = None,
+    ordered: bool = False,
+) -> AsyncIterator[dict]:
+    """
+    Yield one event per segment as it finishes (in segment order when `ordered`), then
+    a final "done" event. Segment events carry start/end times in seconds.
+    """
+    settings = get_settings()
+    parallel = max(settings.file_parallel_segments or os.cpu_count() or 4, 1)
+    tracker = LanguageTracker()
+    tracker.set_explicit(source_lang)
+    slots = asyncio.Semaphore(parallel)
+    scheduler = get_scheduler()
+    share = scheduler.open_session("file", best_effort=True) if scheduler else None
+    # Completion order: finished events; segment order: tasks (bounded look-ahead)
+    events: asyncio.Queue = asyncio.Queue(maxsize=0 if not ordered else 2 * parallel)
+    started = time.perf_counter()
+    counts = {"segments": 0, "audio_s": 0.0, "speech_s": 0.0}
+    jobs: set[asyncio.Task] = set()
+
+    async def run(index: int, start_s: float, end_s: float, audio: np.ndarray) -> Optional[dict]:
+        grant = None
+        try:
+            if share is not None:
+                grant = await scheduler.acquire(share, index, end_s - start_s, time.perf_counter())
+            result = await process_audio_buffer(audio, target_langs, SAMPLE_RATE, tracker)
+        finally:
+            if grant is not None:
+                scheduler.release(grant)
+            slots.release()
+        if not result.get("original") and not result.get("error"):
+            return None
+        return {
+            "type": "segment",
+            "index": index,
+            "start": round(start_s, 3),
+            "end": round(end_s, 3),
+            **result,
+        }
+
+    async def produce() -> None:
+        try:
+            index = 0
+            async for start_s, end_s, audio in iter_segments(source, counts):
+                await slots.acquire()
+                task = asyncio.create_task(run(index, start_s, end_s, audio))
+                del audio  # the task holds the only reference to the segment
+                jobs.add(task)
+                task.add_done_callback(jobs.discard)
+                counts["speech_s"] += end_s - start_s
+                index += 1
+                if ordered:
+                    await events.put(task)
+                else:
+                    task.add_done_callback(events.put_nowait)
+            counts["segments"] = index
+            if jobs:
+                await asyncio.wait(set(jobs))
+        except Exception as e:
+            logger.exception("File translation failed: %s", e)
+            await events.put({"type": "error", "error": str(e)})
+        await events.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await events.get()
+            if item is None:
+                break
+            event = item if isinstance(item, dict) else await item
+            if event is not None:
+                yield event
+        yield {
+            "type": "done",
+            "segments": counts["segments"],
+            "audio_s": round(counts["audio_s"], 2),
+            "speech_s": round(counts["speech_s"], 2),
+            "elapsed_s": round(time.perf_counter() - started, 2),
+        }
+    finally:
+        # Client went away: stop decoding and drop segments still in flight
+        producer.cancel()
+        for task in list(jobs):
+            task.cancel()
+        if share is not None:
+            scheduler.close_session(share)
+
+
+def _timestamp(seconds: float, separator: str) -> str:
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+
+def subtitle_cue(event: dict, number: int, language: str, fmt: str) -> str:
+    """One SRT or VTT cue for a segment event; `language` "original" uses the transcript."""
+    separator = "," if fmt == "srt" else "."
+    text = event["original"] if language == "original" else event.get("translations", {}).get(language) or event["original"]
+    timing = f"{_timestamp(event['start'], separator)} --> {_timestamp(event['end'], separator)}"
+    return f"{number}\n{timing}\n{text}\n\n"
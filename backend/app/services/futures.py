@@ -0,0 +1,17 @@
+"""
+Completing asyncio futures from inference results (worker processes and remote nodes).
+Results arrive on background threads; hand them over with
+`loop.call_soon_threadsafe(resolve_future, future, status, value)`.
+"""
+import asyncio
+from typing import Any
+
+
+def resolve_future(future: asyncio.Future, status: str, value: Any) -> None:
+    """Set the result for status "ok", otherwise fail with the error message in `value`."""
+    if future.done():  # caller gave up (e.g. session closed)
+        return
+    if status == "ok":
+        future.set_result(value)
+    else:
+        future.set_exception(RuntimeError(f"Inference failed: {value}"))
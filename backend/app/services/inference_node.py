@@ -0,0 +1,189 @@
+"""
+Inference node for INFERENCE_MODE=remote: loads Whisper and the translation model once
+and serves jobs for one or more gateways.
+
+Usage (from backend/):
+    python -m app.services.inference_node --gateway 10.0.0.5:9100 [--gateway ...] [--slots 2] [--name gpu-1]
+
+The node connects to each gateway, registers with INFERENCE_TOKEN, then sends a
+heartbeat (with its model status) every INFERENCE_HEARTBEAT_S while running jobs on
+`slots` threads shared by all gateways. The gateway pings idle connections, so one
+silent for INFERENCE_HEARTBEAT_TIMEOUT_S is treated as lost (e.g. half-open after the
+gateway host went away). Lost connections are re-established; the gateway
+re-dispatches whatever was in flight.
+"""
+import argparse
+import logging
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.remote_inference import encode_result, recv_frame, send_frame
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_S = 2.0  # wait between attempts to reach a gateway
+
+
+def _execute(stt: Any, trans: Any, kind: str, args: dict, payload: bytearray) -> tuple[str, Any]:
+    """Run one job; returns ("ok", JSON-safe value) or ("error", message)."""
+    try:
+        if kind == "transcribe":
+            audio = np.frombuffer(payload, dtype=np.float32)
+            value = stt.transcribe(audio, **args)
+        elif kind == "translate":
+            value = trans.translate(args["text"], args["source_lang"], args["target_lang"], args["use_openai"])
+        elif kind == "translate_multi":
+            value = trans.translate_multi(args["text"], args["source_lang"], args["target_langs"], args["use_openai"])
+        else:
+            return "error", f"unknown job kind {kind!r}"
+        return "ok", encode_result(kind, value)
+    except Exception as e:
+        logger.exception("Inference job failed: %s", e)
+        return "error", str(e)
+
+
+class InferenceNode:
+    """Serves jobs from several gateways with one set of models and one job executor."""
+
+    def __init__(self, gateways: list[tuple[str, int]], slots: int, name: str) -> None:
+        from app.services.model_loader import ModelLoader
+        from app.services.stt_service import get_stt_service
+        from app.services.translation_service import get_translation_service
+
+        settings = get_settings()
+        self.gateways = gateways
+        self.slots = max(slots, 1)
+        self.name = name
+        self._token = settings.inference_token
+        self._heartbeat_s = settings.inference_heartbeat_s
+        self._read_timeout_s = settings.inference_heartbeat_timeout_s
+        self._loader = ModelLoader.get_instance()
+        self._stt = get_stt_service()
+        self._trans = get_translation_service()
+        self._executor = ThreadPoolExecutor(self.slots, thread_name_prefix="inference-job")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self) -> None:
+        """Start loading models, connect to every gateway and block until stop()."""
+        self._loader.start_loading()
+        threads = [
+            threading.Thread(target=self._serve, args=(host, port), name=f"gateway-{host}:{port}", daemon=True)
+            for host, port in self.gateways
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            self._stop.wait()
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _serve(self, host: str, port: int) -> None:
+        """Keep one gateway connection up: register, heartbeat, receive jobs."""
+        while not self._stop.is_set():
+            try:
+                sock = socket.create_connection((host, port), timeout=RECONNECT_S)
+            except OSError as e:
+                logger.debug("Gateway %s:%d unreachable: %s", host, port, e)
+                self._stop.wait(RECONNECT_S)
+                continue
+            sock.settimeout(self._read_timeout_s)  # the gateway pings idle connections
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            send_lock = threading.Lock()
+            closed = threading.Event()
+            try:
+                self._session(sock, host, port, send_lock, closed)
+            except socket.timeout:
+                logger.warning("Lost gateway %s:%d: nothing received for %gs", host, port, self._read_timeout_s)
+            except (OSError, ValueError, ConnectionError) as e:
+                logger.warning("Lost gateway %s:%d: %s", host, port, e)
+            finally:
+                closed.set()
+                sock.close()
+            self._stop.wait(RECONNECT_S)
+
+    def _session(
+        self, sock: socket.socket, host: str, port: int, send_lock: threading.Lock, closed: threading.Event
+    ) -> None:
+        def send(message: dict) -> None:
+            with send_lock:
+                send_frame(sock, message)
+
+        send({
+            "type": "register", "token": self._token, "name": self.name,
+            "slots": self.slots, "models": self._loader.status(),
+        })
+        message, _ = recv_frame(sock)
+        if message.get("type") != "registered":
+            logger.error("Gateway %s:%d rejected this node: %s", host, port, message.get("error"))
+            return
+        logger.info("Registered with gateway %s:%d", host, port)
+
+        def heartbeat() -> None:
+            while not closed.wait(self._heartbeat_s):
+                try:
+                    with self._lock:
+                        in_flight = self._in_flight
+                    send({"type": "heartbeat", "in_flight": in_flight, "models": self._loader.status()})
+                except OSError:
+                    return
+
+        threading.Thread(target=heartbeat, name=f"heartbeat-{host}:{port}", daemon=True).start()
+        while True:
+            message, payload = recv_frame(sock)
+            if message.get("type") == "job":
+                with self._lock:
+                    self._in_flight += 1
+                self._executor.submit(self._run, send, message, payload)
+
+    def _run(self, send: Any, message: dict, payload: bytearray) -> None:
+        try:
+            status, value = _execute(self._stt, self._trans, message["kind"], message["args"], payload)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        try:
+            send({"type": "result", "job": message["job"], "status": status, "value": value})
+        except OSError:
+            pass  # gateway gone; it retries the job elsewhere
+
+
+def _address(value: str) -> tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def main(argv: Any = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Inference node for INFERENCE_MODE=remote gateways")
+    parser.add_argument(
+        "--gateway", action="append", type=_address,
+        help=f"host:port of a gateway (repeatable; default 127.0.0.1:{settings.inference_gateway_port})",
+    )
+    parser.add_argument("--slots", type=int, default=2, help="jobs run at once")
+    parser.add_argument("--name", default=socket.gethostname())
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s [%(levelname)s] node-{args.name} %(name)s: %(message)s",
+    )
+    gateways = args.gateway or [("127.0.0.1", settings.inference_gateway_port)]
+    node = InferenceNode(gateways, args.slots, args.name)
+    try:
+        node.run()
+    except KeyboardInterrupt:
+        node.stop()
+
+
+if __name__ == "__main__":
+    main()
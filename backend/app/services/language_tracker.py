@@ -0,0 +1,128 @@
+"""
+Per-session source-language pinning.
+Whisper language detection runs on the first utterances; once one language is
+confidently ahead it is pinned and passed to Whisper, skipping detection. Detection
+re-runs occasionally, or when transcription confidence drops.
+"""
+from collections import defaultdict
+from typing import Optional
+
+from app.config import get_settings
+
+
+class LanguageStats:
+    """Global counters: detections run vs skipped, and the STT time saved by skipping."""
+
+    def __init__(self) -> None:
+        self.detections_run = 0
+        self.detections_skipped = 0
+        self.rechecks = 0
+        self.repins = 0
+        self._detect_s_per_audio_s = 0.0  # EMA of STT seconds per audio second, with detection
+        self._pinned_s_per_audio_s = 0.0  # ... with the language given
+        self.saved_s = 0.0
+
+    @staticmethod
+    def _ema(current: float, value: float) -> float:
+        return value if current == 0.0 else 0.9 * current + 0.1 * value
+
+    def record(self, detected: bool, elapsed_s: float, audio_s: float) -> None:
+        if audio_s <= 0:
+            return
+        rate = elapsed_s / audio_s
+        if detected:
+            self.detections_run += 1
+            self._detect_s_per_audio_s = self._ema(self._detect_s_per_audio_s, rate)
+        else:
+            self.detections_skipped += 1
+            self._pinned_s_per_audio_s = self._ema(self._pinned_s_per_audio_s, rate)
+            if self._detect_s_per_audio_s:
+                self.saved_s += max(self._detect_s_per_audio_s - rate, 0.0) * audio_s
+
+    def as_dict(self) -> dict:
+        total = self.detections_run + self.detections_skipped
+        return {
+            "detections_run": self.detections_run,
+            "detections_skipped": self.detections_skipped,
+            "skip_rate": round(self.detections_skipped / total, 3) if total else 0.0,
+            "rechecks": self.rechecks,
+            "repins": self.repins,
+            "estimated_saved_s": round(self.saved_s, 2),
+        }
+
+
+language_stats = LanguageStats()
+
+
+class LanguageTracker:
+    """Decides, per utterance, whether Whisper should detect the language or use a pinned one."""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._enabled = settings.language_pinning
+        self._threshold = settings.language_pin_threshold
+        self._min_utterances = max(settings.language_pin_min_utterances, 1)
+        self._recheck_every = settings.language_recheck_every
+        self._recheck_logprob = settings.language_recheck_logprob
+        self.explicit: Optional[str] = None  # set by the client; never re-checked
+        self.pinned: Optional[str] = None
+        self._prob_sum: dict[str, float] = defaultdict(float)
+        self._count: dict[str, int] = defaultdict(int)
+        self._observed = 0
+        self._since_check = 0
+        self._recheck = False
+
+    def set_explicit(self, language: Optional[str]) -> None:
+        """Client-chosen source language; None/"auto" returns to detection."""
+        self.explicit = None if language in (None, "", "auto") else language
+
+    def language_for_next(self) -> Optional[str]:
+        """Language to pass to Whisper for the next utterance (None = detect)."""
+        if self.explicit:
+            return self.explicit
+        if not self._enabled or self.pinned is None or self._recheck:
+            return None
+        if self._recheck_every and self._since_check >= self._recheck_every:
+            return None
+        return self.pinned
+
+    def observe(
+        self,
+        requested: Optional[str],
+        detected: Optional[str],
+        probability: Optional[float],
+        avg_logprob: Optional[float],
+        elapsed_s: float,
+        audio_s: float,
+    ) -> None:
+        """Feed back one transcription; `requested` is what language_for_next returned."""
+        language_stats.record(detected=requested is None, elapsed_s=elapsed_s, audio_s=audio_s)
+        if self.explicit or not self._enabled:
+            return
+        if requested is not None:
+            # Pinned run: watch for a confidence drop that suggests the speaker switched
+            self._since_check += 1
+            if avg_logprob is not None and avg_logprob < self._recheck_logprob:
+                self._recheck = True
+            return
+        if not detected or probability is None:
+            return
+        if self.pinned is not None:
+            # A re-check: keep the pin unless another language is now clearly detected
+            language_stats.rechecks += 1
+            self._recheck = False
+            self._since_check = 0
+            if detected != self.pinned and probability >= self._threshold:
+                self.pinned = detected
+                language_stats.repins += 1
+            return
+        self._observed += 1
+        self._prob_sum[detected] += probability
+        self._count[detected] += 1
+        if self._observed < self._min_utterances:
+            return
+        best = max(self._count, key=lambda lang: self._prob_sum[lang])
+        mean_prob = self._prob_sum[best] / self._count[best]
+        if mean_prob >= self._threshold and self._count[best] * 3 >= self._observed * 2:
+            self.pinned = best
+            self._since_check = 0
@@ -1,15 +1,47 @@
 import logging
+import resource
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional, Any
 
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Short sentences used to warm up translation for each source language
+WARMUP_TEXTS = {
+    "en": "Hello, how are you today?",
+    "hi": "नमस्ते, आप आज कैसे हैं?",
+    "ta": "வணக்கம், இன்று எப்படி இருக்கிறீர்கள்?",
+    "te": "నమస్కారం, ఈరోజు మీరు ఎలా ఉన్నారు?",
+    "bn": "নমস্কার, আজ আপনি কেমন আছেন?",
+    "mr": "नमस्कार, आज तुम्ही कसे आहात?",
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (peak RSS if /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
 
 class ModelLoader:
+    """
+    Loads Whisper and the translation model in parallel in the background. Each model
+    has its own lock, so a request for one model never waits on the other's load.
+    `status()` reports per-model state (pending, loading, ready, failed) and timings.
+    """
+
     _instance: Optional["ModelLoader"] = None
-    _lock = threading.Lock()
+    _lock = threading.Lock()  # singleton creation
 
     def __init__(self):
         self._settings = get_settings()
@@ -17,6 +49,44 @@ class ModelLoader:
         self._nllb_model = None
         self._nllb_tokenizer = None
         self._nllb_device = None
+        self._ct2_translator = None
+        self._ct2_tokenizer = None
+        self._whisper_lock = threading.Lock()
+        self._translation_lock = threading.Lock()
+        self._models: dict[str, dict] = {
+            "whisper": {"state": "pending", "size": self._settings.whisper_model_size},
+            "translation": {"state": "pending", "engine": self._translation_backend},
+        }
+        # Extra Whisper tiers (WHISPER_TIERS), keyed by size; reported as "whisper:<size>"
+        self._whisper_tiers: dict[str, Any] = {}
+        self._tier_used: dict[str, float] = {}  # last use, for least-recently-used eviction
+        self._tier_lock = threading.Lock()  # one tier load (and eviction) at a time
+        self._tier_loading: set[str] = set()
+        for size in self._extra_tiers:
+            self._models[f"whisper:{size}"] = {"state": "pending", "size": size}
+        self._warmup_state = "pending" if self._settings.model_warmup else "disabled"
+        self._warmup_errors: list[str] = []
+        self._load_s: Optional[float] = None
+        self._ready = threading.Event()  # set once loading (and warmup) has finished
+
+    @property
+    def _translation_backend(self) -> str:
+        return "ct2" if self._settings.translation_engine == "ct2" else "nllb"
+
+    @property
+    def _extra_tiers(self) -> list[str]:
+        from app.services.whisper_tiers import configured_tiers
+        return [t for t in configured_tiers() if t != self._settings.whisper_model_size]
+
+    def _mark(self, model: str, state: str, started: Optional[float] = None, error: Optional[str] = None):
+        entry = {k: v for k, v in self._models[model].items() if k in ("engine", "size")}
+        entry["state"] = state
+        if started is not None:
+            entry["load_s"] = round(time.perf_counter() - started, 2)
+            entry["rss_mb"] = round(rss_mb())
+        if error:
+            entry["error"] = error
+        self._models[model] = entry
 
     @classmethod
     def get_instance(cls) -> "ModelLoader":
@@ -33,12 +103,104 @@ class ModelLoader:
 
     def _load_all(self):
         logger.info("Starting background model loading...")
+        started = time.perf_counter()
         try:
-            self._load_whisper()
-            self._load_nllb()
-            logger.info("Background model loading complete.")
+            # Both loads are mostly file I/O and native init (GIL released): run them side by side
+            load_translation = self._load_ct2 if self._translation_backend == "ct2" else self._load_nllb
+            loads = [self._load_whisper, load_translation]
+            if self._settings.whisper_tier_preload and self._extra_tiers:
+                loads.append(self._preload_tiers)
+            with ThreadPoolExecutor(max_workers=len(loads), thread_name_prefix="model-load") as pool:
+                for future in [pool.submit(load) for load in loads]:
+                    future.result()
+            self._load_s = round(time.perf_counter() - started, 2)
+            logger.info(
+                "Background model loading complete in %.1fs (RSS %.0f MB).", self._load_s, rss_mb(),
+            )
+            if self._settings.model_warmup:
+                self._warmup_state = "running"
+                errors = self._warmup()
+                self._warmup_state = "failed" if errors else "done"
+                self._warmup_errors = errors
         except Exception as e:
             logger.error(f"Background loading failed: {e}")
+            if self._warmup_state == "running":
+                self._warmup_state = "failed"
+                self._warmup_errors = [str(e)]
+        finally:
+            self._ready.set()
+
+    def _warmup(self) -> list[str]:
+        """
+        Run dummy Whisper and translation passes so the first real utterance doesn't pay
+        for lazy kernel initialization and allocator growth. Bypasses the translation cache.
+        Returns the errors of the passes that failed (empty when all of them ran).
+        """
+        import numpy as np
+
+        from app.services.stt_service import get_stt_service
+        from app.services.translation_service import get_translation_service
+
+        started = time.perf_counter()
+        errors: list[str] = []
+        rng = np.random.default_rng(0)
+        noise = (rng.standard_normal(16000) * 300).astype(np.int16).tobytes()
+        if self._whisper_model is None:
+            logger.warning("Whisper warmup skipped: model not loaded")
+        else:
+            stt = get_stt_service()
+            try:
+                stt.transcribe(noise, sample_rate=16000)  # with language detection
+                stt.transcribe(noise, sample_rate=16000, language="en")
+                if self._settings.stt_batching:
+                    stt.transcribe_batch([noise, noise], sample_rate=16000)
+                for size in list(self._whisper_tiers):  # preloaded tiers
+                    stt.transcribe(noise, sample_rate=16000, model_size=size)
+            except Exception as e:
+                logger.warning("Whisper warmup failed: %s", e)
+                errors.append(f"whisper: {e}")
+
+        rows = []
+        for pair in self._settings.warmup_language_pairs:
+            source_lang, _, target_lang = pair.partition(":")
+            if source_lang and target_lang:
+                rows.append((WARMUP_TEXTS.get(source_lang, WARMUP_TEXTS["en"]), source_lang, target_lang))
+        use_ct2 = self._settings.translation_engine == "ct2"
+        if (self._ct2_translator if use_ct2 else self._nllb_model) is None:
+            logger.warning("Translation warmup skipped: model not loaded")
+        elif rows:
+            trans = get_translation_service()
+            try:
+                if use_ct2:
+                    trans.translate_ct2_rows(rows[:1])
+                    trans.translate_ct2_rows(rows)
+                else:
+                    for text, source_lang, target_lang in rows:
+                        trans.translate_nllb(text, source_lang, target_lang)
+                    text, source_lang, target_lang = rows[0]
+                    trans.translate_nllb_batch([text, text], [source_lang, source_lang], target_lang)
+            except Exception as e:
+                logger.warning("Translation warmup failed: %s", e)
+                errors.append(f"translation: {e}")
+        logger.info("Warmup complete in %.1fs (RSS %.0f MB).", time.perf_counter() - started, rss_mb())
+        return errors
+
+    @property
+    def is_ready(self) -> bool:
+        """True once loading (and warmup, if enabled) has finished and every model loaded."""
+        # Extra Whisper tiers are optional: a failed or evicted tier falls back to another
+        return self._ready.is_set() and all(self._models[m]["state"] == "ready" for m in ("whisper", "translation"))
+
+    def status(self) -> dict:
+        """Per-model state and load timings (for /ready and socket gating)."""
+        return {
+            "ready": self.is_ready,
+            "loading": not self._ready.is_set(),
+            "models": {name: dict(entry) for name, entry in self._models.items()},
+            "warmup": self._warmup_state,
+            **({"warmup_errors": list(self._warmup_errors)} if self._warmup_errors else {}),
+            "load_s": self._load_s,
+        }
 
     def load_models(self):
         """Load all models synchronously (blocking)."""
@@ -46,30 +208,108 @@ class ModelLoader:
 
 
     def _load_whisper(self):
-        with self._lock:
+        with self._whisper_lock:
             if self._whisper_model:
                 return
+            started = time.perf_counter()
+            self._mark("whisper", "loading")
             try:
                 logger.info("Loading Whisper model...")
-                from faster_whisper import WhisperModel
-                self._whisper_model = WhisperModel(
-                    self._settings.whisper_model_size,
-                    device=self._settings.whisper_device,
-                    compute_type=self._settings.whisper_compute_type,
+                self._whisper_model = self._create_whisper(self._settings.whisper_model_size)
+                logger.info(
+                    "Whisper model loaded in %.1fs (RSS %.0f MB).", time.perf_counter() - started, rss_mb()
                 )
-                logger.info("Whisper model loaded.")
+                self._mark("whisper", "ready", started)
             except Exception as e:
                 logger.error(f"Failed to load Whisper: {e}")
+                self._mark("whisper", "failed", started, str(e))
+
+    def _create_whisper(self, size: str) -> Any:
+        from faster_whisper import WhisperModel
+        return WhisperModel(
+            size,
+            device=self._settings.whisper_device,
+            compute_type=self._settings.whisper_compute_type,
+            cpu_threads=self._settings.whisper_cpu_threads,
+            num_workers=self._settings.whisper_num_workers,
+        )
+
+    def _preload_tiers(self):
+        for size in self._extra_tiers:
+            self._load_whisper_tier(size)
+
+    def _fit_tier_budget(self, size: str) -> bool:
+        """Evict least recently used tiers until `size` fits WHISPER_TIER_MEMORY_MB; False if it can't."""
+        from app.services.whisper_tiers import estimated_mb
+
+        budget = self._settings.whisper_tier_memory_mb
+        if budget <= 0:
+            return True
+        base = estimated_mb(self._settings.whisper_model_size)
+        if base + estimated_mb(size) > budget:
+            return False
+        used = base + sum(map(estimated_mb, self._whisper_tiers))
+        for victim in sorted(self._whisper_tiers, key=lambda t: self._tier_used.get(t, 0.0)):
+            if used + estimated_mb(size) <= budget:
+                break
+            # Calls already running keep their reference; memory is freed when they finish
+            del self._whisper_tiers[victim]
+            used -= estimated_mb(victim)
+            self._mark(f"whisper:{victim}", "evicted")
+            logger.info("Evicted Whisper tier %s to make room for %s", victim, size)
+        return used + estimated_mb(size) <= budget
+
+    def _load_whisper_tier(self, size: str):
+        name = f"whisper:{size}"
+        with self._tier_lock:
+            if size in self._whisper_tiers:
+                return
+            if not self._fit_tier_budget(size):
+                logger.warning("Whisper tier %s does not fit WHISPER_TIER_MEMORY_MB; not loaded", size)
+                self._mark(name, "over_budget")
+                return
+            started = time.perf_counter()
+            self._mark(name, "loading")
+            try:
+                logger.info("Loading Whisper tier %s...", size)
+                self._whisper_tiers[size] = self._create_whisper(size)
+                self._tier_used[size] = time.monotonic()
+                logger.info(
+                    "Whisper tier %s loaded in %.1fs (RSS %.0f MB).", size, time.perf_counter() - started, rss_mb()
+                )
+                self._mark(name, "ready", started)
+            except Exception as e:
+                logger.error(f"Failed to load Whisper tier {size}: {e}")
+                self._mark(name, "failed", started, str(e))
+
+    def _load_tier_async(self, size: str):
+        # A duplicate thread is harmless: _load_whisper_tier re-checks under the tier lock
+        if size in self._tier_loading:
+            return
+        self._tier_loading.add(size)
+
+        def run():
+            try:
+                self._load_whisper_tier(size)
+            finally:
+                self._tier_loading.discard(size)
+
+        threading.Thread(target=run, name=f"whisper-tier-{size}", daemon=True).start()
 
     def _load_nllb(self):
-        with self._lock:
+        with self._translation_lock:
             if self._nllb_model:
                 return
+            started = time.perf_counter()
+            self._mark("translation", "loading")
             try:
                 logger.info("Loading NLLB model...")
                 import torch
                 from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 
+                if self._settings.torch_num_threads > 0:
+                    torch.set_num_threads(self._settings.torch_num_threads)
+
                 self._nllb_device = 0 if torch.cuda.is_available() else -1
                 model_name = self._settings.nllb_model
                 
@@ -78,10 +318,63 @@ class ModelLoader:
                 
                 if self._nllb_device >= 0:
                     self._nllb_model = self._nllb_model.to(self._nllb_device)
-                    
-                logger.info("NLLB model loaded.")
+                elif self._settings.nllb_quantize:
+                    # Dynamic int8 for the Linear layers (CPU only): ~4x smaller, faster matmuls
+                    self._nllb_model = torch.quantization.quantize_dynamic(
+                        self._nllb_model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                    logger.info("NLLB Linear layers quantized to int8.")
+                if self._settings.nllb_quantize and self._nllb_device >= 0:
+                    logger.warning("NLLB_QUANTIZE applies to CPU only; ignored on GPU.")
+
+                logger.info(
+                    "NLLB model loaded in %.1fs (RSS %.0f MB).", time.perf_counter() - started, rss_mb()
+                )
+                self._mark("translation", "ready", started)
             except Exception as e:
                 logger.error(f"Failed to load NLLB: {e}")
+                self._mark("translation", "failed", started, str(e))
+
+    def _load_ct2(self):
+        with self._translation_lock:
+            if self._ct2_translator:
+                return
+            started = time.perf_counter()
+            self._mark("translation", "loading")
+            try:
+                logger.info("Loading NLLB (CTranslate2) model...")
+                import ctranslate2
+                from transformers import AutoTokenizer
+
+                model_dir = Path(self._settings.ct2_model_dir)
+                if not (model_dir / "model.bin").exists():
+                    # One-off conversion from the Hugging Face checkpoint (needs torch)
+                    logger.info(
+                        "Converting %s to CTranslate2 (%s) in %s...",
+                        self._settings.nllb_model, self._settings.ct2_compute_type, model_dir,
+                    )
+                    from ctranslate2.converters import TransformersConverter
+                    TransformersConverter(self._settings.nllb_model).convert(
+                        str(model_dir), quantization=self._settings.ct2_compute_type
+                    )
+
+                self._ct2_tokenizer = AutoTokenizer.from_pretrained(self._settings.nllb_model)
+                self._ct2_translator = ctranslate2.Translator(
+                    str(model_dir),
+                    device=self._settings.ct2_device,
+                    compute_type=self._settings.ct2_compute_type,
+                    # One replica per translation executor thread; intra-op threads per call
+                    inter_threads=max(self._settings.translation_executor_workers, 1),
+                    intra_threads=self._settings.ct2_intra_threads,
+                )
+                logger.info(
+                    "NLLB (CTranslate2) model loaded in %.1fs (RSS %.0f MB).",
+                    time.perf_counter() - started, rss_mb(),
+                )
+                self._mark("translation", "ready", started)
+            except Exception as e:
+                logger.error(f"Failed to load NLLB (CTranslate2): {e}")
+                self._mark("translation", "failed", started, str(e))
 
     @property
     def whisper_model(self) -> Any:
@@ -89,9 +382,58 @@ class ModelLoader:
             self._load_whisper()
         return self._whisper_model
 
+    def whisper_model_for(self, size: Optional[str]) -> Any:
+        """
+        Whisper model for a tier (the default model for None or WHISPER_MODEL_SIZE).
+        Loads the tier if needed (blocking); None if it is unavailable (failed / over budget).
+        """
+        if not size or size == self._settings.whisper_model_size:
+            return self.whisper_model
+        model = self._whisper_tiers.get(size)
+        if model is None and not self.whisper_tier_unavailable(size):
+            self._load_whisper_tier(size)
+            model = self._whisper_tiers.get(size)
+        if model is not None:
+            self._tier_used[size] = time.monotonic()
+        return model
+
+    def whisper_tier_unavailable(self, size: str) -> bool:
+        """True if a tier failed to load or can never fit the memory budget."""
+        return self._models.get(f"whisper:{size}", {}).get("state") in ("failed", "over_budget")
+
+    def available_whisper_tier(self, size: str, tiers: list[str]) -> str:
+        """
+        `size` if it is loaded; otherwise start loading it in the background and return the
+        loaded tier closest to it (the smaller one on a tie), so no request waits on a load.
+        """
+        default = self._settings.whisper_model_size
+        if size == default or size in self._whisper_tiers:
+            return size
+        if not self.whisper_tier_unavailable(size):
+            self._load_tier_async(size)
+        loaded = [t for t in tiers if t == default or t in self._whisper_tiers]
+        target = tiers.index(size)
+        return min(loaded, key=lambda t: (abs(tiers.index(t) - target), tiers.index(t)))
+
     @property
     def nllb_components(self) -> tuple[Any, Any, int]:
         """Returns (model, tokenizer, device)."""
         if not self._nllb_model:
             self._load_nllb()
         return self._nllb_model, self._nllb_tokenizer, self._nllb_device
+
+    @property
+    def ct2_components(self) -> tuple[Any, Any]:
+        """Returns (ctranslate2.Translator, tokenizer)."""
+        if not self._ct2_translator:
+            self._load_ct2()
+        return self._ct2_translator, self._ct2_tokenizer
+
+
+def readiness() -> dict:
+    """Model status of this process, or of the inference workers/nodes (INFERENCE_MODE=process or remote)."""
+    from app.services.worker_pool import get_inference_pool
+    pool = get_inference_pool()
+    if pool is not None:
+        return pool.readiness()
+    return ModelLoader.get_instance().status()
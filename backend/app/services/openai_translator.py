@@ -0,0 +1,285 @@
+"""
+Async OpenAI translation with a long-lived pooled client, deadlines, batching and hedging.
+
+One AsyncOpenAI client (keep-alive connection pool) serves every session, so requests
+skip the TCP/TLS handshake. Each request has a hard deadline and no retries. Utterances
+from all sessions are gathered for a few milliseconds and sent as one JSON request.
+If OpenAI hasn't answered within OPENAI_HEDGE_MS, local NLLB is started as well and
+whichever finishes first wins. Errors and timeouts always fall back to NLLB.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config import get_settings
+from app.services.batching import MicroBatcher, _Pending
+from app.services.metrics import STAGE_SECONDS, registry
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = (
+    "Translate the following text from {source} to {target}. "
+    "Reply with only the translation, no explanation."
+)
+BATCH_PROMPT = (
+    "Translate each item's \"text\" from its \"from\" language to its \"to\" language. "
+    "Reply with a JSON object {\"translations\": [...]} holding one translated string per item, "
+    "in the same order, and nothing else."
+)
+
+OPENAI_REQUESTS = registry.counter("vt_openai_requests_total", "OpenAI translation requests by outcome")
+HEDGE_OUTCOMES = registry.counter(
+    "vt_translation_hedge_total", "OpenAI translations by which side answered (remote, local, fallback)"
+)
+
+
+class RemoteTranslationError(Exception):
+    """OpenAI returned nothing usable (error, timeout, or a malformed batch reply)."""
+
+
+@dataclass
+class OpenAIRow:
+    text: str
+    source_lang: str
+    target_lang: str
+
+
+class OpenAIBatcher(MicroBatcher):
+    """
+    Gather rows from all sessions and translate them in one chat completion. Unlike the
+    model batchers, batches don't wait for each other: requests overlap on the pool.
+    """
+
+    def __init__(self, translator: "OpenAITranslator") -> None:
+        settings = get_settings()
+        super().__init__(
+            "openai",
+            window_ms=settings.openai_batch_window_ms,
+            max_batch_size=settings.openai_batch_max_size,
+        )
+        self._translator = translator
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def _run_batch(self, batch: list[_Pending]) -> None:
+        task = asyncio.create_task(self._send(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: list[_Pending]) -> None:
+        rows = [p.item for p in batch]
+        try:
+            results = await self._translator.request(rows)
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        for pending, result in zip(batch, results):
+            self._resolve(pending, result)
+
+
+class OpenAITranslator:
+    """Shared AsyncOpenAI client plus the batching and hedging around it."""
+
+    _instance: Optional["OpenAITranslator"] = None
+
+    def __init__(self) -> None:
+        self._settings = get_settings()
+        self._client: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: set[asyncio.Task] = set()
+        self._batcher = OpenAIBatcher(self)
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.hedged = 0
+        self.outcomes: dict[str, int] = {}
+
+    def _get_client(self) -> Any:
+        """The pooled client, created on first use in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop:
+            return self._client
+        if self._client is not None:
+            self._close_stale(self._client, self._loop)
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        connections = max(self._settings.openai_max_connections, 1)
+        timeout = self._settings.openai_timeout_ms / 1000
+        self._client = AsyncOpenAI(
+            api_key=self._settings.openai_api_key,
+            base_url=self._settings.openai_base_url or None,
+            timeout=timeout,
+            max_retries=0,  # the deadline is the budget; NLLB covers failures
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+                timeout=timeout,
+            ),
+        )
+        self._loop = loop
+        return self._client
+
+    def _close_stale(self, client: Any, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client made in another event loop (its pooled connections belong to it)."""
+        if loop is not None and loop.is_running() and loop is not asyncio.get_running_loop():
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+            return
+        task = asyncio.get_running_loop().create_task(client.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closed)
+
+    def _closed(self, task: asyncio.Task) -> None:
+        self._closing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Closing a stale OpenAI client failed: %s", task.exception())
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def request(self, rows: list[OpenAIRow]) -> list[str]:
+        """One chat completion for `rows` within the deadline; raises RemoteTranslationError."""
+        client = self._get_client()
+        settings = self._settings
+        if len(rows) == 1:
+            row = rows[0]
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPT.format(source=row.source_lang, target=row.target_lang)},
+                {"role": "user", "content": row.text},
+            ]
+            extra: dict = {}
+        else:
+            items = [{"from": r.source_lang, "to": r.target_lang, "text": r.text} for r in rows]
+            messages = [
+                {"role": "system", "content": BATCH_PROMPT},
+                {"role": "user", "content": json.dumps(items, ensure_ascii=False)},
+            ]
+            extra = {"response_format": {"type": "json_object"}}
+
+        started = time.perf_counter()
+        self.requests += 1
+        self.rows += len(rows)
+        try:
+            response = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=settings.openai_model,
+                    messages=messages,
+                    max_tokens=min(500 * len(rows), 4000),
+                    temperature=0,
+                    **extra,
+                ),
+                settings.openai_timeout_ms / 1000,
+            )
+            content = (response.choices[0].message.content or "").strip() if response.choices else ""
+            results = [content] if len(rows) == 1 else self._parse_batch(content, len(rows))
+            if not all(results):
+                raise RemoteTranslationError("empty translation")
+        except asyncio.TimeoutError:
+            self.errors += 1
+            OPENAI_REQUESTS.inc(outcome="timeout")
+            raise RemoteTranslationError(f"no answer within {settings.openai_timeout_ms} ms") from None
+        except RemoteTranslationError:
+            self.errors += 1
+            OPENAI_REQUESTS.inc(outcome="bad_reply")
+            raise
+        except Exception as e:
+            self.errors += 1
+            OPENAI_REQUESTS.inc(outcome="error")
+            raise RemoteTranslationError(str(e)) from e
+        OPENAI_REQUESTS.inc(outcome="ok")
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="openai")
+        return results
+
+    @staticmethod
+    def _parse_batch(content: str, count: int) -> list[str]:
+        try:
+            translations = json.loads(content)["translations"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise RemoteTranslationError(f"malformed batch reply: {e}") from e
+        if not isinstance(translations, list) or len(translations) != count:
+            raise RemoteTranslationError("batch reply has the wrong number of translations")
+        return [str(t).strip() for t in translations]
+
+    async def _remote(self, text: str, source_lang: str, target_lang: str) -> str:
+        row = OpenAIRow(text, source_lang, target_lang)
+        if self._settings.openai_batching:
+            return await self._batcher.submit(row)
+        return (await self.request([row]))[0]
+
+    def _record(self, outcome: str) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        HEDGE_OUTCOMES.inc(winner=outcome)
+
+    async def translate(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        fallback: Callable[[], Awaitable[str]],
+    ) -> str:
+        """
+        Translate via OpenAI; `fallback` (local NLLB) runs as a hedge after OPENAI_HEDGE_MS
+        and whenever OpenAI fails. OpenAI results go to the translation memory as "openai"
+        entries; NLLB results are kept apart, under the local engine.
+        """
+        from app.services.translation_service import get_translation_service
+
+        trans = get_translation_service()
+        cached = trans.lookup(text, source_lang, target_lang, "openai")
+        if cached is not None:
+            return cached
+
+        remote = asyncio.ensure_future(self._remote(text, source_lang, target_lang))
+        local: Optional[asyncio.Future] = None
+        try:
+            hedge_s = self._settings.openai_hedge_ms / 1000
+            if hedge_s > 0:
+                done, _ = await asyncio.wait({remote}, timeout=hedge_s)
+                if not done:
+                    self.hedged += 1
+                    local = asyncio.ensure_future(fallback())
+                    done, _ = await asyncio.wait({remote, local}, return_when=asyncio.FIRST_COMPLETED)
+                    if remote not in done:
+                        if not local.exception():
+                            self._record("local")
+                            return local.result()
+                        await asyncio.wait({remote})  # NLLB failed: OpenAI is all that's left
+            else:
+                await asyncio.wait({remote})
+            if not remote.exception():
+                translated = remote.result()
+                trans.remember(text, source_lang, target_lang, translated, "openai")
+                self._record("remote")
+                return translated
+            logger.warning("OpenAI translation failed, using NLLB: %s", remote.exception())
+            self._record("fallback")
+            if local is not None and local.done() and local.exception():
+                return text
+            return await (local if local is not None else fallback())
+        finally:
+            for task in (remote, local):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "avg_rows_per_request": round(self.rows / self.requests, 2) if self.requests else 0.0,
+            "errors": self.errors,
+            "hedged": self.hedged,
+            "answered_by": dict(self.outcomes),
+            "batcher": self._batcher.stats(),
+        }
+
+
+def get_openai_translator() -> OpenAITranslator:
+    """Singleton OpenAI translator."""
+    if OpenAITranslator._instance is None:
+        OpenAITranslator._instance = OpenAITranslator()
+    return OpenAITranslator._instance
@@ -0,0 +1,441 @@
+"""
+Remote inference (INFERENCE_MODE=remote): this app is a gateway, models run on nodes.
+
+The gateway keeps the WebSocket sessions, VAD and queues; Whisper and NLLB run on
+inference nodes (`python -m app.services.inference_node`), which connect to the gateway
+over TCP and register. Gateways then scale with connections and nodes with model
+compute, and one node can serve several gateways.
+
+Wire format: each frame is an 8-byte header (JSON length, payload length, big-endian
+u32) followed by a JSON message and an optional binary payload (float32 audio for
+transcription jobs). Nodes send `register` once, then `heartbeat` and `result`
+frames; the gateway sends `registered`/`rejected` and `job` frames, plus a `ping` after
+INFERENCE_HEARTBEAT_S without anything else to send. Either side treats a connection
+silent for INFERENCE_HEARTBEAT_TIMEOUT_S as lost: the gateway drops the node and
+re-dispatches its in-flight jobs, the node reconnects.
+"""
+import asyncio
+import dataclasses
+import hmac
+import itertools
+import json
+import logging
+import queue
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.futures import resolve_future
+from app.services.stt_service import TranscriptionResult, Word
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">II")  # JSON length, payload length
+MAX_FRAME_BYTES = 64 * 1024 * 1024  # 30 s of float32 audio is ~2 MB
+POLL_INTERVAL_S = 0.5  # how often waiting jobs are checked for the dispatch timeout
+
+
+# --- framing (shared with app.services.inference_node) ---
+
+def send_frame(sock: socket.socket, message: dict, payload: Any = b"") -> None:
+    """Send one frame; `payload` is any contiguous buffer (bytes, float32 array)."""
+    header = json.dumps(message, separators=(",", ":")).encode()
+    size = memoryview(payload).nbytes
+    sock.sendall(_HEADER.pack(len(header), size) + header)
+    if size:
+        sock.sendall(payload)
+
+
+def recv_frame(sock: socket.socket) -> tuple[dict, bytearray]:
+    """Receive one frame: (message, payload). Raises ConnectionError when the peer is gone."""
+    json_len, payload_len = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if json_len + payload_len > MAX_FRAME_BYTES:
+        raise ConnectionError(f"frame of {json_len + payload_len} bytes exceeds the limit")
+    message = json.loads(_recv_exact(sock, json_len))
+    return message, _recv_exact(sock, payload_len)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytearray:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:])
+        if not k:
+            raise ConnectionError("connection closed")
+        got += k
+    return buf
+
+
+def encode_result(kind: str, value: Any) -> Any:
+    """JSON-safe job result."""
+    if kind == "transcribe":
+        return dataclasses.asdict(value)
+    return value
+
+
+def decode_result(kind: str, value: Any) -> Any:
+    if kind == "transcribe":
+        words = [Word(**w) for w in value.pop("words", [])]
+        return TranscriptionResult(**value, words=words)
+    return value
+
+
+# --- gateway ---
+
+@dataclass(eq=False)
+class _RemoteJob:
+    job_id: int
+    kind: str
+    args: dict
+    payload: Any
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    attempts: int = 0
+    waiting_since: float = field(default_factory=time.monotonic)
+
+
+class _Node:
+    """One registered inference node: its connection, writer thread and in-flight table."""
+
+    def __init__(self, node_id: int, sock: socket.socket, address: str, name: str, slots: int) -> None:
+        self.node_id = node_id
+        self.sock = sock
+        self.address = address
+        self.name = name
+        self.slots = max(slots, 1)
+        self.in_flight: dict[int, _RemoteJob] = {}
+        self.models: Optional[dict] = None  # ModelLoader.status() reported by the node
+        self.ready = False
+        self.connected = True
+        self.dispatched = 0
+        self.completed = 0
+        self.outbox: queue.Queue = queue.Queue()  # (message, payload) frames; None stops the writer
+
+    @property
+    def load(self) -> float:
+        return len(self.in_flight) / self.slots
+
+
+class RemotePool:
+    """
+    Accepts node registrations and dispatches each job to the least-loaded ready node
+    (in-flight jobs per slot). Same async interface as InferencePool. Jobs submitted
+    while no node is ready wait up to INFERENCE_DISPATCH_TIMEOUT_S.
+    """
+
+    _instance: Optional["RemotePool"] = None
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        token: str = "",
+        heartbeat_timeout_s: float = 6.0,
+        dispatch_timeout_s: float = 30.0,
+        max_retries: int = 1,
+        ping_interval_s: float = 2.0,
+    ) -> None:
+        self._token = token
+        self._heartbeat_timeout_s = heartbeat_timeout_s
+        self._ping_interval_s = ping_interval_s
+        self._dispatch_timeout_s = dispatch_timeout_s
+        self._max_retries = max(max_retries, 0)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._node_ids = itertools.count()
+        self._nodes: list[_Node] = []
+        self._waiting: list[_RemoteJob] = []  # no ready node yet
+        self._stopping = False
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.registered = 0
+        self.lost = 0
+        self._server = socket.create_server((host, port))
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, name="inference-gateway", daemon=True).start()
+        threading.Thread(target=self._monitor, name="inference-monitor", daemon=True).start()
+        logger.info("Inference gateway listening for nodes on %s:%d", host, self.port)
+
+    # --- public API (async, called from the event loop) ---
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        language: Optional[str] = None,
+        word_timestamps: bool = False,
+        model_size: Optional[str] = None,
+    ) -> TranscriptionResult:
+        """Transcribe float32 samples on a node; they travel as the frame payload."""
+        args = {
+            "sample_rate": sample_rate, "language": language,
+            "word_timestamps": word_timestamps, "model_size": model_size,
+        }
+        return await self._submit("transcribe", args, np.ascontiguousarray(audio, dtype=np.float32))
+
+    async def translate(self, text: str, source_lang: str, target_lang: str, use_openai: bool = False) -> str:
+        return await self._submit("translate", {
+            "text": text, "source_lang": source_lang, "target_lang": target_lang, "use_openai": use_openai,
+        })
+
+    async def translate_multi(
+        self, text: str, source_lang: str, target_langs: list[str], use_openai: bool = False
+    ) -> dict[str, str]:
+        return await self._submit("translate_multi", {
+            "text": text, "source_lang": source_lang, "target_langs": target_langs, "use_openai": use_openai,
+        })
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": "remote",
+                "port": self.port,
+                "nodes": [
+                    {
+                        "name": n.name, "address": n.address, "slots": n.slots, "ready": n.ready,
+                        "in_flight": len(n.in_flight), "completed": n.completed,
+                    }
+                    for n in self._nodes
+                ],
+                "ready": sum(n.ready for n in self._nodes),
+                "in_flight": sum(len(n.in_flight) for n in self._nodes),
+                "waiting": len(self._waiting),
+                "completed": self.completed,
+                "failed": self.failed,
+                "retries": self.retries,
+                "registered": self.registered,
+                "lost": self.lost,
+            }
+
+    def readiness(self) -> dict:
+        """Same shape as InferencePool.readiness(); ready once any node is."""
+        with self._lock:
+            workers = [
+                {"worker": n.name, "alive": n.connected, **(n.models or {"ready": False, "loading": True})}
+                for n in self._nodes
+            ]
+        return {
+            "ready": any(w["ready"] for w in workers),
+            "loading": not any(w["ready"] for w in workers),
+            "workers": workers,
+        }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop accepting nodes, disconnect them and fail outstanding jobs."""
+        with self._lock:
+            self._stopping = True
+            nodes, self._nodes = self._nodes, []
+            jobs = [job for n in nodes for job in n.in_flight.values()] + self._waiting
+            self._waiting = []
+            for job in jobs:
+                self._finish(job, "error", "inference gateway shut down")
+        self._server.close()
+        for node in nodes:
+            node.connected = False
+            node.outbox.put(None)
+            _close(node.sock)
+
+    # --- dispatch ---
+
+    async def _submit(self, kind: str, args: dict, payload: Any = b"") -> Any:
+        loop = asyncio.get_running_loop()
+        job = _RemoteJob(next(self._ids), kind, args, payload, loop, loop.create_future())
+        with self._lock:
+            if self._stopping:
+                self._finish(job, "error", "inference gateway shut down")
+            else:
+                self._dispatch(job)
+        return await job.future
+
+    def _dispatch(self, job: _RemoteJob) -> None:
+        """Send to the ready node with the lowest load, or park the job (caller holds the lock)."""
+        ready = [n for n in self._nodes if n.ready]
+        if not ready:
+            job.waiting_since = time.monotonic()
+            self._waiting.append(job)
+            return
+        node = min(ready, key=lambda n: (n.load, n.dispatched))  # ties: spread evenly
+        node.dispatched += 1
+        job.attempts += 1
+        node.in_flight[job.job_id] = job
+        node.outbox.put(({"type": "job", "job": job.job_id, "kind": job.kind, "args": job.args}, job.payload))
+
+    def _finish(self, job: _RemoteJob, status: str, value: Any) -> None:
+        """Resolve a job's future from any thread (caller holds the lock)."""
+        job.payload = None
+        if status == "ok":
+            self.completed += 1
+        else:
+            self.failed += 1
+        job.loop.call_soon_threadsafe(resolve_future, job.future, status, value)
+
+    def _monitor(self) -> None:
+        """Fail jobs that found no ready node within the dispatch timeout."""
+        while not self._stopping:
+            time.sleep(POLL_INTERVAL_S)
+            deadline = time.monotonic() - self._dispatch_timeout_s
+            with self._lock:
+                expired = [j for j in self._waiting if j.waiting_since <= deadline or j.future.done()]
+                if not expired:
+                    continue
+                self._waiting = [j for j in self._waiting if j not in expired]
+                for job in expired:
+                    self._finish(job, "error", "no inference node available")  # no-op if the caller gave up
+
+    # --- node connections ---
+
+    def _accept(self) -> None:
+        while not self._stopping:
+            try:
+                sock, addr = self._server.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=self._serve_node, args=(sock, f"{addr[0]}:{addr[1]}"), name="inference-node-reader", daemon=True
+            ).start()
+
+    def _serve_node(self, sock: socket.socket, address: str) -> None:
+        """Reader thread for one node: registration, then heartbeats and results."""
+        sock.settimeout(self._heartbeat_timeout_s)  # silence for this long = node lost
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            message, _ = recv_frame(sock)
+            if message.get("type") != "register" or not hmac.compare_digest(
+                str(message.get("token", "")), self._token
+            ):
+                logger.warning("Rejected inference node %s: bad registration", address)
+                send_frame(sock, {"type": "rejected", "error": "bad token or registration"})
+                _close(sock)
+                return
+        except (OSError, ValueError, ConnectionError) as e:
+            logger.warning("Inference node %s failed to register: %s", address, e)
+            _close(sock)
+            return
+
+        with self._lock:
+            if self._stopping:
+                _close(sock)
+                return
+            node = _Node(next(self._node_ids), sock, address, str(message.get("name") or address), int(message.get("slots", 1)))
+            self._nodes.append(node)
+            self.registered += 1
+            node.outbox.put(({"type": "registered", "node": node.node_id}, b""))  # before any job
+            self._update_models(node, message.get("models"))
+        logger.info("Inference node %s registered from %s (%d slot(s))", node.name, address, node.slots)
+        threading.Thread(target=self._write, args=(node,), name="inference-node-writer", daemon=True).start()
+
+        reason = "connection closed"
+        try:
+            while True:
+                message, _ = recv_frame(sock)
+                kind = message.get("type")
+                with self._lock:
+                    if kind == "heartbeat":
+                        self._update_models(node, message.get("models"))
+                    elif kind == "result":
+                        job = node.in_flight.pop(message["job"], None)
+                        if job is not None:  # None: node was dropped and the job re-dispatched
+                            node.completed += 1
+                            value = message.get("value")
+                            if message.get("status") == "ok":
+                                try:
+                                    value = decode_result(job.kind, value)
+                                except (TypeError, ValueError) as e:
+                                    self._finish(job, "error", f"malformed result: {e}")
+                                    continue
+                            self._finish(job, message.get("status", "error"), value)
+        except socket.timeout:
+            reason = f"no heartbeat for {self._heartbeat_timeout_s:g}s"
+        except (OSError, ValueError, ConnectionError) as e:
+            reason = str(e) or reason
+        self._drop(node, reason)
+
+    def _write(self, node: _Node) -> None:
+        """
+        Writer thread for one node, so a slow link never blocks the event loop. An idle
+        link carries a ping now and then, so the node notices a gateway that went away.
+        """
+        while True:
+            try:
+                item = node.outbox.get(timeout=self._ping_interval_s)
+            except queue.Empty:
+                item = ({"type": "ping"}, b"")
+            if item is None:
+                return
+            message, payload = item
+            try:
+                send_frame(node.sock, message, payload)
+            except OSError as e:
+                self._drop(node, f"send failed: {e}")
+                return
+
+    def _update_models(self, node: _Node, models: Optional[dict]) -> None:
+        """Record a node's model status; dispatch parked jobs once it is ready (caller holds the lock)."""
+        if not models:
+            return
+        was_ready = node.ready
+        node.models = models
+        node.ready = bool(models.get("ready")) and node.connected
+        if node.ready and not was_ready:
+            logger.info("Inference node %s ready", node.name)
+            waiting, self._waiting = self._waiting, []
+            for job in waiting:
+                self._dispatch(job)
+
+    def _drop(self, node: _Node, reason: str) -> None:
+        """Forget a lost node and retry the jobs it held."""
+        with self._lock:
+            if not node.connected:
+                return
+            node.connected = node.ready = False
+            if node in self._nodes:
+                self._nodes.remove(node)
+            if self._stopping:
+                return
+            self.lost += 1
+            logger.warning(
+                "Inference node %s lost (%s) with %d job(s) in flight", node.name, reason, len(node.in_flight)
+            )
+            jobs, node.in_flight = list(node.in_flight.values()), {}
+            for job in jobs:
+                if job.future.done():
+                    continue
+                if job.attempts > self._max_retries:
+                    self._finish(job, "error", "inference node lost")
+                else:
+                    self.retries += 1
+                    self._dispatch(job)
+        node.outbox.put(None)
+        _close(node.sock)
+
+
+def _close(sock: socket.socket) -> None:
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    sock.close()
+
+
+def get_remote_pool() -> RemotePool:
+    """Singleton gateway (INFERENCE_MODE=remote)."""
+    if RemotePool._instance is None:
+        settings = get_settings()
+        RemotePool._instance = RemotePool(
+            settings.inference_gateway_host,
+            settings.inference_gateway_port,
+            settings.inference_token,
+            settings.inference_heartbeat_timeout_s,
+            settings.inference_dispatch_timeout_s,
+            settings.inference_max_retries,
+            settings.inference_heartbeat_s,
+        )
+    return RemotePool._instance
@@ -0,0 +1,67 @@
+"""
+Streaming polyphase resampler (numpy, vectorized).
+Converts client audio at its native rate (e.g. 44.1/48 kHz) to the model rate (16 kHz).
+Filter history and phase carry across chunks, so chunk boundaries add no artifacts.
+"""
+from math import gcd
+
+import numpy as np
+
+TAPS_PER_PHASE = 24  # filter length per polyphase branch (quality vs cost)
+KAISER_BETA = 8.0
+ROLLOFF = 0.92  # cutoff as a fraction of the output Nyquist frequency
+
+
+def pcm16_to_float(pcm: bytes) -> np.ndarray:
+    return np.frombuffer(pcm, dtype=np.int16) * np.float32(1.0 / 32768.0)  # one float32 allocation
+
+
+def float_to_pcm16(audio: np.ndarray) -> bytes:
+    return (np.clip(audio, -1.0, 32767 / 32768) * 32768.0).astype(np.int16).tobytes()
+
+
+class PolyphaseResampler:
+    """Rational-ratio resampler with a windowed-sinc FIR split into `up` phases."""
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = TAPS_PER_PHASE) -> None:
+        g = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self._taps = taps_per_phase
+
+        # Low-pass at the narrower of the two Nyquist bands, in the upsampled domain
+        num_taps = self.up * taps_per_phase
+        cutoff = ROLLOFF / max(self.up, self.down)
+        n = np.arange(num_taps) - (num_taps - 1) / 2
+        h = cutoff * np.sinc(cutoff * n) * np.kaiser(num_taps, KAISER_BETA)
+        h *= self.up / h.sum()  # unity DC gain after zero-stuffing
+        # bank[p, k] = h[p + k * up]: the taps applied to x[base - k] for output phase p
+        self._bank = h.reshape(taps_per_phase, self.up).T.astype(np.float32).copy()
+        self._offsets = np.arange(taps_per_phase)
+        self.reset()
+
+    def reset(self) -> None:
+        self._history = np.zeros(self._taps - 1, dtype=np.float32)
+        self._t = 0  # upsampled-domain index of the next output, relative to the next chunk
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """Resample one chunk of float32 samples; state carries to the next call."""
+        if self.up == self.down:
+            return x
+        ext = np.concatenate((self._history, x.astype(np.float32, copy=False)))
+        end = len(x) * self.up
+        t = np.arange(self._t, end, self.down)
+        self._t = (int(t[-1]) + self.down - end) if len(t) else self._t - end
+        self._history = ext[len(ext) - (self._taps - 1):]
+        if not len(t):
+            return np.zeros(0, dtype=np.float32)
+
+        phase = t % self.up
+        base = t // self.up + (self._taps - 1)  # position of x[t // up] in ext
+        frames = ext[base[:, None] - self._offsets]
+        return np.einsum("ij,ij->i", frames, self._bank[phase]).astype(np.float32, copy=False)
+
+    def process_pcm16(self, pcm: bytes) -> bytes:
+        return float_to_pcm16(self.process(pcm16_to_float(pcm)))
@@ -0,0 +1,300 @@
+"""
+Cross-session utterance scheduler: one queue in front of STT + translation.
+
+Every queued utterance asks for one of SCHEDULER_SLOTS processing slots. Its deadline
+is the end of its speech plus SCHEDULER_SLO_MS. When a slot frees up:
+- fairness: only each session's oldest waiting utterance is a candidate, and sessions
+  holding fewer slots go first, so one talker cannot take every slot;
+- deadline order: the candidate with the earliest deadline runs, unless the shortest
+  one can finish first without making it late (shortest-first cuts the average wait),
+  or it will be late anyway and another one can still make its deadline (salvage);
+- utterances that will miss the deadline anyway run on the fastest Whisper tier
+  (`shorten`), and ones already SCHEDULER_DROP_LATE_MS past it are dropped.
+Live sessions cover utterances and streaming passes. Best-effort shares (file
+translation) only get a slot when no live session is waiting, hold at most half of
+the slots, and are never shortened, dropped or counted against the SLO.
+Service time is estimated from the running real-time factor of finished utterances.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config import get_settings
+from app.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+RUN = "run"
+SHORTEN = "shorten"  # fastest Whisper tier
+DROP = "drop"
+
+INITIAL_RTF = 0.3  # service seconds per audio second until measured
+RTF_SMOOTHING = 0.2  # weight of the newest utterance in the running RTF
+BEST_EFFORT_SLOT_SHARE = 0.5  # most of the slots best-effort shares may hold at once
+
+SCHEDULER_WAIT = registry.histogram("vt_scheduler_wait_seconds", "Time utterances waited for a processing slot")
+SLO_MISSES = registry.counter("vt_slo_misses_total", "Utterances that missed the latency SLO, by action")
+SCHEDULER_PICKS = registry.counter("vt_scheduler_picks_total", "Scheduling decisions by reason")
+
+
+class SessionShare:
+    """One session's requests and slots, with its wait and SLO counters."""
+
+    def __init__(self, name: str, best_effort: bool = False) -> None:
+        self.name = name
+        self.best_effort = best_effort
+        self.waiting: list["_Request"] = []
+        self.active = 0  # slots held
+        self.served = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.slo_misses = 0
+        self.shortened = 0
+        self.dropped = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "session": self.name,
+            "best_effort": self.best_effort,
+            "waiting": len(self.waiting),
+            "active": self.active,
+            "served": self.served,
+            "avg_wait_ms": round(1000 * self.total_wait_s / self.served, 1) if self.served else None,
+            "max_wait_ms": round(1000 * self.max_wait_s, 1),
+            "slo_misses": self.slo_misses,
+            "shortened": self.shortened,
+            "dropped": self.dropped,
+        }
+
+
+@dataclass(eq=False)
+class _Request:
+    share: SessionShare
+    seq: int
+    audio_s: float
+    deadline: float
+    future: asyncio.Future
+    droppable: bool = True
+    requested_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class Grant:
+    """Permission to process one utterance; hand it back with `release()` unless dropped."""
+
+    action: str
+    share: SessionShare
+    audio_s: float
+    deadline: float
+    wait_s: float
+    started_at: float
+
+    @property
+    def late_s(self) -> float:
+        return self.started_at - self.deadline
+
+
+class UtteranceScheduler:
+    """Deadline-ordered, per-session-fair slots for utterance processing (single event loop)."""
+
+    _instance: Optional["UtteranceScheduler"] = None
+
+    def __init__(self, slots: int, slo_s: float, can_shorten: bool = False, drop_late_s: float = 0.0) -> None:
+        self.slots = max(slots, 1)
+        self.slo_s = slo_s
+        self.can_shorten = can_shorten
+        self.drop_late_s = drop_late_s  # 0 = never drop
+        self.busy = 0
+        self.best_effort_slots = max(int(self.slots * BEST_EFFORT_SLOT_SHARE), 1)
+        self.rtf = INITIAL_RTF
+        self._sessions: dict[str, SessionShare] = {}
+        self._names = itertools.count()
+        self._closed = SessionShare("closed")  # totals of finished sessions
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(s.waiting) for s in self._sessions.values())
+
+    def open_session(self, label: str = "session", best_effort: bool = False) -> SessionShare:
+        share = SessionShare(f"{label}-{next(self._names)}", best_effort)
+        self._sessions[share.name] = share
+        return share
+
+    def close_session(self, share: SessionShare) -> None:
+        """Forget a session; its waiting requests are cancelled with it."""
+        for request in share.waiting:
+            request.future.cancel()
+        share.waiting.clear()
+        self._sessions.pop(share.name, None)
+        for counter in ("served", "total_wait_s", "slo_misses", "shortened", "dropped"):
+            setattr(self._closed, counter, getattr(self._closed, counter) + getattr(share, counter))
+        self._closed.max_wait_s = max(self._closed.max_wait_s, share.max_wait_s)
+
+    def estimate(self, audio_s: float) -> float:
+        """Expected processing seconds for an utterance."""
+        return self.rtf * audio_s
+
+    async def acquire(
+        self, share: SessionShare, seq: int, audio_s: float, speech_ended_at: float, droppable: bool = True
+    ) -> Grant:
+        """
+        Wait for a slot. A DROP grant holds no slot; any other must be released.
+        Non-droppable requests (final streaming passes) are at most shortened.
+        """
+        request = _Request(
+            share, seq, audio_s, speech_ended_at + self.slo_s,
+            asyncio.get_running_loop().create_future(), droppable,
+        )
+        share.waiting.append(request)
+        self._pump()
+        try:
+            return await request.future
+        except asyncio.CancelledError:
+            if request in share.waiting:
+                share.waiting.remove(request)
+            elif request.future.done() and not request.future.cancelled():
+                grant = request.future.result()  # granted as the caller was cancelled
+                if grant.action != DROP:
+                    self.release(grant)
+            raise
+
+    def release(self, grant: Grant) -> None:
+        """Return the slot; records the real-time factor and whether the SLO was met."""
+        now = time.perf_counter()
+        self.busy = max(self.busy - 1, 0)
+        grant.share.active = max(grant.share.active - 1, 0)
+        if grant.audio_s > 0:
+            rtf = (now - grant.started_at) / grant.audio_s
+            self.rtf += RTF_SMOOTHING * (rtf - self.rtf)
+        if now > grant.deadline and not grant.share.best_effort:
+            grant.share.slo_misses += 1
+            SLO_MISSES.inc(action=grant.action)
+        self._pump()
+
+    def _pump(self) -> None:
+        """Hand free slots to waiting requests, best first."""
+        while self.busy < self.slots:
+            picked = self._pick()
+            if picked is None:
+                return
+            request, reason = picked
+            request.share.waiting.remove(request)
+            if request.future.done():  # caller gave up
+                continue
+            SCHEDULER_PICKS.inc(reason=reason)
+            now = time.perf_counter()
+            action = RUN
+            if request.share.best_effort:
+                pass
+            elif request.droppable and self.drop_late_s > 0 and now - request.deadline >= self.drop_late_s:
+                action = DROP
+            elif self.can_shorten and now + self.estimate(request.audio_s) > request.deadline:
+                action = SHORTEN
+            grant = Grant(action, request.share, request.audio_s, request.deadline, now - request.requested_at, now)
+            self._record(grant)
+            if action != DROP:
+                self.busy += 1
+                request.share.active += 1
+            request.future.set_result(grant)
+
+    def _pick(self) -> Optional[tuple[_Request, str]]:
+        heads = [s.waiting[0] for s in self._sessions.values() if s.waiting and not s.best_effort]
+        if not heads:
+            # Best effort: only when no live session waits, and never all of the slots
+            if sum(s.active for s in self._sessions.values() if s.best_effort) >= self.best_effort_slots:
+                return None
+            heads = [s.waiting[0] for s in self._sessions.values() if s.waiting and s.best_effort]
+            if not heads:
+                return None
+            return min(heads, key=lambda r: (r.share.active, r.deadline)), "best_effort"
+        fewest = min(r.share.active for r in heads)
+        heads = [r for r in heads if r.share.active == fewest]
+        now = time.perf_counter()
+        urgent = min(heads, key=lambda r: r.deadline)
+        if now + self.estimate(urgent.audio_s) > urgent.deadline:
+            # Late anyway: let an utterance that can still make its deadline go first
+            savable = [r for r in heads if now + self.estimate(r.audio_s) <= r.deadline]
+            if savable:
+                return min(savable, key=lambda r: r.deadline), "salvage"
+            return urgent, "deadline"
+        shortest = min(heads, key=lambda r: r.audio_s)
+        if shortest is not urgent:
+            finish = now + self.estimate(shortest.audio_s) + self.estimate(urgent.audio_s)
+            if finish <= urgent.deadline:
+                return shortest, "short_first"
+        return urgent, "deadline"
+
+    def _record(self, grant: Grant) -> None:
+        share = grant.share
+        SCHEDULER_WAIT.observe(grant.wait_s, share="best_effort" if share.best_effort else "live")
+        if grant.action == DROP:
+            share.dropped += 1
+            share.slo_misses += 1
+            SLO_MISSES.inc(action=DROP)
+            logger.warning("Dropping utterance from %s: %.1fs past its deadline", share.name, grant.late_s)
+            return
+        share.served += 1
+        share.total_wait_s += grant.wait_s
+        share.max_wait_s = max(share.max_wait_s, grant.wait_s)
+        if grant.action == SHORTEN:
+            share.shortened += 1
+
+    def stats(self) -> dict:
+        sessions = list(self._sessions.values())
+        everyone = [*sessions, self._closed]
+        served = sum(s.served for s in everyone)
+        return {
+            "slots": self.slots,
+            "busy": self.busy,
+            "waiting": self.waiting,
+            "slo_ms": round(self.slo_s * 1000),
+            "rtf": round(self.rtf, 3),
+            "served": served,
+            "avg_wait_ms": round(1000 * sum(s.total_wait_s for s in everyone) / served, 1) if served else None,
+            "max_wait_ms": round(1000 * max(s.max_wait_s for s in everyone), 1),
+            "slo_misses": sum(s.slo_misses for s in everyone),
+            "shortened": sum(s.shortened for s in everyone),
+            "dropped": sum(s.dropped for s in everyone),
+            "sessions": [s.as_dict() for s in sessions],
+        }
+
+
+def get_scheduler() -> Optional[UtteranceScheduler]:
+    """Process-wide scheduler, or None when SCHEDULER_ENABLED is off."""
+    settings = get_settings()
+    if not settings.scheduler_enabled:
+        return None
+    if UtteranceScheduler._instance is None:
+        from app.services.whisper_tiers import get_tier_policy
+
+        UtteranceScheduler._instance = UtteranceScheduler(
+            settings.scheduler_slots,
+            settings.scheduler_slo_ms / 1000.0,
+            can_shorten=settings.scheduler_shorten and get_tier_policy() is not None,
+            drop_late_s=settings.scheduler_drop_late_ms / 1000.0,
+        )
+    return UtteranceScheduler._instance
+
+
+def _per_session(counter: str) -> list[tuple[dict, float]]:
+    scheduler = UtteranceScheduler._instance
+    if scheduler is None:
+        return []
+    return [({"session": s.name}, getattr(s, counter)) for s in list(scheduler._sessions.values())]
+
+
+registry.gauge(
+    "vt_scheduler_waiting", "Utterances waiting for a processing slot",
+    lambda: UtteranceScheduler._instance.waiting if UtteranceScheduler._instance is not None else 0,
+)
+registry.gauge(
+    "vt_scheduler_session_slo_misses", "SLO misses of each open session",
+    lambda: _per_session("slo_misses"),
+)
+registry.gauge(
+    "vt_scheduler_session_dropped", "Utterances dropped past their deadline, per open session",
+    lambda: _per_session("dropped"),
+)
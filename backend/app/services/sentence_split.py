@@ -0,0 +1,114 @@
+"""
+Split transcripts into sentences and clauses before NLLB, and join the translations back.
+
+NLLB is trained on single sentences: long run-on utterances (e.g. a 6 s force-flush)
+decode slowly and can loop. Sentences end at script-specific punctuation (danda for
+Devanagari/Bengali/Gurmukhi/Odia, the Urdu full stop, CJK full-width stops, Latin
+.!?). A sentence longer than the piece limit is split again at clause punctuation,
+then at word boundaries; scripts without spaces are cut at the limit.
+"""
+import re
+
+# Sentence-final punctuation, optionally followed by closing quotes or brackets.
+# ".", "!" and "?" (also used by Tamil, Telugu, Kannada, Malayalam, Gujarati, Cyrillic)
+# only end a sentence before whitespace; full-width CJK stops need no space.
+_CLOSERS = "\"'”’»)\\]"
+_SPACED_END = re.compile(rf"[.!?…।॥۔؟][{_CLOSERS}]*\s+")
+_CJK_END = re.compile(rf"[。！？][{_CLOSERS}]*\s*")
+# Clause punctuation: Latin, Arabic/Urdu and CJK commas, semicolons, colons; spaced dashes
+_CLAUSE = re.compile(r"[,;:،؛]\s+|[、，；：]\s*|\s+[-–—]\s+")
+
+# Words ending in "." that rarely end a sentence
+_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "st", "sr", "jr", "vs", "etc", "approx", "dept", "govt",
+    "inc", "ltd", "fig", "smt", "shri",
+})
+_INITIALS = re.compile(r"^(?:[^\W\d_]\.)*[^\W\d_]$")  # "a", "u.s", "e.g"
+# Languages written without spaces between words or sentences
+_NO_SPACE_LANGS = frozenset({"zh", "ja"})
+MIN_PIECE_CHARS = 12  # shorter fragments ("Yes.", "OK,") stay attached to a neighbour
+MIN_PIECE_CHARS_NO_SPACE = 4  # CJK packs a sentence into a few characters
+
+
+def _is_abbreviation(text: str, end: int) -> bool:
+    """True if the "." at text[end] closes an abbreviation or an initial ("U.S.", "Dr.")."""
+    start = end
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    word = text[start:end].lower().lstrip("\"'(“‘")
+    return word in _ABBREVIATIONS or bool(_INITIALS.match(word))
+
+
+def _cut(text: str, pattern: re.Pattern, check_abbreviations: bool = False) -> list[str]:
+    pieces, start = [], 0
+    for match in pattern.finditer(text):
+        if check_abbreviations and text[match.start()] == "." and _is_abbreviation(text, match.start()):
+            continue
+        pieces.append(text[start:match.end()].strip())
+        start = match.end()
+    pieces.append(text[start:].strip())
+    return [p for p in pieces if p]
+
+
+def split_sentences(text: str) -> list[str]:
+    """Sentences in `text`, punctuation kept with the sentence it ends."""
+    sentences = []
+    for part in _cut(text, _SPACED_END, check_abbreviations=True):
+        sentences.extend(_cut(part, _CJK_END))
+    return sentences
+
+
+def _pack(parts: list[str], max_chars: int, sep: str) -> list[str]:
+    """Greedily join consecutive parts while they fit in max_chars."""
+    pieces: list[str] = []
+    for part in parts:
+        if pieces and len(pieces[-1]) + len(sep) + len(part) <= max_chars:
+            pieces[-1] = pieces[-1] + sep + part
+        else:
+            pieces.append(part)
+    return pieces
+
+
+def _split_long(sentence: str, max_chars: int, sep: str) -> list[str]:
+    """Clauses of an over-long sentence, then words, then a hard cut as a last resort."""
+    pieces = []
+    for clause in _pack(_cut(sentence, _CLAUSE), max_chars, sep):
+        if len(clause) <= max_chars:
+            pieces.append(clause)
+        elif " " in clause.strip():
+            pieces.extend(_pack(clause.split(), max_chars, " "))
+        else:
+            pieces.extend(clause[i:i + max_chars] for i in range(0, len(clause), max_chars))
+    return pieces
+
+
+def split_for_translation(text: str, lang: str, max_chars: int) -> list[str]:
+    """
+    Pieces of `text` to translate separately: one per sentence, over-long sentences
+    split at clauses/words so no piece exceeds `max_chars`. `max_chars` <= 0 disables.
+    """
+    text = text.strip()
+    if max_chars <= 0 or not text:
+        return [text]
+    sep = joiner(lang)
+    min_chars = MIN_PIECE_CHARS if sep else MIN_PIECE_CHARS_NO_SPACE
+    pieces: list[str] = []
+    for sentence in split_sentences(text):
+        parts = [sentence] if len(sentence) <= max_chars else _split_long(sentence, max_chars, sep)
+        for part in parts:
+            # Fold fragments like "Yes." into the previous piece rather than translating them alone
+            if pieces and (len(part) < min_chars or len(pieces[-1]) < min_chars) \
+                    and len(pieces[-1]) + len(sep) + len(part) <= max_chars:
+                pieces[-1] = pieces[-1] + sep + part
+            else:
+                pieces.append(part)
+    return pieces or [text]
+
+
+def joiner(lang: str) -> str:
+    """Separator between sentences in `lang`."""
+    return "" if lang in _NO_SPACE_LANGS else " "
+
+
+def join_pieces(pieces: list[str], lang: str) -> str:
+    return joiner(lang).join(p.strip() for p in pieces if p.strip())
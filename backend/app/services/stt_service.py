@@ -3,13 +3,32 @@ Speech-to-Text service using faster-whisper.
 Processes audio chunks with automatic language detection.
 """
 import logging
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+import numpy as np
 
 from app.config import get_settings
+from app.services.audio_buffer import PCMLike, as_float32
 
 logger = logging.getLogger(__name__)
 
+WHISPER_WINDOW_S = 30  # Whisper encoder input length
+WHISPER_MAX_TOKENS = 448  # Whisper decoder context
+NO_SPEECH_THRESHOLD = 0.6  # Drop rows Whisper thinks are silence
+MIN_SAMPLES = 500  # shorter audio isn't worth a Whisper pass
+
+Audio = Union[np.ndarray, PCMLike]  # float32 samples in [-1, 1] (session buffer views) or PCM16
+
+
+@dataclass
+class Word:
+    """A transcribed word with times (seconds) relative to the start of the audio."""
+
+    start: float
+    end: float
+    text: str
+
 
 @dataclass
 class TranscriptionResult:
@@ -18,6 +37,9 @@ class TranscriptionResult:
     text: str
     detected_language: Optional[str]
     language_probability: Optional[float]
+    words: list[Word] = field(default_factory=list)  # only with word_timestamps=True
+    avg_logprob: Optional[float] = None  # decoder confidence (mean token log-prob)
+    model: Optional[str] = None  # Whisper size that produced it (tiering)
 
 
 class STTService:
@@ -36,32 +58,42 @@ class STTService:
         from app.services.model_loader import ModelLoader
         self._model = ModelLoader.get_instance().whisper_model
 
+    def _model_for(self, model_size: Optional[str]) -> tuple[Any, str]:
+        """(model, size) for a tier; the default model when the tier is unavailable."""
+        self._load_model()
+        default = self._settings.whisper_model_size
+        if model_size and model_size != default:
+            from app.services.model_loader import ModelLoader
+            model = ModelLoader.get_instance().whisper_model_for(model_size)
+            if model is not None:
+                return model, model_size
+        return self._model, default
 
     def transcribe(
         self,
-        audio_bytes: bytes,
+        audio: Audio,
         sample_rate: int = 16000,
         language: Optional[str] = None,
+        word_timestamps: bool = False,
+        model_size: Optional[str] = None,
     ) -> TranscriptionResult:
         """
-        Transcribe audio bytes. Auto-detect language if language is None.
+        Transcribe float32 samples (used as-is, no copy) or PCM16 bytes. Auto-detect
+        language if language is None. With word_timestamps, the result also carries
+        per-word times. `model_size` picks a Whisper tier (default: WHISPER_MODEL_SIZE).
         """
-        self._load_model()
-        if not audio_bytes or len(audio_bytes) < 1000:
+        model, size = self._model_for(model_size)
+        audio_float = as_float32(audio)
+        if len(audio_float) < MIN_SAMPLES:
             return TranscriptionResult(
                 text="",
                 detected_language=language,
                 language_probability=None,
+                model=size,
             )
 
-        import numpy as np
-
-        # Convert bytes to float32 mono
-        audio_array = np.frombuffer(audio_bytes, dtype=np.int16)
-        audio_float = audio_array.astype(np.float32) / 32768.0
-
         try:
-            segments, info = self._model.transcribe(
+            segments, info = model.transcribe(
                 audio_float,
                 language=language,
                 task="transcribe",
@@ -70,15 +102,29 @@ class STTService:
                 vad_filter=False,
                 # vad_parameters=dict(min_silence_duration_ms=300, speech_pad_ms=100, threshold=0.5),
                 condition_on_previous_text=False,
+                word_timestamps=word_timestamps,
             )
+            segments = list(segments)
             detected_lang = info.language
             lang_prob = info.language_probability
             text_parts = [s.text.strip() for s in segments if s.text.strip()]
             text = " ".join(text_parts).strip()
+            avg_logprob = (
+                sum(s.avg_logprob for s in segments) / len(segments) if segments else None
+            )
+            words = [
+                Word(start=w.start, end=w.end, text=w.word.strip())
+                for s in segments
+                for w in (s.words or [])
+                if w.word.strip()
+            ]
             return TranscriptionResult(
                 text=text,
                 detected_language=detected_lang,
                 language_probability=lang_prob,
+                words=words,
+                avg_logprob=avg_logprob,
+                model=size,
             )
         except Exception as e:
             logger.exception("Transcription failed: %s", e)
@@ -86,8 +132,97 @@ class STTService:
                 text="",
                 detected_language=language,
                 language_probability=None,
+                model=size,
             )
 
+    def transcribe_batch(
+        self,
+        audio_list: list[Audio],
+        sample_rate: int = 16000,
+        languages: Optional[list[Optional[str]]] = None,
+        model_size: Optional[str] = None,
+    ) -> list[TranscriptionResult]:
+        """
+        Transcribe several utterances in one padded encoder + decoder pass.
+        Each utterance gets its own language detection unless `languages` pins it.
+        Utterances longer than one Whisper window fall back to `transcribe`.
+        """
+        model, size = self._model_for(model_size)
+        languages = languages or [None] * len(audio_list)
+        results = [
+            TranscriptionResult(text="", detected_language=lang, language_probability=None, model=size)
+            for lang in languages
+        ]
+
+        max_samples = WHISPER_WINDOW_S * sample_rate
+        rows: list[tuple[int, np.ndarray]] = []
+        for i, item in enumerate(audio_list):
+            audio = as_float32(item)
+            if len(audio) < MIN_SAMPLES:
+                continue
+            if len(audio) > max_samples:
+                results[i] = self.transcribe(
+                    audio, sample_rate=sample_rate, language=languages[i], model_size=size
+                )
+                continue
+            rows.append((i, audio))
+        if not rows:
+            return results
+
+        try:
+            from faster_whisper.audio import pad_or_trim
+            from faster_whisper.tokenizer import Tokenizer
+
+            features = np.stack([pad_or_trim(model.feature_extractor(audio)) for _, audio in rows])
+            encoder_output = model.encode(features)
+
+            # Detect language only for rows that need it (one pass over the batch)
+            detected: dict[int, tuple[str, float]] = {}
+            if any(languages[i] is None for i, _ in rows):
+                for (i, _), probs in zip(rows, model.model.detect_language(encoder_output)):
+                    token, prob = probs[0]
+                    detected[i] = (token[2:-2], prob)
+
+            prompts = []
+            tokenizers = []
+            for i, _ in rows:
+                lang, _prob = detected.get(i, (languages[i], None))
+                tokenizer = Tokenizer(
+                    model.hf_tokenizer,
+                    model.model.is_multilingual,
+                    task="transcribe",
+                    language=lang,
+                )
+                tokenizers.append(tokenizer)
+                prompts.append(model.get_prompt(tokenizer, previous_tokens=[], without_timestamps=True))
+
+            outputs = model.model.generate(
+                encoder_output,
+                prompts,
+                beam_size=1,
+                max_length=WHISPER_MAX_TOKENS,
+                suppress_blank=True,
+                suppress_tokens=[-1],
+                return_scores=True,
+                return_no_speech_prob=True,
+            )
+            for (i, _), tokenizer, out in zip(rows, tokenizers, outputs):
+                lang, prob = detected.get(i, (languages[i], None))
+                text = ""
+                if out.no_speech_prob < NO_SPEECH_THRESHOLD:
+                    text = tokenizer.decode(out.sequences_ids[0]).strip()
+                results[i] = TranscriptionResult(
+                    text=text,
+                    detected_language=lang,
+                    language_probability=prob,
+                    # With length_penalty=1 the score is the length-normalized log-prob
+                    avg_logprob=out.scores[0] if out.scores else None,
+                    model=size,
+                )
+        except Exception as e:
+            logger.exception("Batched transcription failed: %s", e)
+        return results
+
 
 def get_stt_service() -> STTService:
     """Singleton STT service."""
@@ -0,0 +1,161 @@
+"""
+Translation memory: bounded LRU cache of (normalized text, source, target, engine) ->
+translation. Entries are kept per engine so an NLLB result (hedge or fallback) is never
+served where an OpenAI one was asked for. Optional TTL and an optional JSON-lines file
+so a warm cache survives restarts.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_OVERHEAD_BYTES = 200  # rough per-entry cost of the tuple, key and dict slot
+LOCAL_ENGINE = "nllb"  # PyTorch and CTranslate2 NLLB share entries
+
+
+def normalize_text(text: str) -> str:
+    """Cache key form: NFKC, case-folded, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class TranslationCache:
+    """Thread-safe LRU cache; used from executor threads and the event loop."""
+
+    _instance: Optional["TranslationCache"] = None
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int = 0,
+        ttl_s: float = 0,
+        path: Optional[str] = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_s = ttl_s
+        self._path = path
+        self._data: OrderedDict[tuple[str, str, str, str], tuple[str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def _size(key: tuple[str, str, str, str], value: str) -> int:
+        return len(key[0].encode()) + len(value.encode()) + _ENTRY_OVERHEAD_BYTES
+
+    def get(self, text: str, source_lang: str, target_lang: str, engine: str = LOCAL_ENGINE) -> Optional[str]:
+        key = (normalize_text(text), source_lang, target_lang, engine)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at, size = entry
+            if self._ttl_s and time.time() - stored_at > self._ttl_s:
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(
+        self, text: str, source_lang: str, target_lang: str, translated: str, engine: str = LOCAL_ENGINE
+    ) -> None:
+        self._put((normalize_text(text), source_lang, target_lang, engine), translated, time.time())
+
+    def _put(self, key: tuple[str, str, str, str], value: str, stored_at: float) -> None:
+        size = self._size(key, value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (value, stored_at, size)
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self._max_entries
+                or (self._max_bytes and self._bytes > self._max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def load(self) -> None:
+        """Load entries from the persistence file, oldest first so LRU order is kept."""
+        if not self._path or not os.path.exists(self._path):
+            return
+        loaded = 0
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        # Rows without an engine (older files) are skipped: it can't be told
+                        text, src, tgt, engine, value, stored_at = json.loads(line)
+                    except ValueError:
+                        continue
+                    if self._ttl_s and time.time() - stored_at > self._ttl_s:
+                        continue
+                    self._put((text, src, tgt, engine), value, stored_at)
+                    loaded += 1
+            logger.info("Loaded %d cached translations from %s", loaded, self._path)
+        except OSError as e:
+            logger.warning("Could not load translation cache: %s", e)
+
+    def save(self) -> None:
+        """Write entries to the persistence file (atomic replace)."""
+        if not self._path:
+            return
+        with self._lock:
+            entries = [(*key, value, stored_at) for key, (value, stored_at, _) in self._data.items()]
+        tmp_path = f"{self._path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self._path)
+            logger.info("Saved %d cached translations to %s", len(entries), self._path)
+        except OSError as e:
+            logger.warning("Could not save translation cache: %s", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def get_translation_cache() -> Optional[TranslationCache]:
+    """Singleton translation cache, or None when disabled."""
+    settings = get_settings()
+    if settings.translation_cache_size <= 0:
+        return None
+    if TranslationCache._instance is None:
+        TranslationCache._instance = TranslationCache(
+            max_entries=settings.translation_cache_size,
+            max_bytes=int(settings.translation_cache_max_mb * 1024 * 1024),
+            ttl_s=settings.translation_cache_ttl_s,
+            path=settings.translation_cache_path,
+        )
+    return TranslationCache._instance
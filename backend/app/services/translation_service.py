@@ -1,15 +1,38 @@
 """
 Translation service: NLLB-200 for multilingual (Indian languages) with optional OpenAI fallback.
 Uses model + tokenizer directly (no pipeline) for dynamic language pairs.
+NLLB runs either on PyTorch (engine "nllb") or on CTranslate2 int8 (engine "ct2").
+Text is split into sentences first (see sentence_split); the pieces decode as
+length-bucketed batches, each with a generation budget sized from its source length.
 """
 import logging
+import threading
+from collections import defaultdict
 from typing import Optional
 
 from app.config import get_settings
 from app.services.language_codes import to_nllb_code
+from app.services.sentence_split import join_pieces, split_for_translation
+from app.services.translation_cache import LOCAL_ENGINE, get_translation_cache
 
 logger = logging.getLogger(__name__)
 
+MAX_TOKENS = 512  # NLLB's position limit: truncation and the decode budget cap
+
+
+def _length_buckets(lengths: list[int]) -> list[list[int]]:
+    """
+    Indices of `lengths` grouped into decode batches, longest first. A bucket only takes
+    pieces at least half as long as its longest, so short rows don't pad to long ones.
+    """
+    buckets: list[list[int]] = []
+    for k in sorted(range(len(lengths)), key=lambda k: lengths[k], reverse=True):
+        if buckets and 2 * lengths[k] >= lengths[buckets[-1][0]]:
+            buckets[-1].append(k)
+        else:
+            buckets.append([k])
+    return buckets
+
 
 class TranslationService:
     """Translate text using NLLB or OpenAI."""
@@ -21,7 +44,13 @@ class TranslationService:
         self._model = None
         self._tokenizer = None
         self._device = None
+        self._translator = None  # ctranslate2.Translator when translation_engine == "ct2"
+        self._use_ct2 = self._settings.translation_engine == "ct2"
+        # tokenizer.src_lang is shared state; guard it across executor threads
+        self._tokenizer_lock = threading.Lock()
         self._openai_available = bool(self._settings.openai_api_key)
+        self._openai_client = None  # long-lived, for synchronous callers (see openai_translator)
+        self._cache = get_translation_cache()
 
     def _load_nllb(self) -> None:
         if self._model is not None and self._tokenizer is not None:
@@ -30,10 +59,67 @@ class TranslationService:
         from app.services.model_loader import ModelLoader
         self._model, self._tokenizer, self._device = ModelLoader.get_instance().nllb_components
 
+    def _load_ct2(self) -> None:
+        if self._translator is not None and self._tokenizer is not None:
+            return
+
+        from app.services.model_loader import ModelLoader
+        self._translator, self._tokenizer = ModelLoader.get_instance().ct2_components
+
+    def _pieces(self, text: str, source_lang: str) -> list[str]:
+        return split_for_translation(text, source_lang, self._settings.translation_split_chars)
+
+    def _decode_budget(self, source_tokens: int) -> int:
+        """Max new tokens for a piece of `source_tokens`: translations rarely run much longer."""
+        s = self._settings
+        budget = int(source_tokens * s.translation_max_new_tokens_ratio) + s.translation_max_new_tokens_extra
+        return max(1, min(budget, MAX_TOKENS))
+
+    def translate_ct2_rows(self, rows: list[tuple[str, str, str]]) -> list[str]:
+        """
+        Translate (text, source_lang, target_lang) rows with CTranslate2: every row is split
+        into sentences and all pieces decode in length buckets, each after its own
+        target-language prefix token. Rows that can't be translated come back unchanged.
+        """
+        self._load_ct2()
+        results = [text for text, _, _ in rows]
+        pieces: list[tuple[int, str, list[str], str]] = []  # (row, text, tokens, target code)
+        try:
+            with self._tokenizer_lock:
+                for i, (text, source_lang, target_lang) in enumerate(rows):
+                    src_code = to_nllb_code(source_lang)
+                    tgt_code = to_nllb_code(target_lang)
+                    if not src_code or not tgt_code or source_lang == target_lang or not text.strip():
+                        continue
+                    self._tokenizer.src_lang = src_code
+                    for piece in self._pieces(text, source_lang):
+                        ids = self._tokenizer(piece, truncation=True, max_length=MAX_TOKENS)["input_ids"]
+                        pieces.append((i, piece, self._tokenizer.convert_ids_to_tokens(ids), tgt_code))
+            if not pieces:
+                return results
+            translated = [piece for _, piece, _, _ in pieces]
+            for bucket in _length_buckets([len(tokens) for _, _, tokens, _ in pieces]):
+                outputs = self._translator.translate_batch(
+                    [pieces[k][2] for k in bucket],
+                    target_prefix=[[pieces[k][3]] for k in bucket],
+                    beam_size=self._settings.ct2_beam_size,
+                    max_decoding_length=self._decode_budget(len(pieces[bucket[0]][2])) + 1,  # + prefix
+                )
+                for k, output in zip(bucket, outputs):
+                    tokens = output.hypotheses[0][1:]  # drop the target-language prefix
+                    ids = self._tokenizer.convert_tokens_to_ids(tokens)
+                    translated[k] = self._tokenizer.decode(ids, skip_special_tokens=True).strip() or translated[k]
+            parts: dict[int, list[str]] = defaultdict(list)
+            for (i, _, _, _), text in zip(pieces, translated):
+                parts[i].append(text)
+            for i, row_parts in parts.items():
+                results[i] = join_pieces(row_parts, rows[i][2])
+        except Exception as e:
+            logger.warning("CTranslate2 translate failed: %s", e)
+        return results
 
     def translate_nllb(self, text: str, source_lang: str, target_lang: str) -> str:
         """Translate using NLLB-200 (model + tokenizer, dynamic language pair)."""
-        self._load_nllb()
         src_code = to_nllb_code(source_lang)
         tgt_code = to_nllb_code(target_lang)
         if not src_code or not tgt_code:
@@ -41,44 +127,156 @@ class TranslationService:
             return text
         if source_lang == target_lang:
             return text
+        # One row may still be several sentences: same length-bucketed path as batches
+        return self.translate_nllb_batch([text], [source_lang], target_lang)[0]
+
+    def translate_nllb_batch(
+        self, texts: list[str], source_langs: list[str], target_lang: str
+    ) -> list[str]:
+        """
+        Translate many texts into one target language. Texts are split into sentences and
+        the pieces run as padded `generate` calls grouped by length, each with a
+        `max_new_tokens` budget from its longest piece. Rows may have different source
+        languages; each is tokenized with its own src_lang.
+        """
+        self._load_nllb()
+        tgt_code = to_nllb_code(target_lang)
+        results = list(texts)
+        if not tgt_code:
+            logger.warning("Unsupported target language for NLLB: %s", target_lang)
+            return results
+
+        pieces: list[tuple[int, str, list[int]]] = []  # (row, text, input ids)
         try:
-            self._tokenizer.src_lang = src_code
-            forced_bos_id = self._tokenizer.convert_tokens_to_ids(tgt_code)
-            inputs = self._tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-            )
+            with self._tokenizer_lock:
+                for i, (text, source_lang) in enumerate(zip(texts, source_langs)):
+                    src_code = to_nllb_code(source_lang)
+                    if not src_code or source_lang == target_lang or not text.strip():
+                        continue
+                    self._tokenizer.src_lang = src_code
+                    for piece in self._pieces(text, source_lang):
+                        ids = self._tokenizer(piece, truncation=True, max_length=MAX_TOKENS)["input_ids"]
+                        pieces.append((i, piece, ids))
+                if not pieces:
+                    return results
+                forced_bos_id = self._tokenizer.convert_tokens_to_ids(tgt_code)
+                batches = [
+                    (bucket, self._tokenizer.pad(
+                        {"input_ids": [pieces[k][2] for k in bucket]},
+                        padding=True,
+                        return_tensors="pt",
+                    ))
+                    for bucket in _length_buckets([len(ids) for _, _, ids in pieces])
+                ]
+            translated = [piece for _, piece, _ in pieces]
+            for bucket, inputs in batches:
+                if self._device >= 0:
+                    inputs = {k: v.to(self._model.device) for k, v in inputs.items()}
+                out_ids = self._model.generate(
+                    **inputs,
+                    forced_bos_token_id=forced_bos_id,
+                    max_new_tokens=self._decode_budget(len(pieces[bucket[0]][2])),
+                )
+                decoded = self._tokenizer.batch_decode(out_ids, skip_special_tokens=True)
+                for k, text in zip(bucket, decoded):
+                    translated[k] = text.strip() or translated[k]
+            parts: dict[int, list[str]] = defaultdict(list)
+            for (i, _, _), text in zip(pieces, translated):
+                parts[i].append(text)
+            for i, row_parts in parts.items():
+                results[i] = join_pieces(row_parts, target_lang)
+        except Exception as e:
+            logger.warning("NLLB batch translate failed: %s", e)
+        return results
+
+    def translate_nllb_multi(
+        self, text: str, source_lang: str, target_langs: list[str]
+    ) -> dict[str, str]:
+        """
+        Translate one text into several languages: the encoder runs once over the text's
+        sentences and every (target, sentence) row decodes together in one `generate`,
+        each row forced to its own language token.
+        """
+        self._load_nllb()
+        results = {tgt: text for tgt in target_langs}
+        src_code = to_nllb_code(source_lang)
+        rows = [
+            (tgt, to_nllb_code(tgt))
+            for tgt in target_langs
+            if tgt != source_lang and to_nllb_code(tgt)
+        ]
+        if not src_code or not rows:
+            return results
+        try:
+            import torch
+            from transformers.modeling_outputs import BaseModelOutput
+
+            pieces = self._pieces(text, source_lang)
+            with self._tokenizer_lock:
+                self._tokenizer.src_lang = src_code
+                inputs = self._tokenizer(
+                    pieces,
+                    return_tensors="pt",
+                    padding=True,
+                    truncation=True,
+                    max_length=MAX_TOKENS,
+                )
+                lang_ids = [self._tokenizer.convert_tokens_to_ids(code) for _, code in rows]
             if self._device >= 0:
                 inputs = {k: v.to(self._model.device) for k, v in inputs.items()}
+
+            n = len(rows)
+            with torch.no_grad():
+                encoded = self._model.get_encoder()(**inputs)
+            # Share the single encoder pass across all target rows (target-major order)
+            encoder_outputs = BaseModelOutput(
+                last_hidden_state=encoded.last_hidden_state.repeat(n, 1, 1)
+            )
+            attention_mask = inputs["attention_mask"].repeat(n, 1)
+            start_id = self._model.config.decoder_start_token_id
+            decoder_input_ids = torch.tensor(
+                [[start_id, lang_id] for lang_id in lang_ids for _ in pieces],
+                device=attention_mask.device,
+            )
             out_ids = self._model.generate(
-                **inputs,
-                forced_bos_token_id=forced_bos_id,
-                max_length=512,
+                encoder_outputs=encoder_outputs,
+                attention_mask=attention_mask,
+                decoder_input_ids=decoder_input_ids,
+                max_new_tokens=self._decode_budget(inputs["input_ids"].shape[1]),
             )
             decoded = self._tokenizer.batch_decode(out_ids, skip_special_tokens=True)
-            return (decoded[0].strip() if decoded else text)
+            for t, (tgt, _) in enumerate(rows):
+                translated = decoded[t * len(pieces):(t + 1) * len(pieces)]
+                results[tgt] = join_pieces(
+                    [out.strip() or piece for out, piece in zip(translated, pieces)], tgt
+                )
         except Exception as e:
-            logger.warning("NLLB translate failed: %s", e)
-            return text
+            logger.warning("NLLB multi-target translate failed: %s", e)
+        return results
 
     def translate_openai(self, text: str, source_lang: str, target_lang: str) -> str:
-        """Translate using OpenAI API (if key is set)."""
+        """
+        Translate using OpenAI API (if key is set), blocking. The WebSocket pipeline uses
+        the async client in openai_translator instead (batching, hedged NLLB fallback).
+        """
         if not self._settings.openai_api_key:
             return text
         try:
-            from openai import OpenAI
+            from app.services.openai_translator import SYSTEM_PROMPT
+
+            if self._openai_client is None:
+                from openai import OpenAI
 
-            client = OpenAI(api_key=self._settings.openai_api_key)
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
+                self._openai_client = OpenAI(
+                    api_key=self._settings.openai_api_key,
+                    base_url=self._settings.openai_base_url or None,
+                    timeout=self._settings.openai_timeout_ms / 1000,
+                    max_retries=0,
+                )
+            response = self._openai_client.chat.completions.create(
+                model=self._settings.openai_model,
                 messages=[
-                    {
-                        "role": "system",
-                        "content": f"Translate the following text from {source_lang} to {target_lang}. "
-                        "Reply with only the translation, no explanation.",
-                    },
+                    {"role": "system", "content": SYSTEM_PROMPT.format(source=source_lang, target=target_lang)},
                     {"role": "user", "content": text},
                 ],
                 max_tokens=500,
@@ -104,9 +302,82 @@ class TranslationService:
             return ""
         if source_lang == target_lang:
             return text
-        if use_openai and self._openai_available:
-            return self.translate_openai(text, source_lang, target_lang)
-        return self.translate_nllb(text, source_lang, target_lang)
+        engine = "openai" if use_openai and self._openai_available else LOCAL_ENGINE
+        cached = self.lookup(text, source_lang, target_lang, engine)
+        if cached is not None:
+            return cached
+        if engine == "openai":
+            translated = self.translate_openai(text, source_lang, target_lang)
+        elif self._use_ct2:
+            translated = self.translate_ct2_rows([(text, source_lang, target_lang)])[0]
+        else:
+            translated = self.translate_nllb(text, source_lang, target_lang)
+        self.remember(text, source_lang, target_lang, translated, engine)
+        return translated
+
+    def translate_batch(
+        self, texts: list[str], source_langs: list[str], target_lang: str
+    ) -> list[str]:
+        """
+        Translate several texts into target_lang in one NLLB pass (PyTorch or CTranslate2).
+        Callers check the cache first (see TranslationBatcher); results are stored here.
+        """
+        if self._use_ct2:
+            results = self.translate_ct2_rows(
+                [(text, source_lang, target_lang) for text, source_lang in zip(texts, source_langs)]
+            )
+        else:
+            results = self.translate_nllb_batch(texts, source_langs, target_lang)
+        for text, source_lang, translated in zip(texts, source_langs, results):
+            self.remember(text, source_lang, target_lang, translated)
+        return results
+
+    def translate_multi(
+        self,
+        text: str,
+        source_lang: str,
+        target_langs: list[str],
+        use_openai: bool = False,
+    ) -> dict[str, str]:
+        """Translate text into every language in target_langs; returns {lang: text}."""
+        if not text or not text.strip():
+            return {tgt: "" for tgt in target_langs}
+        engine = "openai" if use_openai and self._openai_available else LOCAL_ENGINE
+        results: dict[str, str] = {}
+        missing: list[str] = []
+        for tgt in target_langs:
+            cached = text if tgt == source_lang else self.lookup(text, source_lang, tgt, engine)
+            if cached is not None:
+                results[tgt] = cached
+            else:
+                missing.append(tgt)
+        if not missing:
+            return results
+        if engine == "openai":
+            translated = {tgt: self.translate_openai(text, source_lang, tgt) for tgt in missing}
+        elif self._use_ct2:
+            rows = self.translate_ct2_rows([(text, source_lang, tgt) for tgt in missing])
+            translated = dict(zip(missing, rows))
+        else:
+            translated = self.translate_nllb_multi(text, source_lang, missing)
+        for tgt, value in translated.items():
+            self.remember(text, source_lang, tgt, value, engine)
+        results.update(translated)
+        return {tgt: results[tgt] for tgt in target_langs}
+
+    def lookup(self, text: str, source_lang: str, target_lang: str, engine: str = LOCAL_ENGINE) -> Optional[str]:
+        """Translation memory lookup for one engine; None on miss or when the cache is off."""
+        if self._cache is None:
+            return None
+        return self._cache.get(text, source_lang, target_lang, engine)
+
+    def remember(
+        self, text: str, source_lang: str, target_lang: str, translated: str, engine: str = LOCAL_ENGINE
+    ) -> None:
+        # Engines fall back to the source text on failure; don't cache those
+        if self._cache is None or not translated or translated == text:
+            return
+        self._cache.put(text, source_lang, target_lang, translated, engine)
 
 
 def get_translation_service() -> TranslationService:
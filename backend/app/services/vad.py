@@ -0,0 +1,200 @@
+"""
+Voice activity detection.
+
+FrameVAD: vectorized per-frame energy (10-30 ms frames) against an adaptive noise floor,
+with start/stop hysteresis and a hangover so word gaps don't end an utterance.
+UtteranceSegmenter: turns frame decisions into frame-precise utterance boundaries so
+leading/trailing non-speech is trimmed before STT.
+An optional model-based trim (Silero via faster-whisper) can run on each utterance.
+"""
+import logging
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Utterance segmentation (live sessions and file translation)
+SILENCE_DURATION_MS = 600     # <--- How much silence (audio time) triggers a "sentence end"
+MAX_BUFFER_DURATION_S = 6.0   # <--- Force translate after this many seconds
+MIN_BUFFER_DURATION_S = 1.0   # <--- Don't translate tiny snippets (noise)
+
+
+def _db_to_power_ratio(db: float) -> float:
+    return 10.0 ** (db / 10.0)
+
+
+class FrameVAD:
+    """Streaming energy VAD; frames are counted globally across chunks."""
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_ms: int = 20,
+        start_db: float = 9.0,
+        stop_db: float = 5.0,
+        hangover_ms: int = 200,
+        min_rms: float = 0.003,
+        floor_adapt: float = 0.05,
+    ) -> None:
+        self.frame_len = sample_rate * frame_ms // 1000
+        self._start_ratio = _db_to_power_ratio(start_db)
+        self._stop_ratio = _db_to_power_ratio(stop_db)
+        self._hangover_frames = max(hangover_ms // frame_ms, 0)
+        self._min_power = min_rms ** 2
+        self._adapt = floor_adapt
+        self.noise_floor = self._min_power  # mean-square energy of background noise
+        self.in_speech = False
+        self._hang = 0
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self.frames = 0  # frames decided so far (global frame index of the next frame)
+
+    def frame_energies(self, audio: np.ndarray) -> np.ndarray:
+        """Mean-square energy of each complete frame (vectorized); keeps the tail for next call."""
+        if len(self._remainder):
+            audio = np.concatenate((self._remainder, audio))
+        n_frames = len(audio) // self.frame_len
+        used = n_frames * self.frame_len
+        self._remainder = audio[used:].copy()
+        frames = audio[:used].reshape(n_frames, self.frame_len)
+        return np.einsum("ij,ij->i", frames, frames) / self.frame_len
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """Per-frame speech flags for the frames completed by this chunk."""
+        energies = self.frame_energies(audio)
+        flags = np.zeros(len(energies), dtype=bool)
+        for i, energy in enumerate(energies):
+            floor = max(self.noise_floor, self._min_power)
+            if self.in_speech:
+                if energy > floor * self._stop_ratio:
+                    self._hang = self._hangover_frames
+                elif self._hang > 0:
+                    self._hang -= 1
+                else:
+                    self.in_speech = False
+            elif energy > floor * self._start_ratio:
+                self.in_speech = True
+                self._hang = self._hangover_frames
+            if not self.in_speech:
+                # Track the background: follow drops immediately, rises slowly
+                if energy < self.noise_floor:
+                    self.noise_floor = max(energy, self._min_power)
+                else:
+                    self.noise_floor += self._adapt * (energy - self.noise_floor)
+            flags[i] = self.in_speech
+        self.frames += len(energies)
+        return flags
+
+
+class VADStats:
+    """Share of received audio that never reached STT."""
+
+    def __init__(self) -> None:
+        self.received_s = 0.0
+        self.sent_s = 0.0
+
+    def as_dict(self) -> dict:
+        skipped = max(self.received_s - self.sent_s, 0.0)
+        return {
+            "received_s": round(self.received_s, 1),
+            "sent_to_stt_s": round(self.sent_s, 1),
+            "skipped_share": round(skipped / self.received_s, 3) if self.received_s else 0.0,
+        }
+
+
+vad_stats = VADStats()
+
+
+class UtteranceSegmenter:
+    """
+    Frame-precise speech bounds for one session buffer. Positions are global sample
+    indices; `origin` is the global index of the first sample in the session buffer.
+    """
+
+    def __init__(self, sample_rate: int, vad: FrameVAD, pad_ms: int = 150) -> None:
+        self.sample_rate = sample_rate
+        self.vad = vad
+        self._pad = sample_rate * pad_ms // 1000
+        self.origin = 0
+        self.total = 0
+        self.speech_start: Optional[int] = None
+        self.speech_end: Optional[int] = None
+
+    def push(self, audio: np.ndarray) -> bool:
+        """Feed one chunk; returns True if any completed frame in it was speech."""
+        vad_stats.received_s += len(audio) / self.sample_rate
+        first_frame = self.vad.frames
+        flags = self.vad.process(audio)
+        self.total += len(audio)
+        if not flags.any():
+            return False
+        idx = np.flatnonzero(flags)
+        frame_len = self.vad.frame_len
+        if self.speech_start is None:
+            self.speech_start = (first_frame + int(idx[0])) * frame_len
+        self.speech_end = (first_frame + int(idx[-1]) + 1) * frame_len
+        return True
+
+    @property
+    def has_speech(self) -> bool:
+        return self.speech_start is not None
+
+    @property
+    def silence_ms(self) -> float:
+        """Trailing non-speech audio (audio time, not wall time)."""
+        since = self.speech_end if self.speech_end is not None else self.origin
+        return 1000.0 * (self.total - since) / self.sample_rate
+
+    def preroll_start(self) -> int:
+        """Buffer offset to keep while no speech has started (a short pre-roll)."""
+        return max(self.total - self.origin - self._pad, 0)
+
+    def span(self) -> tuple[int, int]:
+        """Buffer-relative [start, end) of the speech plus padding."""
+        length = self.total - self.origin
+        if self.speech_start is None:
+            return 0, 0
+        start = max(self.speech_start - self._pad - self.origin, 0)
+        end = min(self.speech_end + self._pad - self.origin, length)
+        return start, end
+
+    def advance(self, samples: int) -> None:
+        """The first `samples` of the buffer were consumed or discarded."""
+        self.origin += samples
+        if self.speech_end is not None and self.speech_end <= self.origin:
+            self.speech_start = self.speech_end = None
+        elif self.speech_start is not None:
+            self.speech_start = max(self.speech_start, self.origin)
+
+
+def new_segmenter(sample_rate: int) -> UtteranceSegmenter:
+    """Segmenter configured from Settings."""
+    settings = get_settings()
+    vad = FrameVAD(
+        sample_rate,
+        frame_ms=settings.vad_frame_ms,
+        start_db=settings.vad_start_db,
+        stop_db=settings.vad_stop_db,
+        hangover_ms=settings.vad_hangover_ms,
+        min_rms=settings.vad_min_rms,
+    )
+    return UtteranceSegmenter(sample_rate, vad, pad_ms=settings.vad_pad_ms)
+
+
+def trim_with_model(audio: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Model-based trim (Silero VAD shipped with faster-whisper): keep float32 audio from
+    the first to the last detected speech region, as a view. Empty when no speech is found.
+    """
+    settings = get_settings()
+    try:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+    except ImportError:
+        logger.warning("faster-whisper VAD unavailable; skipping model-based trim")
+        return audio
+    regions = get_speech_timestamps(audio, VadOptions(speech_pad_ms=settings.vad_pad_ms))
+    if not regions:
+        return audio[:0]
+    return audio[regions[0]["start"]:regions[-1]["end"]]
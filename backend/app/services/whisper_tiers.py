@@ -0,0 +1,166 @@
+"""
+Load-adaptive Whisper model tiers.
+
+With WHISPER_TIERS set (e.g. tiny, base, small), each transcription is routed to one
+tier. `TierPolicy` steps down to a faster model when STT requests pile up or the
+recent real-time factor climbs, and back up once both are low again. Separate up/down
+thresholds, a minimum hold time between switches and one-tier steps stop it flapping.
+A tier's RTF is only measured while it runs, so a slow reading on a larger tier stops
+blocking the way back up once it is older than the hold time.
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.config import get_settings
+from app.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Approximate resident size (MB) of CTranslate2 int8 Whisper models, fastest first.
+# Orders the tiers and budgets lazy loads before a model's real footprint is known.
+WHISPER_SIZE_MB = {
+    "tiny": 80,
+    "base": 150,
+    "small": 500,
+    "medium": 1500,
+    "large-v1": 3100,
+    "large-v2": 3100,
+    "large-v3": 3100,
+}
+UNKNOWN_SIZE_MB = 1000
+RTF_EMA_ALPHA = 0.3  # weight of the newest observation in the per-tier RTF average
+
+TIER_SWITCHES = registry.counter("vt_whisper_tier_switches_total", "Whisper tier changes by direction")
+
+
+def estimated_mb(size: str) -> int:
+    return WHISPER_SIZE_MB.get(size, UNKNOWN_SIZE_MB)
+
+
+def configured_tiers() -> list[str]:
+    """WHISPER_TIERS plus WHISPER_MODEL_SIZE, fastest first; just the one size when tiering is off."""
+    settings = get_settings()
+    tiers = dict.fromkeys([*settings.whisper_tiers, settings.whisper_model_size])
+    return sorted(tiers, key=estimated_mb)
+
+
+class TierPolicy:
+    """Pick the Whisper tier for the next transcription from current load."""
+
+    _instance: Optional["TierPolicy"] = None
+
+    def __init__(self) -> None:
+        self._settings = get_settings()
+        self.tiers = configured_tiers()
+        self._index = self.tiers.index(self._settings.whisper_model_size)
+        self._changed_at = time.monotonic()
+        self._rtf: dict[str, float] = {}
+        self._rtf_at: dict[str, float] = {}  # when each tier's RTF was last updated
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.switches = 0
+
+    @property
+    def current(self) -> str:
+        return self.tiers[self._index]
+
+    def begin(self) -> None:
+        """A transcription was submitted (queued or running)."""
+        with self._lock:
+            self._in_flight += 1
+
+    def end(self, tier: str, stt_s: float, audio_s: float) -> None:
+        """A transcription on `tier` finished: update its recent RTF."""
+        with self._lock:
+            self._in_flight -= 1
+            if audio_s <= 0:
+                return
+            rtf = stt_s / audio_s
+            previous = self._rtf.get(tier)
+            self._rtf[tier] = rtf if previous is None else (1 - RTF_EMA_ALPHA) * previous + RTF_EMA_ALPHA * rtf
+            self._rtf_at[tier] = time.monotonic()
+
+    def choose(self) -> str:
+        """Tier for the next transcription; moves at most one step per hold period."""
+        s = self._settings
+        with self._lock:
+            now = time.monotonic()
+            if now - self._changed_at < s.whisper_tier_hold_s:
+                return self.current
+            depth = self._in_flight
+            rtf = self._rtf.get(self.current)
+            if self._index > 0 and (
+                depth >= s.whisper_tier_down_queue or (rtf is not None and rtf >= s.whisper_tier_down_rtf)
+            ):
+                self._switch(-1, now, depth, rtf)
+            elif (
+                self._index < len(self.tiers) - 1
+                and depth <= s.whisper_tier_up_queue
+                and rtf is not None
+                and rtf <= s.whisper_tier_up_rtf
+                # Don't climb back onto a tier that was recently too slow
+                and not self._recently_slow(self.tiers[self._index + 1], now)
+            ):
+                self._switch(1, now, depth, rtf)
+                # Its old reading may include queueing from the peak: measure it afresh
+                self._rtf.pop(self.current, None)
+            return self.current
+
+    def _recently_slow(self, tier: str, now: float) -> bool:
+        rtf = self._rtf.get(tier)
+        if rtf is None or now - self._rtf_at[tier] >= self._settings.whisper_tier_hold_s:
+            return False
+        return rtf >= self._settings.whisper_tier_down_rtf
+
+    def remove(self, tier: str) -> None:
+        """Stop routing to a tier that can't be loaded (failed or over the memory budget)."""
+        with self._lock:
+            if tier not in self.tiers or len(self.tiers) < 2:
+                return
+            current = self.current
+            self.tiers = [t for t in self.tiers if t != tier]
+            # Same tier if it is still there, else the next faster one
+            self._index = self.tiers.index(current) if current in self.tiers else max(self._index - 1, 0)
+            logger.warning("Whisper tier %s unavailable; routing to %s", tier, self.tiers)
+
+    def _switch(self, step: int, now: float, depth: int, rtf: Optional[float]) -> None:
+        previous = self.current
+        self._index += step
+        self._changed_at = now
+        self.switches += 1
+        direction = "up" if step > 0 else "down"
+        TIER_SWITCHES.inc(direction=direction)
+        logger.info(
+            "Whisper tier %s: %s -> %s (in flight %d, rtf %s)",
+            direction, previous, self.current, depth, f"{rtf:.2f}" if rtf is not None else "n/a",
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tiers": self.tiers,
+                "current": self.current,
+                "in_flight": self._in_flight,
+                "rtf": {tier: round(v, 3) for tier, v in self._rtf.items()},
+                "switches": self.switches,
+            }
+
+
+def get_tier_policy() -> Optional[TierPolicy]:
+    """Singleton policy, or None when only one Whisper size is configured."""
+    if len(configured_tiers()) < 2:
+        return None
+    if TierPolicy._instance is None:
+        TierPolicy._instance = TierPolicy()
+    return TierPolicy._instance
+
+
+registry.gauge(
+    "vt_whisper_tier", "1 for the Whisper tier new transcriptions are routed to",
+    lambda: [
+        ({"model": tier}, int(tier == TierPolicy._instance.current))
+        for tier in TierPolicy._instance.tiers
+    ] if TierPolicy._instance is not None else [],
+)
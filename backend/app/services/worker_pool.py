@@ -0,0 +1,386 @@
+"""
+Process-pool inference (INFERENCE_MODE=process).
+
+STT and translation run in N worker processes instead of the default thread pool, so
+the Python-side parts of both pipelines stop competing for one GIL and a crashing
+model only takes down its worker. Each worker loads its models once (ModelLoader).
+Utterance audio (float32) is handed over in multiprocessing.shared_memory segments and
+read there in place; only small job descriptors and results are pickled. Dead workers
+are restarted and their in-flight jobs re-dispatched. A worker that keeps dying before
+its models load is restarted with exponential backoff and given up on after
+MAX_STARTUP_FAILURES attempts in a row (the pool then stays not-ready).
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.futures import resolve_future
+
+logger = logging.getLogger(__name__)
+
+SHM_MIN_BYTES = 64 * 1024  # segments are rounded up to this so they can be reused
+SHM_FREE_LIMIT = 8  # idle segments kept for reuse
+POLL_INTERVAL_S = 0.5  # how often the collector checks worker liveness
+RESTART_BACKOFF_S = 1.0  # first delay before restarting a worker that died during startup
+RESTART_BACKOFF_MAX_S = 60.0
+MAX_STARTUP_FAILURES = 5  # consecutive deaths before a worker is given up on
+
+
+def _run_job(stt: Any, trans: Any, kind: str, args: tuple) -> tuple[str, Any]:
+    """Execute one job in a worker; returns ("ok", value) or ("error", message)."""
+    try:
+        if kind == "transcribe":
+            shm_name, samples, sample_rate, language, word_timestamps, model_size = args
+            shm = shared_memory.SharedMemory(name=shm_name)
+            audio = np.ndarray((samples,), dtype=np.float32, buffer=shm.buf)
+            try:
+                result = stt.transcribe(
+                    audio, sample_rate=sample_rate, language=language,
+                    word_timestamps=word_timestamps, model_size=model_size,
+                )
+            finally:
+                del audio
+                try:
+                    shm.close()
+                except BufferError:  # an exception still references the view
+                    pass
+            return "ok", result
+        if kind == "translate":
+            return "ok", trans.translate(*args)
+        if kind == "translate_multi":
+            return "ok", trans.translate_multi(*args)
+        return "error", f"unknown job kind {kind!r}"
+    except Exception as e:
+        logger.exception("Inference job failed: %s", e)
+        return "error", str(e)
+
+
+def _worker_main(worker_id: int, jobs: Any, results: Any) -> None:
+    """Worker process entry point: load models once, then serve jobs until None."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s [%(levelname)s] worker-{worker_id} %(name)s: %(message)s",
+    )
+    from app.services.model_loader import ModelLoader
+    from app.services.stt_service import get_stt_service
+    from app.services.translation_service import get_translation_service
+
+    loader = ModelLoader.get_instance()
+    loader.load_models()
+    stt = get_stt_service()
+    trans = get_translation_service()
+    results.put((None, worker_id, "ready", loader.status()))
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, kind, args = job
+        status, value = _run_job(stt, trans, kind, args)
+        results.put((job_id, worker_id, status, value))
+
+
+@dataclass
+class _Job:
+    job_id: int
+    kind: str
+    args: tuple
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    shm: Optional[shared_memory.SharedMemory] = None
+    attempts: int = 0
+
+
+class _Worker:
+    """One worker process with its own job queue and in-flight table."""
+
+    def __init__(self, worker_id: int, ctx: Any, results: Any) -> None:
+        self.worker_id = worker_id
+        self.jobs = ctx.Queue()
+        self.in_flight: dict[int, _Job] = {}
+        self.ready = False
+        self.models: Optional[dict] = None  # ModelLoader.status() reported by the worker
+        self.failed = False  # kept dying during startup; not restarted any more
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.jobs, results),
+            name=f"inference-worker-{worker_id}",
+            daemon=True,
+        )
+        self.process.start()
+
+
+class InferencePool:
+    """
+    Dispatches jobs to the least-loaded worker. A collector thread resolves the asyncio
+    futures from the shared results queue and restarts workers that died.
+    """
+
+    _instance: Optional["InferencePool"] = None
+
+    def __init__(self, workers: int, max_retries: int = 1) -> None:
+        self._size = max(workers, 1)
+        self._max_retries = max(max_retries, 0)
+        self._ctx = mp.get_context("spawn")  # no forked copies of loaded models or threads
+        self._results = self._ctx.Queue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._free_shm: list[shared_memory.SharedMemory] = []
+        self._shm_segments = 0
+        self._stopping = False
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+        self.retries = 0
+        self._startup_failures = [0] * self._size  # consecutive deaths before ready, per worker
+        self._restart_at: dict[int, float] = {}  # dead worker -> monotonic time to respawn it
+        self._waiting: list[_Job] = []  # jobs with no live worker, dispatched on the next restart
+        self._workers = [_Worker(i, self._ctx, self._results) for i in range(self._size)]
+        self._collector = threading.Thread(target=self._collect, name="inference-collector", daemon=True)
+        self._collector.start()
+        logger.info("Started %d inference worker processes", self._size)
+
+    # --- public API (async, called from the event loop) ---
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        language: Optional[str] = None,
+        word_timestamps: bool = False,
+        model_size: Optional[str] = None,
+    ) -> Any:
+        """Transcribe float32 samples in a worker; they travel through shared memory."""
+        shm = self._acquire_shm(audio.nbytes)
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        return await self._submit(
+            "transcribe", (shm.name, len(audio), sample_rate, language, word_timestamps, model_size), shm
+        )
+
+    async def translate(self, text: str, source_lang: str, target_lang: str, use_openai: bool = False) -> str:
+        return await self._submit("translate", (text, source_lang, target_lang, use_openai))
+
+    async def translate_multi(
+        self, text: str, source_lang: str, target_langs: list[str], use_openai: bool = False
+    ) -> dict[str, str]:
+        return await self._submit("translate_multi", (text, source_lang, target_langs, use_openai))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._size,
+                "alive": sum(w.process.is_alive() for w in self._workers),
+                "ready": sum(w.ready for w in self._workers),
+                "gave_up": sum(w.failed for w in self._workers),
+                "in_flight": sum(len(w.in_flight) for w in self._workers),
+                "completed": self.completed,
+                "failed": self.failed,
+                "restarts": self.restarts,
+                "retries": self.retries,
+                "shm_segments": self._shm_segments,
+            }
+
+    def readiness(self) -> dict:
+        """Same shape as ModelLoader.status(), per worker; ready once every worker is."""
+        with self._lock:
+            workers = [
+                {
+                    "worker": w.worker_id,
+                    "alive": w.process.is_alive(),
+                    **(
+                        {"ready": False, "loading": False, "failed": True} if w.failed
+                        else w.models or {"ready": False, "loading": True}
+                    ),
+                }
+                for w in self._workers
+            ]
+        return {
+            "ready": all(w["ready"] for w in workers),
+            "loading": any(w["loading"] for w in workers),
+            "workers": workers,
+        }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop workers and release shared memory."""
+        self._stopping = True
+        for worker in self._workers:
+            worker.jobs.put(None)
+        for worker in self._workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        with self._lock:
+            for worker in self._workers:
+                for job in worker.in_flight.values():
+                    self._finish(job, "error", "inference pool shut down")
+                worker.in_flight.clear()
+            for job in self._waiting:
+                self._finish(job, "error", "inference pool shut down")
+            self._waiting.clear()
+            for shm in self._free_shm:
+                self._destroy_shm(shm)
+            self._free_shm.clear()
+
+    # --- dispatch ---
+
+    async def _submit(self, kind: str, args: tuple, shm: Optional[shared_memory.SharedMemory] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        job = _Job(next(self._ids), kind, args, loop, loop.create_future(), shm)
+        with self._lock:
+            if self._stopping:
+                self._finish(job, "error", "inference pool shut down")
+            else:
+                self._dispatch(job)
+        return await job.future
+
+    def _dispatch(self, job: _Job) -> None:
+        """Send to the worker with the fewest in-flight jobs (caller holds the lock)."""
+        alive = [w for w in self._workers if w.process.is_alive()]
+        if not alive:
+            if all(w.failed for w in self._workers):
+                self._finish(job, "error", "no inference worker available (all failed to start)")
+            else:
+                self._waiting.append(job)  # a worker is waiting out its restart backoff
+            return
+        worker = min(alive, key=lambda w: (not w.ready, len(w.in_flight)))
+        job.attempts += 1
+        worker.in_flight[job.job_id] = job
+        worker.jobs.put((job.job_id, job.kind, job.args))
+
+    def _finish(self, job: _Job, status: str, value: Any) -> None:
+        """Resolve a job's future from any thread (caller holds the lock)."""
+        if job.shm is not None:
+            self._release_shm(job.shm)
+            job.shm = None
+        if status == "ok":
+            self.completed += 1
+        else:
+            self.failed += 1
+        job.loop.call_soon_threadsafe(resolve_future, job.future, status, value)
+
+    def _collect(self) -> None:
+        while not self._stopping:
+            try:
+                job_id, worker_id, status, value = self._results.get(timeout=POLL_INTERVAL_S)
+            except queue.Empty:
+                pass
+            except (EOFError, OSError):
+                return
+            else:
+                with self._lock:
+                    worker = self._workers[worker_id]
+                    if status == "ready":
+                        worker.ready = value["ready"]
+                        worker.models = value
+                        if worker.ready:
+                            logger.info("Inference worker %d ready", worker_id)
+                        else:
+                            logger.error("Inference worker %d failed to load models: %s", worker_id, value["models"])
+                    else:
+                        job = worker.in_flight.pop(job_id, None)
+                        if job is not None:  # None: already re-dispatched after a restart
+                            self._finish(job, status, value)
+            self._check_workers()
+
+    def _check_workers(self) -> None:
+        """
+        Restart dead workers and retry the jobs they held. A worker that died before
+        becoming ready is restarted after an exponential backoff, and given up on after
+        MAX_STARTUP_FAILURES deaths in a row.
+        """
+        with self._lock:
+            if self._stopping:
+                return
+            now = time.monotonic()
+            for i, worker in enumerate(self._workers):
+                if worker.failed or worker.process.is_alive():
+                    continue
+                if i not in self._restart_at:
+                    self._worker_died(i, worker, now)
+                    if worker.failed:
+                        continue
+                if now >= self._restart_at[i]:
+                    del self._restart_at[i]
+                    self.restarts += 1
+                    self._workers[i] = _Worker(i, self._ctx, self._results)
+                    waiting, self._waiting = self._waiting, []
+                    for job in waiting:
+                        self._dispatch(job)
+
+    def _worker_died(self, i: int, worker: _Worker, now: float) -> None:
+        """Schedule the restart (or give up) and re-dispatch in-flight jobs (caller holds the lock)."""
+        failures = self._startup_failures[i] = 0 if worker.ready else self._startup_failures[i] + 1
+        if failures >= MAX_STARTUP_FAILURES:
+            worker.failed = True
+            logger.error(
+                "Inference worker %d died during startup %d times in a row (code %s); not restarting it",
+                i, failures, worker.process.exitcode,
+            )
+        else:
+            delay = min(RESTART_BACKOFF_S * 2 ** (failures - 1), RESTART_BACKOFF_MAX_S) if failures else 0.0
+            self._restart_at[i] = now + delay
+            logger.warning(
+                "Inference worker %d exited (code %s) with %d job(s) in flight; restarting in %.1fs",
+                i, worker.process.exitcode, len(worker.in_flight), delay,
+            )
+        jobs = list(worker.in_flight.values())
+        worker.in_flight.clear()
+        for job in jobs:
+            if job.attempts > self._max_retries:
+                self._finish(job, "error", "inference worker died")
+            else:
+                self.retries += 1
+                self._dispatch(job)
+        if all(w.failed for w in self._workers):
+            for job in self._waiting:
+                self._finish(job, "error", "no inference worker available (all failed to start)")
+            self._waiting.clear()
+
+    # --- shared memory ---
+
+    def _acquire_shm(self, nbytes: int) -> shared_memory.SharedMemory:
+        with self._lock:
+            for i, shm in enumerate(self._free_shm):
+                if shm.size >= nbytes:
+                    return self._free_shm.pop(i)
+            self._shm_segments += 1
+        size = -(-max(nbytes, 1) // SHM_MIN_BYTES) * SHM_MIN_BYTES
+        return shared_memory.SharedMemory(create=True, size=size)
+
+    def _release_shm(self, shm: shared_memory.SharedMemory) -> None:
+        if len(self._free_shm) < SHM_FREE_LIMIT:
+            self._free_shm.append(shm)
+        else:
+            self._destroy_shm(shm)
+
+    def _destroy_shm(self, shm: shared_memory.SharedMemory) -> None:
+        self._shm_segments -= 1
+        shm.close()
+        shm.unlink()
+
+
+def get_inference_pool() -> Optional[Any]:
+    """
+    Singleton worker pool (INFERENCE_MODE=process), the remote-node gateway
+    (INFERENCE_MODE=remote), or None for in-process inference.
+    """
+    settings = get_settings()
+    if settings.inference_mode == "remote":
+        from app.services.remote_inference import get_remote_pool
+        return get_remote_pool()
+    if settings.inference_mode != "process":
+        return None
+    if InferencePool._instance is None:
+        InferencePool._instance = InferencePool(
+            settings.inference_workers, settings.inference_max_retries
+        )
+    return InferencePool._instance
@@ -3,197 +3,554 @@ WebSocket audio handler: receive audio chunks, buffer them until silence, run ST
 Optimized for "Sentence-level" translation to improve accuracy and reduce load.
 """
 import asyncio
-import base64
-import json
+import itertools
 import logging
 import time
+from typing import Awaitable, Callable, Iterator, Optional
+
 import numpy as np
-from typing import Optional
 from fastapi import WebSocketDisconnect
 
 from app.config import get_settings
-from app.services.language_codes import whisper_to_display
-from app.services.stt_service import get_stt_service
-from app.services.translation_service import get_translation_service
+from app.services.audio_buffer import AudioBuffer
+from app.services.caption_pipeline import (
+    build_caption,
+    process_audio_buffer,
+    record_stage,
+    transcribe,
+    translate_many,
+)
+from app.services.language_tracker import LanguageTracker
+from app.services.model_loader import readiness
+from app.services.metrics import (
+    ACTIVE_SESSIONS,
+    SESSION_QUEUE_DEPTH,
+    STAGE_SECONDS,
+    UTTERANCE_AUDIO_SECONDS,
+    UTTERANCE_RTF,
+    UTTERANCES,
+)
+from app.services.resampler import PolyphaseResampler, pcm16_to_float
+from app.services.vad import (
+    MAX_BUFFER_DURATION_S,
+    MIN_BUFFER_DURATION_S,
+    SILENCE_DURATION_MS,
+    new_segmenter,
+    vad_stats,
+)
+from app.websocket.pipeline import (
+    OVERLOAD_RETRY_AFTER_MS,
+    CaptionSequencer,
+    Utterance,
+    UtteranceQueue,
+    get_admission_control,
+)
+from app.websocket.protocol import ProtocolError, parse_binary_frame, parse_json_audio, parse_json_message
+from app.websocket.rooms import get_room_registry
+from app.services.scheduler import DROP, SHORTEN, SessionShare, get_scheduler
+from app.websocket.streaming import StreamingTranscriber
 
 logger = logging.getLogger(__name__)
 
-# VAD / Buffering Constants
-SILENCE_THRESHOLD = 0.01      # <--- RMS amplitude threshold for silence. Tune this!
-SILENCE_DURATION_MS = 600     # <--- How much silence triggers a "sentence end"
-MAX_BUFFER_DURATION_S = 6.0   # <--- Force translate after this many seconds
-MIN_BUFFER_DURATION_S = 1.0   # <--- Don't translate tiny snippets (noise)
-
-async def process_audio_buffer(
-    audio_bytes: bytes,
-    target_lang: str,
-    sample_rate: int,
-) -> dict:
-    """
-    Process a gathered audio buffer: transcribe -> translate.
-    """
+MIN_INPUT_RATE = 8000         # Client sample rates accepted for server-side resampling
+MAX_INPUT_RATE = 192000
+WARMING_UP_INTERVAL_S = 2.0   # Resend "warming_up" at most this often while audio is dropped
+SPEECH_ENDED_AT = "_speech_ended_at"  # internal caption key: `send` turns it into the total stage
+
+
+def _warming_up_message(status: dict) -> dict:
+    """Tell the client models are not ready yet (audio is dropped until they are)."""
+    failed = [name for name, m in status.get("models", {}).items() if m["state"] == "failed"]
+    return {
+        "type": "warming_up",
+        "status": status,
+        "retry_after_ms": int(WARMING_UP_INTERVAL_S * 1000),
+        "message": (
+            f"Model load failed ({', '.join(failed)}); audio is ignored." if failed
+            else "Models are loading; audio is ignored until they are ready."
+        ),
+    }
+
+
+def _parse_target_langs(data: dict, current: list[str]) -> list[str]:
+    """Read `target_langs` (list) or legacy `target_lang` from a control message."""
     settings = get_settings()
-    loop = asyncio.get_running_loop()
+    langs = data.get("target_langs")
+    if isinstance(langs, list):
+        langs = [lang for lang in dict.fromkeys(langs) if isinstance(lang, str) and lang]
+        return langs[: settings.max_target_languages] or current
+    if data.get("target_lang"):
+        return [data["target_lang"]]
+    return current
 
-    def _run() -> dict:
+
+async def _utterance_worker(
+    queue: UtteranceQueue,
+    sequencer: CaptionSequencer,
+    tracker: LanguageTracker,
+    on_done: Callable[[int], None],
+    share: Optional[SessionShare] = None,
+) -> None:
+    """
+    Consume queued utterances for one session and hand results to the sequencer.
+    With a scheduler share, each utterance first waits for a cross-session slot.
+    """
+    scheduler = get_scheduler() if share is not None else None
+    while True:
+        utterance = await queue.get()
+        if utterance is None:
+            return
+        message = None
+        grant = None
+        timings = utterance.timings
+        audio_s = len(utterance.audio) / utterance.sample_rate
+        record_stage(timings, "queue_wait", time.perf_counter() - utterance.enqueued_at)
         try:
-            stt = get_stt_service()
-            result = stt.transcribe(audio_bytes, sample_rate=sample_rate, language=None)
-            original = (result.text or "").strip()
-            
-            # If Whisper returns empty or very short garbage
-            if not original or len(original) < 2:
-                return {
-                    "original": "",
-                    "translated": "",
-                    "detected_lang": result.detected_language,
-                    "error": None,
-                }
-
-            detected = result.detected_language or "en"
-            trans = get_translation_service()
-            use_openai = settings.translation_engine == "openai" and settings.openai_api_key
-            translated = trans.translate(original, detected, target_lang, use_openai=use_openai)
-
-            return {
-                "original": original,
-                "translated": translated or original,
-                "detected_lang": result.detected_language,
-                "detected_lang_display": whisper_to_display(result.detected_language),
-                "error": None,
-            }
-        except Exception as e:
-            logger.exception("Buffer processing failed: %s", e)
-            return {
-                "original": "",
-                "translated": "",
-                "detected_lang": None,
-                "error": str(e),
-            }
-
-    return await loop.run_in_executor(None, _run)
-
-
-def is_silence(audio_chunk: bytes, threshold: float) -> bool:
-    """Simple RMS-based silence detection."""
+            if scheduler is not None:
+                grant = await scheduler.acquire(
+                    share, utterance.seq, audio_s, utterance.speech_ended_at or utterance.enqueued_at
+                )
+                record_stage(timings, "schedule", grant.wait_s)
+                if grant.action == DROP:
+                    UTTERANCES.inc(outcome="expired")
+                    message = {
+                        "type": "overloaded",
+                        "seq": utterance.seq,
+                        "reason": "deadline",
+                        "late_ms": round(grant.late_s * 1000),
+                        "retry_after_ms": OVERLOAD_RETRY_AFTER_MS,
+                        "message": "Utterance missed its latency target; dropped.",
+                    }
+                    continue
+            started = time.perf_counter()
+            result = await process_audio_buffer(
+                utterance.audio, utterance.target_langs, utterance.sample_rate, tracker, timings,
+                fastest=grant is not None and grant.action == SHORTEN,
+            )
+            elapsed = time.perf_counter() - started
+            record_stage(timings, "process", elapsed)
+            UTTERANCE_AUDIO_SECONDS.observe(audio_s)
+            if audio_s > 0:
+                UTTERANCE_RTF.observe(elapsed / audio_s)
+            outcome = "error" if result.get("error") else "captioned" if result["original"] else "empty"
+            UTTERANCES.inc(outcome=outcome)
+            if result["original"]:
+                result["type"] = "caption"
+                result["seq"] = utterance.seq
+                result[SPEECH_ENDED_AT] = utterance.speech_ended_at or utterance.enqueued_at
+                if timings is not None:
+                    result["timings"] = {
+                        **timings,
+                        "audio_ms": round(audio_s * 1000),
+                        "rtf": round(elapsed / audio_s, 3) if audio_s > 0 else None,
+                    }
+                message = result
+        finally:
+            if grant is not None and grant.action != DROP:
+                scheduler.release(grant)
+            on_done(utterance.seq)
+            try:
+                await sequencer.complete(utterance.seq, message)
+            except Exception as e:
+                logger.warning("Failed to send caption %s: %s", utterance.seq, e)
+        # Don't hold the buffer view while waiting for the next utterance
+        utterance = None
+
+
+async def _stream_pass(
+    send: Callable[[dict], Awaitable[None]],
+    streamer: StreamingTranscriber,
+    target_langs: list[str],
+    sequencer: CaptionSequencer,
+    seq_counter: Iterator[int],
+    background: set,
+    final: bool = False,
+    previous: Optional[asyncio.Task] = None,
+    share: Optional[SessionShare] = None,
+    timings: bool = False,
+) -> None:
+    """
+    One streaming pass: send a partial caption, translate newly committed text.
+    With a scheduler share the pass waits for a slot; a late partial pass is skipped
+    (the next one covers the same audio), a final one is at most shortened.
+    With `timings`, committed captions carry their stage times like utterance captions.
+    """
+    if previous is not None:
+        await asyncio.gather(previous, return_exceptions=True)
+
+    scheduler = get_scheduler() if share is not None else None
+    grant = None
+    stt_model: Optional[str] = None
+    pass_timings: Optional[dict] = {} if timings else None
+    # The pass covers audio received up to now: commits count their total from here
+    audio_until = time.perf_counter()
+
+    async def transcribe_words(audio: np.ndarray, language: Optional[str]):
+        nonlocal stt_model
+        result = await transcribe(
+            audio, streamer.sample_rate, language, word_timestamps=True,
+            fastest=grant is not None and grant.action == SHORTEN,
+        )
+        stt_model = result.model
+        return result
+
     try:
-        data = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32)
-        if len(data) == 0:
-            return True
-        # Normalize 16-bit to -1..1
-        data = data / 32768.0
-        rms = np.sqrt(np.mean(data**2))
-        return rms < threshold
-    except Exception:
-        return False
-
-
-async def handle_audio_websocket(websocket, path: Optional[str] = None):
+        if scheduler is not None:
+            grant = await scheduler.acquire(
+                share, -1, streamer.buffered / streamer.sample_rate, time.perf_counter(), droppable=not final
+            )
+            record_stage(pass_timings, "schedule", grant.wait_s)
+            if grant.action == DROP:
+                return
+        started = time.perf_counter()
+        committed, tentative = await streamer.step(transcribe_words, final=final)
+        record_stage(pass_timings, "stt", time.perf_counter() - started)
+        if committed:
+            task = asyncio.create_task(_commit_caption(
+                sequencer, next(seq_counter), committed, streamer.language, target_langs, stt_model, share,
+                timings=pass_timings, audio_until=audio_until,
+            ))
+            background.add(task)
+            task.add_done_callback(background.discard)
+        if committed or tentative:
+            message = {"type": "partial", "committed": committed, "tentative": tentative, "final": final}
+            ttfc = streamer.mark_output()
+            if ttfc is not None:
+                message["ttfc_ms"] = round(ttfc * 1000)
+                logger.info(f"Time to first caption: {ttfc * 1000:.0f} ms")
+            await send(message)
+    except Exception as e:
+        logger.warning("Streaming pass failed: %s", e)
+    finally:
+        if grant is not None and grant.action != DROP:
+            scheduler.release(grant)
+        if final:
+            streamer.reset()
+
+
+async def _commit_caption(
+    sequencer: CaptionSequencer,
+    seq: int,
+    text: str,
+    detected_lang: Optional[str],
+    target_langs: list[str],
+    stt_model: Optional[str] = None,
+    share: Optional[SessionShare] = None,
+    timings: Optional[dict] = None,
+    audio_until: Optional[float] = None,
+) -> None:
+    """
+    Translate committed streaming text and release it as a regular caption. `timings`
+    holds the pass's stage times (None: the client didn't ask for them).
+    """
+    scheduler = get_scheduler() if share is not None else None
+    grant = None
+    message = None
+    timings = dict(timings) if timings is not None else None
+    try:
+        if scheduler is not None:
+            # No audio: estimated at zero, so it runs as soon as the session's turn comes
+            grant = await scheduler.acquire(share, seq, 0.0, time.perf_counter(), droppable=False)
+            record_stage(timings, "schedule", grant.wait_s)
+        started = time.perf_counter()
+        translations = await translate_many(text, detected_lang or "en", target_langs)
+        record_stage(timings, "translate", time.perf_counter() - started)
+        message = {
+            "type": "caption",
+            "seq": seq,
+            **build_caption(text, translations, target_langs, detected_lang, stt_model),
+            SPEECH_ENDED_AT: audio_until or time.perf_counter(),
+        }
+        if timings is not None:
+            message["timings"] = timings
+    finally:
+        if grant is not None:
+            scheduler.release(grant)
+        await sequencer.complete(seq, message)
+
+
+async def handle_audio_websocket(websocket, path: Optional[str] = None, room_id: Optional[str] = None):
     """
     WebSocket handler:
     1. Buffers audio chunks.
     2. Checks for silence.
-    3. Triggers translation.
+    3. Queues the finished utterance; workers run STT + translation and
+       captions go out in utterance order while the loop keeps receiving.
+    With room_id, the session is a room speaker: every caption is also published to
+    the room's listeners, translated once per distinct listener language.
     """
-    target_lang = "en"
+    target_langs = ["en"]
     settings = get_settings()
     sample_rate = settings.sample_rate
+
+    registry = get_room_registry()
+    room = registry.get(room_id) if room_id else None
+    if room is not None:
+        room.speakers += 1
+
+    def session_langs() -> list[str]:
+        """Speaker's own languages first, then any extra languages room listeners want."""
+        if room is None:
+            return target_langs
+        return list(dict.fromkeys([*target_langs, *room.target_langs()]))
+
+    async def send(message: dict) -> None:
+        ended_at = message.pop(SPEECH_ENDED_AT, None)
+        if ended_at is not None and "timings" in message:
+            message["timings"]["total_ms"] = round((time.perf_counter() - ended_at) * 1000, 2)
+        if room is not None:
+            room.publish(message)
+        started = time.perf_counter()
+        await websocket.send_json(message)
+        sent = time.perf_counter()
+        STAGE_SECONDS.observe(sent - started, stage="send")
+        if ended_at is not None:
+            STAGE_SECONDS.observe(sent - ended_at, stage="total")
     
-    # Session State
-    audio_buffer = bytearray()
-    silence_start_time = None
-    last_process_time = time.time()
-    
+    # Session State: client PCM is converted to float32 once, into a preallocated buffer
+    audio_buffer = AudioBuffer(sample_rate, settings.session_buffer_s)
+    segmenter = new_segmenter(sample_rate)
+    resampler: Optional[PolyphaseResampler] = None  # created when the client rate differs
+
+    # Per-stage timings: receive-side costs accumulate until the utterance is cut
+    caption_timings = settings.caption_timings
+    frame_timings: dict[str, float] = {}
+    ACTIVE_SESSIONS.inc()
+
+    # Source language: detected on early utterances, then pinned (or set by the client)
+    tracker = LanguageTracker()
+
+    # Pipeline: receive loop -> bounded work queue -> workers -> in-order sender
+    seq_counter = itertools.count()
+    work_queue = UtteranceQueue(settings.session_queue_size, settings.session_queue_policy)
+    sequencer = CaptionSequencer(send)
+
+    # Global admission: utterances this session holds a slot for
+    admission = get_admission_control()
+    admitted: set[int] = set()
+
+    def release(seq: int) -> None:
+        if seq in admitted:
+            admitted.discard(seq)
+            admission.release()
+
+    # Cross-session scheduler: this session's share of the processing slots
+    scheduler = get_scheduler()
+    share = scheduler.open_session("room" if room is not None else "session") if scheduler else None
+
+    workers = [
+        asyncio.create_task(_utterance_worker(work_queue, sequencer, tracker, release, share))
+        for _ in range(max(settings.session_pipeline_workers, 1))
+    ]
+
+    # Streaming mode: rolling-window passes emit partials, committed text becomes captions
+    streaming = settings.streaming_captions
+    streamer = StreamingTranscriber(
+        sample_rate, settings.streaming_interval_ms, settings.streaming_max_window_s
+    )
+    stream_task: Optional[asyncio.Task] = None
+    background: set[asyncio.Task] = set()
+
+    # Models still loading: audio is dropped (not queued behind the load) until ready
+    status = readiness()
+    models_ready = status["ready"]
+    warming_notice_at = 0.0
+
     try:
         await websocket.send_json({
             "type": "ready",
             "message": "Connected. Send audio chunks.",
             "config": {
                 "sample_rate": sample_rate, 
-                "chunk_size_ms": 250
-            }
+                "chunk_size_ms": 250,
+                "accepts_native_sample_rate": True,
+                "protocols": ["json", "binary"],
+                "binary_header": {"format": "<IIHH", "fields": ["seq", "sample_rate", "flags", "reserved"]},
+            },
+            "models_ready": models_ready,
         })
+        if not models_ready:
+            await websocket.send_json(_warming_up_message(status))
+            warming_notice_at = time.monotonic()
         
         while True:
             try:
-                # 1. Receive & Parse Message
+                # 1. Receive & Parse Message (binary PCM frame or JSON text frame)
                 try:
-                    data = await websocket.receive_json()
+                    message = await websocket.receive()
                 except WebSocketDisconnect:
                     break
-                except Exception:
-                    # If receive_json fails (e.g. text/bytes mismatch), try text
-                    # or just stop. simpler to rely on disconnect.
+                if message["type"] == "websocket.disconnect":
                     break
-                
-                # data is already a dict from receive_json()
-                
-                target_lang = data.get("target_lang") or target_lang
-                audio_b64 = data.get("audio")
-                
-                if not audio_b64:
+
+                decode_started = time.perf_counter()
+                try:
+                    if message.get("bytes") is not None:
+                        frame = parse_binary_frame(message["bytes"])
+                    else:
+                        data = parse_json_message(message.get("text"))
+                        target_langs = _parse_target_langs(data, target_langs)
+                        if "source_lang" in data:
+                            tracker.set_explicit(data["source_lang"])
+                            streamer.language = tracker.explicit
+                        if "streaming" in data:
+                            streaming = bool(data["streaming"])
+                        if "timings" in data:
+                            caption_timings = bool(data["timings"])
+                        frame = parse_json_audio(data)
+                except ProtocolError as e:
+                    await websocket.send_json({"type": "error", "error": f"Bad frame: {e}"})
                     continue
-                
-                # 2. Decode & Buffer
-                chunk_bytes = base64.b64decode(audio_b64)
-                audio_buffer.extend(chunk_bytes)
-                
-                # 3. VAD Logic
-                # Calculate duration of current buffer
-                # 16-bit mono = 2 bytes per sample
-                current_duration_s = len(audio_buffer) / (2 * sample_rate)
-                
-                chunk_is_silent = is_silence(chunk_bytes, SILENCE_THRESHOLD)
-                
-                now = time.time()
-                should_process = False
-                
-                if chunk_is_silent:
-                    if silence_start_time is None:
-                        silence_start_time = now
-                    elif (now - silence_start_time) * 1000 >= SILENCE_DURATION_MS:
-                        # Enough silence detected -> End of sentence?
-                        if current_duration_s >= MIN_BUFFER_DURATION_S:
-                            should_process = True
+
+                if frame is None:
+                    continue
+
+                if not models_ready:
+                    status = readiness()
+                    models_ready = status["ready"]
+                    if models_ready:
+                        await websocket.send_json({"type": "models_ready", "status": status})
+                    else:
+                        if time.monotonic() - warming_notice_at >= WARMING_UP_INTERVAL_S:
+                            await websocket.send_json(_warming_up_message(status))
+                            warming_notice_at = time.monotonic()
+                        continue
+
+                # 2. Convert to float32 once, straight into the session buffer
+                #    (resampled first when the client sends its native rate)
+                in_rate = frame.sample_rate or sample_rate
+                if in_rate != sample_rate:
+                    if not MIN_INPUT_RATE <= in_rate <= MAX_INPUT_RATE:
+                        await websocket.send_json({"type": "error", "error": f"Unsupported sample_rate {in_rate}"})
+                        continue
+                    if resampler is None or resampler.in_rate != in_rate:
+                        resampler = PolyphaseResampler(in_rate, sample_rate)
+                    chunk = audio_buffer.write(resampler.process(pcm16_to_float(frame.pcm)))
                 else:
-                    silence_start_time = None
-                    
-                # Force process if buffer too long
-                if current_duration_s >= MAX_BUFFER_DURATION_S:
+                    chunk = audio_buffer.write_pcm16(frame.pcm)
+                record_stage(frame_timings, "decode", time.perf_counter() - decode_started)
+
+                # 3. VAD (frame-level, adaptive noise floor) on the new samples, in place
+                vad_started = time.perf_counter()
+                chunk_is_voiced = segmenter.push(chunk)
+                record_stage(frame_timings, "vad", time.perf_counter() - vad_started)
+                if streaming:
+                    # The streamer keeps its own rolling window
+                    streamer.append(chunk, voiced=chunk_is_voiced)
+                    audio_buffer.consume(len(audio_buffer))
+                    if streamer.due() and (stream_task is None or stream_task.done()):
+                        stream_task = asyncio.create_task(_stream_pass(
+                            send, streamer, session_langs(), sequencer, seq_counter, background,
+                            share=share, timings=caption_timings,
+                        ))
+                elif not segmenter.has_speech:
+                    # Nothing to transcribe yet: keep only a short pre-roll
+                    drop = segmenter.preroll_start()
+                    if drop:
+                        audio_buffer.consume(drop)
+                        segmenter.advance(drop)
+
+                # 4. Utterance boundaries
+                current_duration_s = (streamer.buffered if streaming else len(audio_buffer)) / sample_rate
+
+                should_process = False
+
+                # Enough trailing silence (audio time) after speech -> End of sentence
+                if segmenter.has_speech and segmenter.silence_ms >= SILENCE_DURATION_MS:
+                    if current_duration_s >= MIN_BUFFER_DURATION_S:
+                        should_process = True
+
+                # Force process if buffer too long (streaming trims its own window)
+                if not streaming and current_duration_s >= MAX_BUFFER_DURATION_S:
                     should_process = True
-                
-                # 4. Process if needed
-                if should_process:
-                    logger.info(f"Processing buffer: {current_duration_s:.2f}s")
-                    
-                    # Offload to thread to not block WS ping/pong
-                    process_task = asyncio.create_task(
-                        process_audio_buffer(bytes(audio_buffer), target_lang, sample_rate)
+
+                # Client-side end of utterance (e.g. push-to-talk release)
+                if frame.end_of_utterance and current_duration_s >= MIN_BUFFER_DURATION_S:
+                    should_process = True
+
+                # 5. Hand the utterance to the session's workers; keep receiving
+                if should_process and streaming:
+                    # Commit whatever is left once the speaker pauses
+                    stream_task = asyncio.create_task(_stream_pass(
+                        send, streamer, session_langs(), sequencer, seq_counter, background,
+                        final=True, previous=stream_task, share=share, timings=caption_timings,
+                    ))
+                    segmenter.advance(segmenter.total - segmenter.origin)
+                elif should_process and segmenter.has_speech:
+                    # Cut at frame precision: speech plus padding, non-speech trimmed
+                    start, end = segmenter.span()
+                    vad_stats.sent_s += (end - start) / sample_rate
+                    seq = next(seq_counter)
+                    logger.info(
+                        f"Queueing utterance {seq}: {(end - start) / sample_rate:.2f}s "
+                        f"(buffer {current_duration_s:.2f}s)"
                     )
-                    
-                    # We await it here for simplicity, but in a real streaming system 
-                    # we might want to just fire & forget or use a queue. 
-                    # For now, awaiting ensures we don't overlap two translations of same context logic 
-                    # (though we cleared buffer, so overlap isn't an issue execution-wise, but ordering is).
-                    # 'await' causes a small pause in receiving, which is actually fine 
-                    # because we act on silence.
-                    result = await process_task
-                    
-                    if result["original"]:
-                        result["type"] = "caption"
-                        await websocket.send_json(result)
-                    
-                    # Reset
-                    audio_buffer = bytearray()
-                    silence_start_time = None
-                    last_process_time = now
-                    
+                    utterance_timings = frame_timings if caption_timings else None
+                    frame_timings = {}
+                    if not admission.try_acquire():
+                        # Saturated: tell the client instead of queueing without limit
+                        logger.warning(
+                            "Overloaded (%d utterances in flight); rejecting utterance %s",
+                            admission.in_flight, seq,
+                        )
+                        UTTERANCES.inc(outcome="rejected")
+                        await sequencer.skip([seq])
+                        await websocket.send_json({
+                            "type": "overloaded",
+                            "seq": seq,
+                            "in_flight": admission.in_flight,
+                            "limit": admission.limit,
+                            "retry_after_ms": OVERLOAD_RETRY_AFTER_MS,
+                            "message": "Server is at capacity; utterance dropped.",
+                        })
+                    else:
+                        admitted.add(seq)
+                        skipped = work_queue.put(Utterance(
+                            seq=seq,
+                            audio=audio_buffer.view(start, end),  # zero-copy handoff
+                            target_langs=session_langs(),
+                            sample_rate=sample_rate,
+                            timings=utterance_timings,
+                            # Trailing audio after the cut is the silence that ended the speech
+                            speech_ended_at=time.perf_counter() - (len(audio_buffer) - end) / sample_rate,
+                        ))
+                        SESSION_QUEUE_DEPTH.observe(len(work_queue))
+                        if skipped:
+                            logger.warning(
+                                "Session queue full (%s); skipping utterances %s",
+                                settings.session_queue_policy, skipped,
+                            )
+                            UTTERANCES.inc(len(skipped), outcome="dropped")
+                            for skipped_seq in skipped:
+                                release(skipped_seq)
+                            await sequencer.skip(skipped)
+                    # Audio after the cut (if any) starts the next buffer
+                    audio_buffer.consume(end)
+                    segmenter.advance(end)
+                elif should_process:
+                    # No speech in the whole buffer: nothing for Whisper
+                    segmenter.advance(len(audio_buffer))
+                    audio_buffer.consume(len(audio_buffer))
+
             except Exception as e:
                 logger.error(f"WS Loop Error: {e}")
                 
     except Exception as e:
         logger.exception("WebSocket handler critical error: %s", e)
     finally:
+        ACTIVE_SESSIONS.dec()
+        work_queue.close()
+        tasks = [*workers, *background, *([stream_task] if stream_task else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if share is not None:
+            scheduler.close_session(share)
+        for seq in list(admitted):
+            release(seq)
+        if room is not None:
+            room.speakers -= 1
+            registry.release(room)
         try:
             await websocket.close()
         except:
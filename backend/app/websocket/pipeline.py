@@ -0,0 +1,172 @@
+"""
+Per-session producer/consumer pipeline.
+The receive loop keeps buffering audio while finished utterances wait in a bounded
+work queue; results are released to the socket strictly in utterance order.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies for a full work queue
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued utterance (favour fresh speech)
+DROP_NEWEST = "drop_newest"  # discard the utterance being added
+MERGE = "merge"  # append the new audio to the newest queued utterance
+QUEUE_POLICIES = (DROP_OLDEST, DROP_NEWEST, MERGE)
+
+OVERLOAD_RETRY_AFTER_MS = 1000  # hint sent with "overloaded" messages
+
+
+@dataclass
+class Utterance:
+    """A finished chunk of speech waiting for STT + translation."""
+
+    seq: int
+    audio: np.ndarray  # float32 view of the session buffer
+    target_langs: list[str]
+    sample_rate: int
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    timings: Optional[dict] = None  # per-stage ms attached to the caption (opt-in)
+    speech_ended_at: Optional[float] = None  # perf_counter time the speech ended (default: enqueued_at)
+
+
+class UtteranceQueue:
+    """Bounded FIFO of utterances with an explicit policy when full."""
+
+    def __init__(self, maxsize: int, policy: str = DROP_OLDEST) -> None:
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy {policy!r}; expected one of {QUEUE_POLICIES}")
+        self._items: deque[Utterance] = deque()
+        self._maxsize = max(maxsize, 1)
+        self._policy = policy
+        self._not_empty = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+        self.merged = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, utterance: Utterance) -> list[int]:
+        """
+        Add an utterance. Returns the seq numbers that will never produce a result
+        (dropped or merged away) so the caller can tell the sequencer to skip them.
+        """
+        skipped: list[int] = []
+        if len(self._items) >= self._maxsize:
+            if self._policy == DROP_NEWEST:
+                self.dropped += 1
+                return [utterance.seq]
+            if self._policy == MERGE:
+                tail = self._items[-1]
+                if tail.sample_rate == utterance.sample_rate:
+                    tail.audio = np.concatenate((tail.audio, utterance.audio))
+                    tail.target_langs = utterance.target_langs
+                    self.merged += 1
+                    return [utterance.seq]
+            # DROP_OLDEST, or MERGE across a sample-rate change
+            skipped.append(self._items.popleft().seq)
+            self.dropped += 1
+        self._items.append(utterance)
+        self._not_empty.set()
+        return skipped
+
+    async def get(self) -> Optional[Utterance]:
+        """Wait for the next utterance; None once the queue is closed and drained."""
+        while not self._items:
+            if self._closed:
+                return None
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self._items.popleft()
+
+    def close(self) -> None:
+        self._closed = True
+        self._not_empty.set()
+
+
+class CaptionSequencer:
+    """Release per-utterance results in seq order, whatever order they finish in."""
+
+    def __init__(self, send: Callable[[dict], Awaitable[None]]) -> None:
+        self._send = send
+        self._next_seq = 0
+        self._ready: dict[int, Optional[dict]] = {}
+        self._lock = asyncio.Lock()
+
+    async def complete(self, seq: int, message: Optional[dict]) -> None:
+        """Record a finished utterance; None means it produced nothing to send."""
+        self._ready[seq] = message
+        await self._flush()
+
+    async def skip(self, seqs: list[int]) -> None:
+        for seq in seqs:
+            self._ready[seq] = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._lock:
+            while self._next_seq in self._ready:
+                message = self._ready.pop(self._next_seq)
+                self._next_seq += 1
+                if message is not None:
+                    await self._send(message)
+
+
+class AdmissionControl:
+    """
+    Global cap on utterances in flight (queued or processing) across all sessions.
+    Utterances over the cap are rejected up front instead of queueing without limit.
+    """
+
+    _instance: Optional["AdmissionControl"] = None
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit  # 0 = unlimited
+        self.in_flight = 0
+        self.peak = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        if self.limit and self.in_flight >= self.limit:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        self.peak = max(self.peak, self.in_flight)
+        return True
+
+    def release(self) -> None:
+        self.in_flight = max(self.in_flight - 1, 0)
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+def get_admission_control() -> AdmissionControl:
+    """Process-wide admission control (single event loop, so no locking)."""
+    if AdmissionControl._instance is None:
+        AdmissionControl._instance = AdmissionControl(get_settings().max_inflight_utterances)
+    return AdmissionControl._instance
+
+
+registry.gauge(
+    "vt_inflight_utterances", "Utterances queued or processing across all sessions",
+    lambda: get_admission_control().in_flight,
+)
@@ -0,0 +1,96 @@
+"""
+Wire protocol for /ws/audio.
+
+Two client formats are accepted on the same socket:
+- JSON text frames: {"audio": "<base64 PCM16>", "target_lang": "hi", "sample_rate": 16000}
+- Binary frames: fixed 12-byte little-endian header followed by raw PCM16 mono samples.
+  Control messages (target language changes etc.) are still sent as JSON text frames.
+"""
+import base64
+import binascii
+import json
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+# seq (u32), sample_rate (u32), flags (u16), reserved (u16) -> keeps PCM 2-byte aligned
+AUDIO_HEADER = struct.Struct("<IIHH")
+AUDIO_HEADER_SIZE = AUDIO_HEADER.size
+
+# Header flags
+FLAG_END_OF_UTTERANCE = 0x0001  # client knows the speaker stopped; process buffer now
+
+
+class ProtocolError(ValueError):
+    """Malformed client frame."""
+
+
+@dataclass
+class AudioFrame:
+    """One chunk of PCM16 mono audio from the client."""
+
+    pcm: memoryview
+    sample_rate: Optional[int] = None
+    seq: Optional[int] = None
+    flags: int = 0
+
+    @property
+    def end_of_utterance(self) -> bool:
+        return bool(self.flags & FLAG_END_OF_UTTERANCE)
+
+
+def parse_binary_frame(data: bytes) -> AudioFrame:
+    """Parse a binary audio frame. The PCM payload is a view into `data` (no copy)."""
+    if len(data) < AUDIO_HEADER_SIZE:
+        raise ProtocolError(f"Binary frame too short: {len(data)} bytes")
+    seq, sample_rate, flags, _reserved = AUDIO_HEADER.unpack_from(data)
+    pcm = memoryview(data)[AUDIO_HEADER_SIZE:]
+    if len(pcm) % 2:
+        raise ProtocolError("PCM16 payload has odd length")
+    return AudioFrame(pcm=pcm, sample_rate=sample_rate or None, seq=seq, flags=flags)
+
+
+def parse_json_message(text: str) -> dict:
+    """Decode a JSON text frame; only objects are valid messages."""
+    try:
+        data = json.loads(text or "{}")
+    except ValueError as e:
+        raise ProtocolError(f"Invalid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ProtocolError(f"JSON frame must be an object, got {type(data).__name__}")
+    return data
+
+
+def _optional_int(data: dict, field: str) -> Optional[int]:
+    value = data.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ProtocolError(f"{field} must be an integer, got {value!r}")
+    return value
+
+
+def parse_json_audio(data: dict) -> Optional[AudioFrame]:
+    """Extract the audio chunk from a legacy JSON message, if it carries one."""
+    audio_b64 = data.get("audio")
+    if not audio_b64:
+        return None
+    if not isinstance(audio_b64, str):
+        raise ProtocolError("audio must be a base64 string")
+    try:
+        pcm = base64.b64decode(audio_b64)
+    except binascii.Error as e:
+        raise ProtocolError(f"Invalid base64 audio: {e}") from e
+    if len(pcm) % 2:
+        raise ProtocolError("PCM16 payload has odd length")
+    return AudioFrame(
+        pcm=memoryview(pcm),
+        sample_rate=_optional_int(data, "sample_rate") or None,
+        seq=_optional_int(data, "seq"),
+        flags=FLAG_END_OF_UTTERANCE if data.get("end_of_utterance") else 0,
+    )
+
+
+def build_binary_frame(pcm: bytes, seq: int, sample_rate: int, flags: int = 0) -> bytes:
+    """Encode a binary audio frame (used by clients, benchmarks and tools)."""
+    return AUDIO_HEADER.pack(seq, sample_rate, flags, 0) + pcm
@@ -0,0 +1,153 @@
+"""
+Broadcast rooms: one speaker socket publishes captions, many listener sockets receive
+them in their own language. Transcription runs once per utterance and translation once
+per distinct listener language; each listener has a bounded send queue so a slow
+listener only drops its own messages.
+"""
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from fastapi import WebSocketDisconnect
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Listener:
+    """One subscribed socket with its own bounded outbox."""
+
+    def __init__(self, websocket, target_lang: str, queue_size: int) -> None:
+        self.websocket = websocket
+        self.target_lang = target_lang
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size, 1))
+        self.dropped = 0
+
+    def offer(self, message: dict) -> None:
+        """Enqueue without blocking the publisher; drop the oldest message when full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def run_sender(self) -> None:
+        while True:
+            message = await self.queue.get()
+            await self.websocket.send_json(message)
+
+
+class Room:
+    """Pub/sub hub for one speaker and its listeners."""
+
+    def __init__(self, room_id: str) -> None:
+        self.room_id = room_id
+        self.listeners: set[Listener] = set()
+        self.speakers = 0
+        self.published = 0
+
+    def target_langs(self) -> list[str]:
+        """Distinct languages the current listeners want."""
+        return list(dict.fromkeys(listener.target_lang for listener in self.listeners))
+
+    def publish(self, message: dict) -> None:
+        """Fan a speaker message out to listeners, picking each listener's translation."""
+        self.published += 1
+        translations = message.get("translations") or {}
+        for listener in list(self.listeners):
+            out = dict(message)
+            if message.get("type") == "caption":
+                translated = translations.get(listener.target_lang)
+                if translated is None:
+                    # Not decoded for this language (e.g. the listener switched mid-utterance);
+                    # never pass another language's text off under this listener's tag
+                    out.pop("translated", None)
+                    out["untranslated"] = True
+                else:
+                    out["translated"] = translated
+                out["target_lang"] = listener.target_lang
+                out.pop("translations", None)
+            listener.offer(out)
+
+    def is_empty(self) -> bool:
+        return not self.listeners and not self.speakers
+
+    def stats(self) -> dict:
+        return {
+            "speakers": self.speakers,
+            "listeners": len(self.listeners),
+            "languages": self.target_langs(),
+            "published": self.published,
+            "dropped": sum(listener.dropped for listener in self.listeners),
+        }
+
+
+class RoomRegistry:
+    """In-process registry of active rooms."""
+
+    _instance: Optional["RoomRegistry"] = None
+
+    def __init__(self) -> None:
+        self._rooms: dict[str, Room] = {}
+
+    def get(self, room_id: str) -> Room:
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = Room(room_id)
+        return room
+
+    def release(self, room: Room) -> None:
+        if room.is_empty() and self._rooms.get(room.room_id) is room:
+            del self._rooms[room.room_id]
+
+    def stats(self) -> dict:
+        return {room_id: room.stats() for room_id, room in self._rooms.items()}
+
+
+def get_room_registry() -> RoomRegistry:
+    """Singleton room registry."""
+    if RoomRegistry._instance is None:
+        RoomRegistry._instance = RoomRegistry()
+    return RoomRegistry._instance
+
+
+async def handle_listener_websocket(websocket, room_id: str) -> None:
+    """
+    Listener socket: receives captions for `room_id` in its target language.
+    The language comes from the `target_lang` query parameter and can be changed
+    with a {"target_lang": "..."} text message.
+    """
+    settings = get_settings()
+    registry = get_room_registry()
+    room = registry.get(room_id)
+    listener = Listener(
+        websocket,
+        websocket.query_params.get("target_lang") or "en",
+        settings.room_listener_queue_size,
+    )
+    room.listeners.add(listener)
+    sender = asyncio.create_task(listener.run_sender())
+    try:
+        await websocket.send_json({
+            "type": "ready",
+            "message": f"Listening to room {room_id}.",
+            "room": room_id,
+            "target_lang": listener.target_lang,
+        })
+        while True:
+            try:
+                text = await websocket.receive_text()
+            except (WebSocketDisconnect, RuntimeError):
+                break
+            try:
+                data = json.loads(text)
+            except ValueError:
+                continue
+            if data.get("target_lang"):
+                listener.target_lang = data["target_lang"]
+    finally:
+        room.listeners.discard(listener)
+        registry.release(room)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
@@ -0,0 +1,186 @@
+"""
+Streaming captions: re-transcribe a rolling window at a fixed cadence and commit
+only the words that consecutive passes agree on (local agreement). Committed audio
+is trimmed from the window so each pass stays short.
+"""
+import re
+import time
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from app.services.audio_buffer import AudioBuffer
+from app.services.stt_service import TranscriptionResult, Word
+
+Transcriber = Callable[[np.ndarray, Optional[str]], Awaitable[TranscriptionResult]]
+WINDOW_HEADROOM_S = 2.0  # buffer beyond the max window: audio that arrives during a pass
+
+_NORMALIZE_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def _norm(word: Word) -> str:
+    return _NORMALIZE_RE.sub("", word.text.lower())
+
+
+class LocalAgreement:
+    """Commit the longest word prefix shared by the last two hypotheses."""
+
+    def __init__(self) -> None:
+        self._previous: list[Word] = []
+
+    def update(self, words: list[Word]) -> tuple[list[Word], list[Word]]:
+        """Returns (newly committed words, tentative words)."""
+        agreed = 0
+        for prev, cur in zip(self._previous, words):
+            if _norm(prev) != _norm(cur):
+                break
+            agreed += 1
+        committed, tentative = words[:agreed], words[agreed:]
+        # Committed audio is trimmed, so the next pass starts after the committed words
+        self._previous = tentative
+        return committed, tentative
+
+    def carry(self, words: list[Word]) -> None:
+        """Set the hypothesis the next pass is compared against."""
+        self._previous = words
+
+    def reset(self) -> None:
+        self._previous = []
+
+
+class StreamingStats:
+    """Time-to-first-caption across streaming utterances."""
+
+    def __init__(self) -> None:
+        self.utterances = 0
+        self.passes = 0
+        self.total_ttfc_s = 0.0
+        self.max_ttfc_s = 0.0
+
+    def record_ttfc(self, seconds: float) -> None:
+        self.utterances += 1
+        self.total_ttfc_s += seconds
+        self.max_ttfc_s = max(self.max_ttfc_s, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "utterances": self.utterances,
+            "passes": self.passes,
+            "avg_ttfc_ms": round(1000 * self.total_ttfc_s / self.utterances, 1) if self.utterances else None,
+            "max_ttfc_ms": round(1000 * self.max_ttfc_s, 1),
+        }
+
+
+streaming_stats = StreamingStats()
+
+
+class StreamingTranscriber:
+    """Rolling-window transcriber for one session."""
+
+    def __init__(self, sample_rate: int, interval_ms: int, max_window_s: float) -> None:
+        self.sample_rate = sample_rate
+        self._interval_s = interval_ms / 1000.0
+        self._max_window = int(max_window_s * sample_rate)
+        self._agreement = LocalAgreement()
+        self._buffer: Optional[AudioBuffer] = None  # float32 audio not yet committed; allocated on first speech
+        self.language: Optional[str] = None
+        self.speech_started_at: Optional[float] = None
+        self._last_pass_at = 0.0
+        self._first_output_sent = False
+        self._in_pass = False
+        self._tail_voiced = False  # voiced audio arrived after the final pass's snapshot
+
+    @property
+    def buffer(self) -> AudioBuffer:
+        if self._buffer is None:
+            window_s = self._max_window / self.sample_rate + WINDOW_HEADROOM_S
+            self._buffer = AudioBuffer(self.sample_rate, window_s)
+        return self._buffer
+
+    @property
+    def buffered(self) -> int:
+        """Uncommitted samples (0 before the first speech, without allocating)."""
+        return len(self._buffer) if self._buffer is not None else 0
+
+    def append(self, audio: np.ndarray, voiced: bool) -> None:
+        if voiced and self.speech_started_at is None:
+            self.speech_started_at = time.perf_counter()
+        self._tail_voiced = self._tail_voiced or voiced
+        if self.speech_started_at is not None:
+            self.buffer.write(audio)
+            if not self._in_pass:  # a running pass consumes by position; it trims afterwards
+                self._trim()
+
+    def _trim(self) -> None:
+        """Hard cap: drop the oldest audio beyond the max window (no agreement, or silence)."""
+        excess = len(self.buffer) - self._max_window
+        if excess > 0:
+            self.buffer.consume(excess)
+            self._agreement.reset()  # word times referred to the dropped audio
+
+    def due(self) -> bool:
+        """True when a new pass should run (cadence reached and there is speech)."""
+        if self.speech_started_at is None or self.buffered < self.sample_rate // 2:  # < 0.5 s
+            return False
+        return time.perf_counter() - self._last_pass_at >= self._interval_s
+
+    async def step(self, transcribe: Transcriber, final: bool = False) -> tuple[str, str]:
+        """
+        Run one pass over the window. Returns (committed text, tentative text).
+        With final=True everything heard so far is committed; call reset() afterwards.
+        """
+        self._last_pass_at = time.perf_counter()
+        streaming_stats.passes += 1
+        # Audio keeps arriving while the pass runs; only the snapshot is consumed
+        snapshot = len(self.buffer)
+        if final:
+            self._tail_voiced = False
+        self._in_pass = True
+        try:
+            result = await transcribe(self.buffer.view(0, snapshot), self.language)
+        finally:
+            self._in_pass = False
+        if result.detected_language and self.language is None:
+            self.language = result.detected_language
+
+        if final:
+            committed, tentative = result.words, []
+        else:
+            committed, tentative = self._agreement.update(result.words)
+            if not committed and len(self.buffer) >= self._max_window and len(tentative) > 1:
+                # No agreement within the window: commit all but the last (possibly cut) word
+                committed, tentative = tentative[:-1], tentative[-1:]
+                self._agreement.carry(tentative)
+
+        if final:
+            self.buffer.consume(snapshot)
+        else:
+            if committed:
+                # Drop committed audio so the next pass only covers the open tail
+                self.buffer.consume(min(int(committed[-1].end * self.sample_rate), snapshot))
+            self._trim()
+        return _join(committed), _join(tentative)
+
+    def mark_output(self) -> Optional[float]:
+        """Record that text reached the client; returns time-to-first-caption once per utterance."""
+        if self._first_output_sent or self.speech_started_at is None:
+            return None
+        self._first_output_sent = True
+        ttfc = time.perf_counter() - self.speech_started_at
+        streaming_stats.record_ttfc(ttfc)
+        return ttfc
+
+    def reset(self) -> None:
+        """Start a new utterance; audio that arrived after the final pass is kept only if voiced."""
+        self._agreement.reset()
+        self._first_output_sent = False
+        if self._tail_voiced and self.buffered:
+            self.speech_started_at = time.perf_counter()
+        else:
+            if self.buffered:
+                self.buffer.consume(self.buffered)
+            self.speech_started_at = None
+
+
+def _join(words: list[Word]) -> str:
+    return " ".join(w.text for w in words).strip()
@@ -0,0 +1 @@
+"""Benchmarks for the backend hot paths. Run with `python -m benchmarks.<name>` from backend/."""
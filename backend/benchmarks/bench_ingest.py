@@ -0,0 +1,59 @@
+"""
+Micro-benchmark: JSON/base64 vs binary ingest of one audio chunk on /ws/audio.
+
+Measures the server-side hot path only (parse + append to the session buffer)
+and the bytes each format puts on the wire.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ingest [--chunk-ms 250] [--sample-rate 16000] [--iterations 20000]
+"""
+import argparse
+import base64
+import json
+import os
+import timeit
+
+from app.websocket.protocol import build_binary_frame, parse_binary_frame, parse_json_audio
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-ms", type=int, default=250)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    samples = args.sample_rate * args.chunk_ms // 1000
+    pcm = os.urandom(samples * 2)
+    json_text = json.dumps({
+        "audio": base64.b64encode(pcm).decode("ascii"),
+        "target_lang": "hi",
+        "sample_rate": args.sample_rate,
+    })
+    binary = build_binary_frame(pcm, seq=1, sample_rate=args.sample_rate)
+
+    def ingest_json() -> None:
+        buf = bytearray()
+        frame = parse_json_audio(json.loads(json_text))
+        buf.extend(frame.pcm)
+
+    def ingest_binary() -> None:
+        buf = bytearray()
+        frame = parse_binary_frame(binary)
+        buf.extend(frame.pcm)
+
+    results = {}
+    for name, fn in (("json+base64", ingest_json), ("binary", ingest_binary)):
+        seconds = min(timeit.repeat(fn, number=args.iterations, repeat=3))
+        results[name] = seconds / args.iterations * 1e6
+
+    print(f"chunk: {args.chunk_ms} ms @ {args.sample_rate} Hz ({len(pcm)} PCM bytes)")
+    print(f"{'format':<14}{'wire bytes':>12}{'us/chunk':>12}")
+    print(f"{'json+base64':<14}{len(json_text.encode()):>12}{results['json+base64']:>12.2f}")
+    print(f"{'binary':<14}{len(binary):>12}{results['binary']:>12.2f}")
+    saved = 1 - len(binary) / len(json_text.encode())
+    print(f"wire bytes saved: {saved:.1%}, ingest speedup: {results['json+base64'] / results['binary']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+OpenAI translation client benchmark against the local stand-in (benchmarks/openai_standin.py).
+
+Simulates N sessions each translating M utterances concurrently and compares:
+  per-call   a new client (and connection) per request, as translate_openai used to do
+  pooled     the shared keep-alive client, one request per utterance
+  batched    the shared client with cross-session batching (OPENAI_BATCHING)
+  unhedged   batched, with a slow tail on the stand-in and no hedge
+  hedged     the same tail, with a stub NLLB hedge started after OPENAI_HEDGE_MS
+Reports latency percentiles, requests and TCP connections seen by the stand-in.
+
+Usage (from backend/):
+    python -m benchmarks.bench_openai [--sessions 16] [--utterances 10] [--delay-ms 150]
+        [--slow-ratio 0.1] [--slow-ms 2000] [--hedge-ms 400] [--local-ms 250]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Optional
+
+os.environ.setdefault("OPENAI_API_KEY", "stand-in")
+os.environ["TRANSLATION_CACHE_SIZE"] = "0"  # measure the client, not the cache
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _http(url: str, method: str = "GET") -> Optional[dict]:
+    try:
+        request = urllib.request.Request(url, method=method)
+        with urllib.request.urlopen(request, timeout=2) as response:
+            return json.loads(response.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _percentiles(values: list[float]) -> dict:
+    ms = sorted(v * 1000 for v in values)
+    pick = lambda q: round(ms[min(int(q * len(ms)), len(ms) - 1)], 1)
+    return {"mean": round(statistics.fmean(ms), 1), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def _start_standin(port: int, args: argparse.Namespace, slow: bool) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "benchmarks.openai_standin", "--port", str(port),
+        "--delay-ms", str(args.delay_ms), "--per-row-ms", str(args.per_row_ms), "--seed", str(args.seed),
+    ]
+    if slow:
+        command += ["--slow-ratio", str(args.slow_ratio), "--slow-ms", str(args.slow_ms)]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        if _http(f"http://127.0.0.1:{port}/stats"):
+            return server
+        time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("stand-in did not start")
+
+
+async def _per_call(text: str, source_lang: str, target_lang: str) -> str:
+    """The old path: a fresh client per translation, closed afterwards."""
+    from openai import AsyncOpenAI
+
+    from app.config import get_settings
+    from app.services.openai_translator import SYSTEM_PROMPT
+
+    settings = get_settings()
+    async with AsyncOpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url) as client:
+        response = await client.chat.completions.create(
+            model=settings.openai_model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT.format(source=source_lang, target=target_lang)},
+                {"role": "user", "content": text},
+            ],
+        )
+    return response.choices[0].message.content
+
+
+async def run_mode(mode: str, args: argparse.Namespace, hedge_ms: int) -> dict:
+    from app.config import get_settings
+    from app.services.openai_translator import OpenAITranslator
+
+    settings = get_settings()
+    settings.openai_batching = mode in ("batched", "hedged", "unhedged")
+    settings.openai_hedge_ms = hedge_ms
+    translator = OpenAITranslator()
+
+    async def local() -> str:
+        await asyncio.sleep(args.local_ms / 1000)
+        return "local"
+
+    async def session(index: int) -> list[float]:
+        latencies = []
+        for n in range(args.utterances):
+            text = f"session {index} utterance {n}: the train leaves from platform four"
+            started = time.perf_counter()
+            if mode == "per-call":
+                await _per_call(text, "en", "hi")
+            else:
+                await translator.translate(text, "en", "hi", local)
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(args.gap_ms / 1000)
+        return latencies
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(session(i) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+    await translator.close()
+    return {
+        "mode": mode,
+        "latency_ms": _percentiles([lat for r in results for lat in r]),
+        "elapsed_s": round(elapsed, 2),
+        "answered_by": translator.outcomes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--utterances", type=int, default=10)
+    parser.add_argument("--gap-ms", type=float, default=20.0, help="pause between a session's utterances")
+    parser.add_argument("--delay-ms", type=float, default=150.0, help="stand-in base latency")
+    parser.add_argument("--per-row-ms", type=float, default=20.0, help="stand-in latency per batched row")
+    parser.add_argument("--slow-ratio", type=float, default=0.1, help="slow-tail share for the hedge runs")
+    parser.add_argument("--slow-ms", type=float, default=2000.0)
+    parser.add_argument("--hedge-ms", type=int, default=400)
+    parser.add_argument("--local-ms", type=float, default=250.0, help="stub NLLB latency")
+    parser.add_argument("--seed", type=int, default=1, help="stand-in random seed (same slow tail per run)")
+    parser.add_argument("--modes", nargs="+", default=["per-call", "pooled", "batched", "unhedged", "hedged"])
+    args = parser.parse_args()
+
+    rows = []
+    for mode in args.modes:
+        port = _free_port()
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+        from app.config import get_settings
+
+        get_settings.cache_clear()
+        server = _start_standin(port, args, slow=mode in ("hedged", "unhedged"))
+        try:
+            row = asyncio.run(run_mode(mode, args, args.hedge_ms if mode == "hedged" else 0))
+            seen = _http(f"http://127.0.0.1:{port}/stats") or {}
+        finally:
+            server.terminate()
+            server.wait(10)
+        row.update(requests=seen.get("requests"), connections=seen.get("connections"))
+        rows.append(row)
+        print(json.dumps(row))
+
+    print(f"\n{'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'requests':>9} {'conns':>6} {'elapsed':>8}")
+    for row in rows:
+        lat = row["latency_ms"]
+        print(
+            f"{row['mode']:<10} {lat['p50']:>8} {lat['p95']:>8} {lat['p99']:>8} "
+            f"{row['requests']:>9} {row['connections']:>6} {row['elapsed_s']:>7}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Micro-benchmark: per-chunk cost of server-side resampling to 16 kHz.
+
+Also checks that chunked resampling matches resampling the whole signal at once
+(i.e. chunk boundaries introduce no artifacts).
+
+Usage (from backend/):
+    python -m benchmarks.bench_resample [--chunk-ms 250] [--iterations 2000]
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from app.services.resampler import PolyphaseResampler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-ms", type=int, default=250)
+    parser.add_argument("--out-rate", type=int, default=16000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'input rate':<12}{'chunk samples':>15}{'us/chunk':>12}{'x realtime':>12}{'max chunk diff':>16}")
+    for in_rate in (44100, 48000):
+        chunk = in_rate * args.chunk_ms // 1000
+        rng = np.random.default_rng(0)
+        signal = (0.3 * rng.standard_normal(in_rate * 4)).astype(np.float32)
+
+        resampler = PolyphaseResampler(in_rate, args.out_rate)
+        whole = resampler.process(signal)
+        resampler.reset()
+        pieces = np.concatenate([
+            resampler.process(signal[i:i + chunk]) for i in range(0, len(signal), chunk)
+        ])
+        diff = float(np.abs(whole - pieces).max())
+
+        resampler.reset()
+        block = signal[:chunk]
+        seconds = min(timeit.repeat(lambda: resampler.process(block), number=args.iterations, repeat=3))
+        per_chunk = seconds / args.iterations
+        realtime = (args.chunk_ms / 1000) / per_chunk
+        print(f"{in_rate:<12}{chunk:>15}{per_chunk * 1e6:>12.1f}{realtime:>12.0f}{diff:>16.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Utterance scheduler vs a plain FIFO slot queue, in one process.
+
+Long talkers send back-to-back utterances cut at the buffer limit (6 s); short talkers
+send 1-2 s sentences with pauses. Both variants have the same number of slots and
+simulate processing as `rtf * audio_s` of sleep:
+  fifo       asyncio.Semaphore: first come, first served
+  scheduler  UtteranceScheduler: per-session fairness, deadline order, shortest-first,
+             with --fast-rtf late utterances run on a faster tier; very late ones are dropped
+Reports latency from end of speech to finished processing (mean / p95) and SLO misses
+per talker class.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scheduler [--long 4] [--short 14] [--slots 4] [--fast-rtf 0.12]
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+
+import numpy as np
+
+from app.services.scheduler import DROP, SHORTEN, UtteranceScheduler
+
+
+class FifoSlots:
+    """Stand-in with the scheduler's acquire/release shape, backed by a semaphore."""
+
+    def __init__(self, slots: int) -> None:
+        self._semaphore = asyncio.Semaphore(slots)
+
+    def open_session(self, label: str = "session") -> None:
+        return None
+
+    async def acquire(self, share, seq, audio_s, speech_ended_at):
+        await self._semaphore.acquire()
+        return None
+
+    def release(self, grant) -> None:
+        self._semaphore.release()
+
+
+async def _talker(slots, kind: str, args: argparse.Namespace, seed: int, latencies: dict) -> None:
+    rng = random.Random(seed)
+    share = slots.open_session(kind)
+    stop_at = time.perf_counter() + args.seconds / args.speed
+    workers = []
+    seq = 0
+    while time.perf_counter() < stop_at:
+        audio_s = 6.0 if kind == "long" else rng.uniform(1.0, 2.0)
+        # Audio arrives in real time; the utterance is ready when its speech ends
+        await asyncio.sleep(audio_s / args.speed + (0 if kind == "long" else rng.uniform(0.3, 1.0) / args.speed))
+        workers.append(asyncio.create_task(_process(slots, share, seq, audio_s, time.perf_counter(), args, latencies[kind])))
+        seq += 1
+    await asyncio.gather(*workers)
+
+
+async def _process(slots, share, seq: int, audio_s: float, ended: float, args: argparse.Namespace, out: list) -> None:
+    grant = await slots.acquire(share, seq, audio_s, ended)
+    if grant is not None and grant.action == DROP:
+        out.append(None)
+        return
+    rtf = args.fast_rtf if grant is not None and grant.action == SHORTEN else args.rtf
+    try:
+        await asyncio.sleep(rtf * audio_s / args.speed)
+    finally:
+        slots.release(grant)
+    out.append((time.perf_counter() - ended) * args.speed)  # back in real-time seconds
+
+
+async def run(variant: str, args: argparse.Namespace) -> dict:
+    if variant == "fifo":
+        slots = FifoSlots(args.slots)
+    else:
+        slots = UtteranceScheduler(
+            args.slots, args.slo_ms / 1000.0 / args.speed,
+            can_shorten=args.fast_rtf > 0, drop_late_s=args.drop_late_ms / 1000.0 / args.speed,
+        )
+        slots.rtf = args.rtf
+    latencies = {"long": [], "short": []}
+    await asyncio.gather(
+        *(_talker(slots, "long", args, i, latencies) for i in range(args.long)),
+        *(_talker(slots, "short", args, 1000 + i, latencies) for i in range(args.short)),
+    )
+    return latencies
+
+
+def _summary(values: list, slo_s: float) -> str:
+    """Dropped utterances (None) count as misses but not toward latency."""
+    done = np.array([v for v in values if v is not None])
+    misses = len(values) - len(done) + int((done > slo_s).sum())
+    return (
+        f"{len(values):>5}{done.mean() * 1000:>10.0f}{np.percentile(done, 95) * 1000:>10.0f}"
+        f"{misses:>8}{misses / len(values):>8.0%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--long", type=int, default=4, help="sessions talking continuously")
+    parser.add_argument("--short", type=int, default=14, help="sessions speaking short sentences")
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--rtf", type=float, default=0.3, help="processing seconds per audio second per slot")
+    parser.add_argument("--fast-rtf", type=float, default=0.0, help="rtf of the fastest Whisper tier (0 = no tiers)")
+    parser.add_argument("--slo-ms", type=int, default=2500)
+    parser.add_argument("--drop-late-ms", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=60.0, help="simulated talking time")
+    parser.add_argument("--speed", type=float, default=10.0, help="run this many times faster than real time")
+    args = parser.parse_args()
+    logging.getLogger("app.services.scheduler").setLevel(logging.ERROR)  # drop warnings
+
+    print(
+        f"{args.long} long + {args.short} short talkers, {args.slots} slots, rtf {args.rtf}"
+        f" (fast tier {args.fast_rtf or 'off'}), SLO {args.slo_ms} ms"
+    )
+    print(f"{'variant':<10}{'class':<7}{'n':>5}{'mean ms':>10}{'p95 ms':>10}{'misses':>8}{'rate':>8}")
+    for variant in ("fifo", "scheduler"):
+        latencies = asyncio.run(run(variant, args))
+        for kind in ("long", "short"):
+            print(f"{variant:<10}{kind:<7}{_summary(latencies[kind], args.slo_ms / 1000.0)}")
+
+
+if __name__ == "__main__":
+    main()
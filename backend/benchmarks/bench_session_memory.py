@@ -0,0 +1,156 @@
+"""
+Session audio path before and after the preallocated float32 buffer.
+
+Feeds 20 ms PCM16 chunks the way the WebSocket loop does and cuts an utterance every
+few seconds, handing it to a stand-in for STT that only touches the float32 samples:
+  bytes   the old path: bytearray buffer, PCM16 -> float32 per chunk for the VAD,
+          a bytes copy per utterance, int16 -> float32 -> /32768 again before STT
+  buffer  AudioBuffer: PCM16 converted once into the buffer, VAD and STT read views
+Reports bytes allocated (tracemalloc peak above the baseline) per utterance, time per
+chunk, and peak RSS per session with many sessions talking at once (one subprocess per
+variant, so the numbers do not mix).
+
+Usage (from backend/):
+    python -m benchmarks.bench_session_memory [--sessions 50] [--utterance-s 3] [--utterances 20]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.services.audio_buffer import AudioBuffer, as_float32
+
+SAMPLE_RATE = 16000
+CHUNK = 320  # 20 ms
+BUFFER_S = 8.0
+
+
+def _chunks(seconds: float, seed: int = 0) -> list[bytes]:
+    rng = np.random.default_rng(seed)
+    audio = (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 3000).astype(np.int16)
+    return [audio[i:i + CHUNK].tobytes() for i in range(0, len(audio), CHUNK)]
+
+
+def _vad(chunk: np.ndarray) -> float:
+    return float(np.abs(chunk).mean())  # frame energy, like the segmenter
+
+
+def _stt(audio: np.ndarray) -> float:
+    return float(audio[::160].sum())  # reads the samples, like the model's feature extractor
+
+
+class BytesSession:
+    """The pre-buffer receive path."""
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def push(self, pcm: bytes) -> None:
+        _vad(np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0)
+        self.buffer.extend(pcm)
+
+    def cut(self) -> None:
+        utterance = bytes(self.buffer[:len(self.buffer)])
+        del self.buffer[:len(utterance)]
+        _stt(np.frombuffer(utterance, dtype=np.int16).astype(np.float32) / 32768.0)
+
+
+class BufferSession:
+    """The AudioBuffer receive path."""
+
+    def __init__(self) -> None:
+        self.buffer = AudioBuffer(SAMPLE_RATE, BUFFER_S)
+
+    def push(self, pcm: bytes) -> None:
+        _vad(self.buffer.write_pcm16(pcm))
+
+    def cut(self) -> None:
+        utterance = self.buffer.view(0, len(self.buffer))
+        self.buffer.consume(len(utterance))
+        _stt(as_float32(utterance))
+
+
+VARIANTS = {"bytes": BytesSession, "buffer": BufferSession}
+
+
+def per_utterance(variant: str, chunks: list[bytes], utterances: int) -> tuple[float, float]:
+    """(KB allocated at peak per utterance, microseconds per chunk)."""
+    session = VARIANTS[variant]()
+    for pcm in chunks:  # warm-up: first allocation of the buffer
+        session.push(pcm)
+    session.cut()
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(utterances):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for pcm in chunks:
+            session.push(pcm)
+        session.cut()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(utterances):
+        for pcm in chunks:
+            session.push(pcm)
+        session.cut()
+    elapsed = time.perf_counter() - started
+    return max(peaks) / 1024, elapsed / (utterances * len(chunks)) * 1e6
+
+
+def _rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux
+
+
+def child(variant: str, sessions: int, utterance_s: float) -> None:
+    """Every session talks at once: each holds a full utterance when the cuts happen."""
+    chunks = _chunks(utterance_s)
+    before = _rss_kb()
+    live = [VARIANTS[variant]() for _ in range(sessions)]
+    for pcm in chunks:
+        for session in live:
+            session.push(pcm)
+    for session in live:
+        session.cut()
+    print(json.dumps({"rss_kb_per_session": (_rss_kb() - before) / sessions}))
+
+
+def rss_per_session(variant: str, sessions: int, utterance_s: float) -> float:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_session_memory", "--child", variant,
+         "--sessions", str(sessions), "--utterance-s", str(utterance_s)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])["rss_kb_per_session"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--utterance-s", type=float, default=3.0)
+    parser.add_argument("--utterances", type=int, default=20)
+    parser.add_argument("--child", choices=sorted(VARIANTS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.sessions, args.utterance_s)
+        return
+
+    chunks = _chunks(args.utterance_s)
+    print(f"{args.utterance_s:.1f} s utterances, {len(chunks)} chunks of 20 ms, {args.sessions} sessions")
+    print(f"{'variant':<9}{'KB/utterance':>14}{'us/chunk':>10}{'RSS KB/session':>16}")
+    for variant in VARIANTS:
+        kb, us = per_utterance(variant, chunks, args.utterances)
+        rss = rss_per_session(variant, args.sessions, args.utterance_s)
+        print(f"{variant:<9}{kb:>14.1f}{us:>10.2f}{rss:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Decode time vs utterance length for NLLB, before and after sentence splitting.
+
+Builds utterances of 1, 2, 4, 8 and 12 sentences (like long force-flushed transcripts) and
+translates each with:
+  whole   one sequence with a fixed 512-token budget (TRANSLATION_SPLIT_CHARS=0)
+  split   sentence/clause pieces in length buckets with per-piece max_new_tokens
+Reports latency per length and the output/input length ratio (a runaway decode shows
+up as a ratio far above 1). Needs the real model for the chosen engine.
+
+Usage (from backend/):
+    python -m benchmarks.bench_split [--engine ct2] [--rounds 3] [--lengths 1 2 4 8 12]
+"""
+import argparse
+import os
+import statistics
+import time
+
+SENTENCES = {
+    "en": [
+        "Good morning, how are you today?",
+        "The train to Mumbai leaves from platform number four at half past six.",
+        "Please send me the report before the meeting tomorrow afternoon.",
+        "We will start the presentation as soon as everyone has joined the call.",
+        "Thank you very much for your help with the project last week.",
+        "I think we should book the tickets now because prices go up on the weekend.",
+    ],
+    "hi": [
+        "आज मौसम बहुत अच्छा है।",
+        "क्या आप मुझे स्टेशन का रास्ता बता सकते हैं?",
+        "मैं कल सुबह दिल्ली जा रहा हूँ।",
+        "हमें बैठक से पहले रिपोर्ट तैयार करनी होगी।",
+    ],
+}
+TARGETS = {"en": "hi", "hi": "en"}
+
+
+def utterance(source_lang: str, sentences: int) -> str:
+    pool = SENTENCES[source_lang]
+    return " ".join(pool[i % len(pool)] for i in range(sentences))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", default="ct2", choices=["nllb", "ct2"])
+    parser.add_argument("--sources", nargs="+", default=["en", "hi"], choices=sorted(SENTENCES))
+    parser.add_argument("--lengths", nargs="+", type=int, default=[1, 2, 4, 8, 12], help="sentences per utterance")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["TRANSLATION_ENGINE"] = args.engine
+    os.environ["TRANSLATION_CACHE_SIZE"] = "0"  # every round decodes
+    from app.services.translation_service import get_translation_service
+
+    service = get_translation_service()
+    settings = service._settings
+    split_defaults = (
+        settings.translation_split_chars or 150,
+        settings.translation_max_new_tokens_ratio,
+        settings.translation_max_new_tokens_extra,
+    )
+    modes = {
+        "whole": (0, 0.0, 512),  # the old behaviour: one sequence, max_length=512
+        "split": split_defaults,
+    }
+    service.translate("Hello.", "en", "hi")  # load + warm-up
+
+    print(f"{'src':<4}{'sent':>5}{'chars':>7}{'whole ms':>10}{'split ms':>10}{'speedup':>9}{'whole out/in':>14}{'split out/in':>14}")
+    for source_lang in args.sources:
+        target_lang = TARGETS[source_lang]
+        for sentences in args.lengths:
+            text = utterance(source_lang, sentences)
+            row = {}
+            for mode, (split_chars, ratio, extra) in modes.items():
+                settings.translation_split_chars = split_chars
+                settings.translation_max_new_tokens_ratio = ratio
+                settings.translation_max_new_tokens_extra = extra
+                times = []
+                for _ in range(args.rounds):
+                    started = time.perf_counter()
+                    out = service.translate(text, source_lang, target_lang)
+                    times.append(time.perf_counter() - started)
+                row[mode] = (statistics.median(times) * 1000, len(out) / len(text))
+            whole_ms, whole_ratio = row["whole"]
+            split_ms, split_ratio = row["split"]
+            print(
+                f"{source_lang:<4}{sentences:>5}{len(text):>7}{whole_ms:>10.1f}{split_ms:>10.1f}"
+                f"{whole_ms / split_ms:>8.2f}x{whole_ratio:>14.2f}{split_ratio:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Side-by-side benchmark: NLLB on PyTorch (TRANSLATION_ENGINE=nllb) vs CTranslate2 (ct2).
+
+Each engine runs in its own subprocess so peak RSS is measured per engine. Reports load
+time, single-sentence latency, batched throughput and peak memory. Models come from
+NLLB_MODEL / CT2_MODEL_DIR (the ct2 model is converted on first use if missing).
+
+Usage (from backend/):
+    python -m benchmarks.bench_translation [--engines nllb ct2] [--batch 8] [--rounds 3]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+SENTENCES = [
+    ("en", "Good morning, how are you today?"),
+    ("en", "The train to Mumbai leaves from platform number four at half past six."),
+    ("en", "Please send me the report before the meeting tomorrow afternoon."),
+    ("hi", "आज मौसम बहुत अच्छा है।"),
+    ("hi", "क्या आप मुझे स्टेशन का रास्ता बता सकते हैं?"),
+    ("en", "We will start the presentation as soon as everyone has joined the call."),
+    ("ta", "நான் நாளை சென்னைக்கு செல்கிறேன்."),
+    ("en", "Thank you very much for your help."),
+]
+TARGET = "hi"
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kB on Linux
+
+
+def run_engine(engine: str, batch: int, rounds: int) -> dict:
+    """Load one engine in this process and time it; returns a result row."""
+    os.environ["TRANSLATION_ENGINE"] = engine
+    os.environ["TRANSLATION_CACHE_SIZE"] = "0"  # measure the model, not the cache
+    from app.services.translation_service import get_translation_service
+
+    service = get_translation_service()
+    rss_before = peak_rss_mb()
+    started = time.perf_counter()
+    if engine == "ct2":
+        service._load_ct2()
+    else:
+        service._load_nllb()
+    load_s = time.perf_counter() - started
+    if (service._translator if engine == "ct2" else service._model) is None:
+        raise SystemExit(f"{engine}: model failed to load (see log above)")
+
+    texts = [text for _, text in SENTENCES]
+    sources = [lang for lang, _ in SENTENCES]
+    service.translate_batch(texts[:1], sources[:1], TARGET)  # warm-up
+
+    single = []
+    for _ in range(rounds):
+        for source, text in SENTENCES:
+            started = time.perf_counter()
+            service.translate(text, source, TARGET)
+            single.append(time.perf_counter() - started)
+
+    rows = (SENTENCES * (batch // len(SENTENCES) + 1))[:batch]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        sample = service.translate_batch([t for _, t in rows], [s for s, _ in rows], TARGET)
+    batch_s = (time.perf_counter() - started) / rounds
+
+    return {
+        "engine": engine,
+        "load_s": round(load_s, 2),
+        "p50_ms": round(statistics.median(single) * 1000, 1),
+        "max_ms": round(max(single) * 1000, 1),
+        "batch_sent_per_s": round(batch / batch_s, 1),
+        "model_rss_mb": round(peak_rss_mb() - rss_before, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "sample": sample[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=["nllb", "ct2"], choices=["nllb", "ct2"])
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_engine(args.child, args.batch, args.rounds), ensure_ascii=False))
+        return
+
+    results = []
+    for engine in args.engines:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_translation", "--child", engine,
+             "--batch", str(args.batch), "--rounds", str(args.rounds)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0 or not proc.stdout.strip():
+            print(f"{engine}: failed\n{proc.stderr.strip()[-2000:]}", file=sys.stderr)
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'engine':<8}{'load s':>8}{'p50 ms':>9}{'max ms':>9}{'batch sent/s':>14}{'model MB':>10}{'peak MB':>9}")
+    for r in results:
+        print(
+            f"{r['engine']:<8}{r['load_s']:>8}{r['p50_ms']:>9}{r['max_ms']:>9}"
+            f"{r['batch_sent_per_s']:>14}{r['model_rss_mb']:>10}{r['peak_rss_mb']:>9}"
+        )
+    for r in results:
+        print(f"{r['engine']}: {r['sample']}")
+
+
+if __name__ == "__main__":
+    main()
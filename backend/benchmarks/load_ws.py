@@ -0,0 +1,383 @@
+"""
+Load / latency benchmark for /ws/audio: N concurrent clients replay audio through the
+real FastAPI app (uvicorn, real WebSocket transport) at real-time or accelerated pace.
+
+The server runs in a subprocess so its CPU and memory can be measured on their own.
+By default it uses stub STT / translation backends with configurable delay (see
+benchmarks/stubs.py), so scheduler and transport changes can be measured without model
+weights; pass --stt real / --translation real to use the models. With --nodes N the
+server runs as an INFERENCE_MODE=remote gateway and the backends run in N inference
+node processes instead (--kill-node-s kills one mid-run to exercise the retry path).
+
+Latency is end of speech -> caption received. Speech ends are found by replaying each
+client's audio through the same VAD segmentation the server uses, so caption `seq` k
+maps to the k-th expected utterance. Utterances that never produce a caption
+(dropped by queue policy or rejected as overloaded) are counted as dropped.
+
+Usage (from backend/):
+    python -m benchmarks.load_ws [wav ...] [--clients 8] [--speed 1.0] [--seconds 60]
+        [--stt-delay-ms 50] [--stt-per-audio-s-ms 100] [--translation-delay-ms 20]
+        [--nodes 3 --kill-node-s 5] [--out benchmarks/results/load.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.websocket.protocol import build_binary_frame
+from benchmarks.vad_report import SAMPLE_RATE, load_wav, replay, synthetic_corpus
+
+RESULTS_DIR = Path(__file__).parent / "results"
+FLUSH_SILENCE_S = 1.5  # trailing silence so the last utterance is cut
+
+
+# --- server subprocess ---
+
+def _install_backends(args: argparse.Namespace) -> None:
+    from benchmarks.stubs import StubSTT, StubTranslation, install, load_backend
+
+    stt = load_backend(
+        args.stt, StubSTT,
+        base_ms=args.stt_delay_ms, per_audio_s_ms=args.stt_per_audio_s_ms, jitter=args.jitter,
+    )
+    translation = load_backend(
+        args.translation, StubTranslation,
+        base_ms=args.translation_delay_ms, per_char_ms=args.translation_per_char_ms, jitter=args.jitter,
+    )
+    install(stt, translation)
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Server side: install the requested backends, then run uvicorn."""
+    import uvicorn
+
+    _install_backends(args)
+    from app.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", ws_max_size=16 * 1024 * 1024)
+
+
+def node(args: argparse.Namespace) -> None:
+    """Inference node side (--nodes): install the requested backends, then serve the gateway."""
+    import logging
+
+    from app.services.inference_node import InferenceNode
+
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [%(levelname)s] node-{args.node} %(name)s: %(message)s")
+    _install_backends(args)
+    InferenceNode([("127.0.0.1", int(os.environ["INFERENCE_GATEWAY_PORT"]))], args.node_slots, f"node-{args.node}").run()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get_json(url: str) -> Optional[dict]:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return json.loads(response.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _proc_usage(pid: int) -> dict:
+    """CPU seconds and RSS of a process (psutil if installed, else /proc on Linux)."""
+    try:
+        import psutil
+
+        proc = psutil.Process(pid)
+        cpu = proc.cpu_times()
+        info = proc.memory_info()
+        return {
+            "cpu_s": cpu.user + cpu.system,
+            "rss_mb": info.rss / 2**20,
+            "peak_rss_mb": getattr(info, "peak_wset", info.rss) / 2**20,
+        }
+    except ImportError:
+        pass
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = os.sysconf("SC_CLK_TCK")
+        usage = {"cpu_s": (int(fields[11]) + int(fields[12])) / ticks}
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    usage["rss_mb"] = int(line.split()[1]) / 1024
+                elif line.startswith("VmHWM:"):
+                    usage["peak_rss_mb"] = int(line.split()[1]) / 1024
+        return usage
+    except OSError:
+        return {}
+
+
+class _Sampler:
+    """Polls server RSS during the run (peak across samples)."""
+
+    def __init__(self, pid: int, interval_s: float = 0.5) -> None:
+        self.pid = pid
+        self.interval_s = interval_s
+        self.peak_rss_mb = 0.0
+
+    async def run(self) -> None:
+        while True:
+            self.peak_rss_mb = max(self.peak_rss_mb, _proc_usage(self.pid).get("rss_mb", 0.0))
+            await asyncio.sleep(self.interval_s)
+
+
+# --- clients ---
+
+def _prepare(audio: np.ndarray, chunk_ms: int) -> dict:
+    """Quantize to PCM16 (what the server sees) and find each utterance's speech end."""
+    audio = np.concatenate((audio, np.zeros(int(FLUSH_SILENCE_S * SAMPLE_RATE), dtype=np.float32)))
+    pcm = (np.clip(audio, -1.0, 32767 / 32768) * 32768).astype(np.int16)
+    expected = replay(pcm.astype(np.float32) / 32768.0, chunk_ms)
+    return {"pcm": pcm, "speech_ends": expected["speech_ends"], "audio_s": expected["audio_s"]}
+
+
+async def run_client(index: int, url: str, item: dict, args: argparse.Namespace) -> dict:
+    import websockets
+
+    await asyncio.sleep(random.uniform(0, args.ramp_s))
+    chunk = SAMPLE_RATE * args.chunk_ms // 1000
+    pcm = item["pcm"]
+    expected = len(item["speech_ends"])
+    captions: dict[int, float] = {}
+    overloaded = errors = 0
+
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.recv()  # ready
+        await ws.send(json.dumps({"target_langs": args.target_langs}))
+
+        async def receive() -> None:
+            nonlocal overloaded, errors
+            async for raw in ws:
+                message = json.loads(raw)
+                kind = message.get("type")
+                if kind == "caption":
+                    captions[message["seq"]] = time.perf_counter()
+                elif kind == "overloaded":
+                    overloaded += 1
+                elif kind == "error" or message.get("error"):
+                    errors += 1
+
+        receiver = asyncio.create_task(receive())
+        started = time.perf_counter()
+        send_times = []
+        for seq, offset in enumerate(range(0, len(pcm), chunk)):
+            piece = pcm[offset:offset + chunk]
+            if args.speed > 0:
+                # A live client sends each chunk once it has been recorded
+                due = started + (offset + len(piece)) / SAMPLE_RATE / args.speed
+                await asyncio.sleep(max(due - time.perf_counter(), 0))
+            await ws.send(build_binary_frame(piece.tobytes(), seq, SAMPLE_RATE))
+            send_times.append(time.perf_counter())
+
+        deadline = time.perf_counter() + args.drain_s
+        while time.perf_counter() < deadline and len(captions) + overloaded < expected:
+            await asyncio.sleep(0.05)
+        receiver.cancel()
+
+    latencies = []
+    for seq, speech_end in enumerate(item["speech_ends"]):
+        if seq not in captions:
+            continue
+        if args.speed > 0:
+            spoken_at = started + speech_end / SAMPLE_RATE / args.speed
+        else:
+            spoken_at = send_times[min((speech_end - 1) // chunk, len(send_times) - 1)]
+        latencies.append(captions[seq] - spoken_at)
+    return {
+        "client": index,
+        "audio_s": item["audio_s"],
+        "expected": expected,
+        "captions": len(captions),
+        "overloaded": overloaded,
+        "errors": errors,
+        "latencies_s": latencies,
+    }
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    ms = sorted(v * 1000 for v in values)
+    pick = lambda q: round(ms[min(int(q * len(ms)), len(ms) - 1)], 1)
+    return {
+        "mean": round(statistics.fmean(ms), 1),
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ms[-1], 1),
+    }
+
+
+async def run_load(args: argparse.Namespace, corpus: list[np.ndarray], port: int, pid: int) -> dict:
+    url = f"ws://127.0.0.1:{port}/ws/audio"
+    items = [_prepare(corpus[i % len(corpus)], args.chunk_ms) for i in range(args.clients)]
+    sampler = _Sampler(pid)
+    sampling = asyncio.create_task(sampler.run())
+    usage_before = _proc_usage(pid)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_client(i, url, item, args) for i, item in enumerate(items)), return_exceptions=True
+    )
+    wall_s = time.perf_counter() - started
+    usage_after = _proc_usage(pid)
+    sampling.cancel()
+
+    failed = [str(r) for r in results if isinstance(r, Exception)]
+    results = [r for r in results if not isinstance(r, Exception)]
+    latencies = [lat for r in results for lat in r["latencies_s"]]
+    expected = sum(r["expected"] for r in results)
+    captions = sum(r["captions"] for r in results)
+    audio_s = sum(r["audio_s"] for r in results)
+    cpu_s = usage_after.get("cpu_s", 0.0) - usage_before.get("cpu_s", 0.0)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("files", "serve", "port")},
+        "files": args.files,
+        "clients": {"requested": args.clients, "completed": len(results), "failed": failed},
+        "wall_s": round(wall_s, 2),
+        "audio_s": round(audio_s, 1),
+        "utterances": {
+            "expected": expected,
+            "captioned": captions,
+            "dropped": expected - captions,
+            "overloaded": sum(r["overloaded"] for r in results),
+            "errors": sum(r["errors"] for r in results),
+        },
+        "latency_ms": _percentiles(latencies),
+        "throughput": {
+            "captions_per_s": round(captions / wall_s, 2) if wall_s else 0.0,
+            "audio_s_per_wall_s": round(audio_s / wall_s, 2) if wall_s else 0.0,
+        },
+        "server": {
+            "cpu_s": round(cpu_s, 2),
+            "cpu_percent": round(100 * cpu_s / wall_s, 1) if wall_s else 0.0,
+            "rss_mb": round(usage_after.get("rss_mb", 0.0), 1),
+            "peak_rss_mb": round(max(sampler.peak_rss_mb, usage_after.get("peak_rss_mb", 0.0)), 1),
+            "stats": _get_json(f"http://127.0.0.1:{port}/stats"),
+        },
+    }
+
+
+def _print_summary(report: dict) -> None:
+    u, lat, thr, srv = report["utterances"], report["latency_ms"], report["throughput"], report["server"]
+    print(f"clients {report['clients']['completed']}/{report['clients']['requested']}  "
+          f"wall {report['wall_s']}s  audio {report['audio_s']}s")
+    print(f"utterances expected {u['expected']}  captioned {u['captioned']}  dropped {u['dropped']}  "
+          f"overloaded {u['overloaded']}  errors {u['errors']}")
+    if lat:
+        print("latency ms  " + "  ".join(f"{k} {v}" for k, v in lat.items()))
+    print(f"throughput  {thr['captions_per_s']} captions/s  {thr['audio_s_per_wall_s']} audio s / wall s")
+    print(f"server      cpu {srv['cpu_percent']}% ({srv['cpu_s']}s)  rss {srv['rss_mb']} MB  "
+          f"peak {srv['peak_rss_mb']} MB")
+    pool = (srv.get("stats") or {}).get("inference_pool") or {}
+    if pool.get("mode") == "remote":
+        print(f"nodes       ready {pool['ready']}  lost {pool['lost']}  retries {pool['retries']}  failed {pool['failed']}  "
+              + "  ".join(f"{n['name']}:{n['completed']}" for n in pool["nodes"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="16-bit PCM WAV files (default: synthetic speech bursts)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 4 = 4x, 0 = as fast as possible")
+    parser.add_argument("--seconds", type=float, default=60.0, help="synthetic audio per client")
+    parser.add_argument("--chunk-ms", type=int, default=250)
+    parser.add_argument("--ramp-s", type=float, default=2.0, help="spread client start times over this window")
+    parser.add_argument("--drain-s", type=float, default=15.0, help="wait this long for trailing captions")
+    parser.add_argument("--target-langs", nargs="+", default=["hi"])
+    parser.add_argument("--stt", default="stub", help="stub, real, or module:factory")
+    parser.add_argument("--translation", default="stub", help="stub, real, or module:factory")
+    parser.add_argument("--stt-delay-ms", type=float, default=50.0)
+    parser.add_argument("--stt-per-audio-s-ms", type=float, default=100.0)
+    parser.add_argument("--translation-delay-ms", type=float, default=20.0)
+    parser.add_argument("--translation-per-char-ms", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1, help="relative +/- delay jitter for stubs")
+    parser.add_argument("--out", help="JSON results path (default: benchmarks/results/load-<time>.json)")
+    parser.add_argument("--server-log", action="store_true", help="show the server's log output")
+    parser.add_argument("--nodes", type=int, default=0, help="run the backends in N inference node processes")
+    parser.add_argument("--node-slots", type=int, default=2, help="concurrent jobs per node")
+    parser.add_argument("--kill-node-s", type=float, default=0.0, help="kill one node this long into the run")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--node", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+    if args.node is not None:
+        node(args)
+        return
+
+    if args.files:
+        corpus = [load_wav(path) for path in args.files]
+    else:
+        corpus = [synthetic_corpus(args.seconds, seed=i)[0][1] for i in range(args.clients)]
+
+    port = _free_port()
+    env = dict(os.environ)
+    output = {
+        "stdout": None if args.server_log else subprocess.DEVNULL,
+        "stderr": None if args.server_log else subprocess.DEVNULL,
+    }
+    nodes: list[subprocess.Popen] = []
+    if args.nodes > 0:
+        env.update(INFERENCE_MODE="remote", INFERENCE_GATEWAY_HOST="127.0.0.1", INFERENCE_GATEWAY_PORT=str(_free_port()))
+    elif args.stt != "real" and args.translation != "real":
+        env["INFERENCE_MODE"] = "local"  # stubs live in the server process
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load_ws", "--serve", "--port", str(port), *sys.argv[1:]],
+        env=env, **output,
+    )
+    for i in range(args.nodes):
+        nodes.append(subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.load_ws", "--node", str(i), *sys.argv[1:]], env=env, **output,
+        ))
+    try:
+        for _ in range(600):
+            health = _get_json(f"http://127.0.0.1:{port}/health")
+            if health and health.get("models_ready"):
+                break
+            if server.poll() is not None:
+                raise SystemExit("server exited during startup")
+            time.sleep(0.5)
+        else:
+            raise SystemExit("server did not become ready")
+        if nodes and args.kill_node_s > 0:
+            threading.Timer(args.kill_node_s, nodes[0].kill).start()
+        report = asyncio.run(run_load(args, corpus, port, server.pid))
+    finally:
+        for process in [server, *nodes]:
+            process.terminate()
+        for process in [server, *nodes]:
+            process.wait(10)
+
+    _print_summary(report)
+    out = Path(args.out) if args.out else RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
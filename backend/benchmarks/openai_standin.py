@@ -0,0 +1,111 @@
+"""
+Local stand-in for the OpenAI chat completions API, for testing the translation client.
+
+Answers POST /v1/chat/completions like the real API: single prompts get "[<to>] <text>",
+batched JSON prompts get {"translations": [...]}. Latency, slow-tail and error rates are
+configurable. GET /stats reports requests, rows and how many TCP connections clients
+opened (to check connection reuse); POST /stats/reset clears them.
+
+Usage (from backend/):
+    python -m benchmarks.openai_standin --port 8089 --delay-ms 150 --slow-ratio 0.1 --slow-ms 2000
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8089/v1 TRANSLATION_ENGINE=openai uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PAIR = re.compile(r"from (\S+) to (\S+?)\.")
+
+
+def create_app(
+    delay_ms: float = 150.0,
+    per_row_ms: float = 20.0,
+    jitter: float = 0.2,
+    slow_ratio: float = 0.0,
+    slow_ms: float = 2000.0,
+    error_ratio: float = 0.0,
+) -> FastAPI:
+    app = FastAPI(title="OpenAI stand-in")
+    stats = {"requests": 0, "rows": 0, "errors": 0, "slow": 0, "connections": set()}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        stats["connections"].add((request.client.host, request.client.port))
+        system, user = body["messages"][0]["content"], body["messages"][-1]["content"]
+        batched = (body.get("response_format") or {}).get("type") == "json_object"
+        if batched:
+            items = json.loads(user)
+            content = json.dumps({"translations": [f"[{i['to']}] {i['text']}" for i in items]}, ensure_ascii=False)
+            rows = len(items)
+        else:
+            match = PAIR.search(system)
+            content = f"[{match.group(2) if match else '?'}] {user}"
+            rows = 1
+        stats["rows"] += rows
+
+        delay = (delay_ms + per_row_ms * (rows - 1)) * (1 + random.uniform(-jitter, jitter))
+        if random.random() < slow_ratio:
+            stats["slow"] += 1
+            delay += slow_ms
+        await asyncio.sleep(delay / 1000)
+        if random.random() < error_ratio:
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "stand-in error", "type": "server_error"}}, status_code=500)
+        return {
+            "id": f"chatcmpl-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "connections": len(stats["connections"])}
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        stats.update(requests=0, rows=0, errors=0, slow=0, connections=set())
+        return {"ok": True}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay-ms", type=float, default=150.0, help="base latency per request")
+    parser.add_argument("--per-row-ms", type=float, default=20.0, help="extra latency per batched row")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--slow-ratio", type=float, default=0.0, help="share of requests in the slow tail")
+    parser.add_argument("--slow-ms", type=float, default=2000.0, help="extra latency of slow requests")
+    parser.add_argument("--error-ratio", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--seed", type=int, help="fix the slow/error draws so runs are comparable")
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    import uvicorn
+
+    app = create_app(
+        args.delay_ms, args.per_row_ms, args.jitter, args.slow_ratio, args.slow_ms, args.error_ratio
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
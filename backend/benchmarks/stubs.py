@@ -0,0 +1,151 @@
+"""
+Stub STT and translation backends for benchmarks: no model weights, configurable delay.
+
+They implement the same methods the WebSocket pipeline and batchers call on
+STTService / TranslationService, sleep for a modelled inference time (releasing the
+GIL like real native inference) and return deterministic text. `install()` swaps
+them in for the service singletons and skips model loading.
+
+Custom backends: pass "package.module:factory" to `load_backend`; the factory is
+called with no arguments and must return an object with the same methods.
+"""
+import importlib
+import itertools
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+from app.services.stt_service import Audio, TranscriptionResult
+
+
+def _seconds(audio: Audio, sample_rate: int) -> float:
+    """Duration of float32 samples or (warm-up) PCM16 bytes."""
+    if isinstance(audio, np.ndarray):
+        return len(audio) / sample_rate
+    return len(audio) / (2 * sample_rate)
+
+
+# Relative cost of Whisper sizes (base = 1), so tiering shows up in load tests
+TIER_COST = {"tiny": 0.4, "base": 1.0, "small": 2.5, "medium": 6.0, "large-v2": 12.0, "large-v3": 12.0}
+
+
+class StubSTT:
+    """Whisper stand-in: delay = (base + per_audio_s * audio seconds) * tier cost (+ jitter)."""
+
+    def __init__(self, base_ms: float = 50.0, per_audio_s_ms: float = 100.0, jitter: float = 0.1) -> None:
+        self.base_s = base_ms / 1000
+        self.per_audio_s = per_audio_s_ms / 1000
+        self.jitter = jitter
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _sleep(self, audio_s: float, model_size: Optional[str] = None) -> None:
+        delay = (self.base_s + self.per_audio_s * audio_s) * TIER_COST.get(model_size or "base", 1.0)
+        time.sleep(delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _result(self, audio_s: float, language: Optional[str], model_size: Optional[str] = None) -> TranscriptionResult:
+        with self._lock:
+            n = next(self._ids)
+        return TranscriptionResult(
+            text=f"utterance {n} lasting {audio_s:.2f} seconds",
+            detected_language=language or "en",
+            language_probability=0.99,
+            avg_logprob=-0.2,
+            model=model_size,
+        )
+
+    def transcribe(
+        self,
+        audio: Audio,
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        word_timestamps: bool = False,
+        model_size: Optional[str] = None,
+    ) -> TranscriptionResult:
+        audio_s = _seconds(audio, sample_rate)
+        self._sleep(audio_s, model_size)
+        return self._result(audio_s, language, model_size)
+
+    def transcribe_batch(
+        self,
+        audio_list: list[Audio],
+        sample_rate: int = 16000,
+        languages: Optional[list[Optional[str]]] = None,
+        model_size: Optional[str] = None,
+    ) -> list[TranscriptionResult]:
+        # A padded batch costs roughly its longest row
+        durations = [_seconds(a, sample_rate) for a in audio_list]
+        self._sleep(max(durations, default=0.0), model_size)
+        languages = languages or [None] * len(audio_list)
+        return [self._result(d, lang, model_size) for d, lang in zip(durations, languages)]
+
+
+class StubTranslation:
+    """NLLB stand-in: delay = base + per_char * characters (+ jitter) per call."""
+
+    def __init__(self, base_ms: float = 20.0, per_char_ms: float = 0.5, jitter: float = 0.1) -> None:
+        self.base_s = base_ms / 1000
+        self.per_char_s = per_char_ms / 1000
+        self.jitter = jitter
+
+    def _sleep(self, chars: int) -> None:
+        delay = self.base_s + self.per_char_s * chars
+        time.sleep(delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def lookup(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        return None
+
+    def remember(self, text: str, source_lang: str, target_lang: str, translated: str) -> None:
+        pass
+
+    def translate(self, text: str, source_lang: str, target_lang: str, use_openai: bool = False) -> str:
+        self._sleep(len(text))
+        return f"[{target_lang}] {text}"
+
+    def translate_batch(self, texts: list[str], source_langs: list[str], target_lang: str) -> list[str]:
+        self._sleep(max((len(t) for t in texts), default=0))
+        return [f"[{target_lang}] {t}" for t in texts]
+
+    def translate_multi(
+        self, text: str, source_lang: str, target_langs: list[str], use_openai: bool = False
+    ) -> dict[str, str]:
+        self._sleep(len(text))
+        return {tgt: f"[{tgt}] {text}" for tgt in target_langs}
+
+
+def load_backend(spec: str, stub_cls: type, **stub_kwargs: Any) -> Optional[Any]:
+    """"stub" -> stub_cls(**stub_kwargs); "real" -> None (keep the real service); else "module:factory"."""
+    if spec == "stub":
+        return stub_cls(**stub_kwargs)
+    if spec == "real":
+        return None
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Backend must be 'stub', 'real' or 'module:factory', got {spec!r}")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+def install(stt: Optional[Any], translation: Optional[Any]) -> None:
+    """Replace the service singletons; skip model loading when both are replaced."""
+    from app.services.model_loader import ModelLoader
+    from app.services.stt_service import STTService
+    from app.services.translation_service import TranslationService
+
+    if stt is not None:
+        STTService._instance = stt
+        # Whisper tiers "load" instantly; the stub models their cost via model_size
+        ModelLoader._create_whisper = lambda self, size: stt
+    if translation is not None:
+        TranslationService._instance = translation
+    if stt is not None and translation is not None:
+        loader = ModelLoader.get_instance()
+
+        def skip_loading() -> None:
+            for model in ("whisper", "translation"):
+                loader._mark(model, "ready")
+            loader._ready.set()
+
+        loader.start_loading = skip_loading
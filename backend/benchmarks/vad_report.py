@@ -0,0 +1,112 @@
+"""
+Replay audio through the session VAD and report how much audio is skipped before STT.
+
+Each file is streamed in 250 ms chunks through the same segmentation the WebSocket
+handler uses (frame energy VAD, adaptive noise floor, hangover, padding, silence cut).
+Without arguments a synthetic corpus (speech-like bursts in background noise) is used.
+
+Usage (from backend/):
+    python -m benchmarks.vad_report [file.wav ...] [--chunk-ms 250]
+"""
+import argparse
+import wave
+
+import numpy as np
+
+from app.services.resampler import PolyphaseResampler
+from app.services.vad import MAX_BUFFER_DURATION_S, MIN_BUFFER_DURATION_S, SILENCE_DURATION_MS, new_segmenter
+
+SAMPLE_RATE = 16000
+
+
+def load_wav(path: str) -> np.ndarray:
+    """Read a PCM16 WAV as mono float32 at 16 kHz."""
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        rate, channels = f.getframerate(), f.getnchannels()
+        audio = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        audio = PolyphaseResampler(rate, SAMPLE_RATE).process(audio)
+    return audio
+
+
+def synthetic_corpus(seconds: float = 60.0, seed: int = 0) -> list[tuple[str, np.ndarray]]:
+    """Bursts of modulated tones (0.5-4 s) separated by 0.3-3 s of noise."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    total = 0
+    while total < seconds * SAMPLE_RATE:
+        gap = int(rng.uniform(0.3, 3.0) * SAMPLE_RATE)
+        parts.append(0.002 * rng.standard_normal(gap))
+        n = int(rng.uniform(0.5, 4.0) * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(2, 5) * t)
+        burst = 0.2 * envelope * np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+        parts.append(burst + 0.002 * rng.standard_normal(n))
+        total += gap + n
+    return [("synthetic", np.concatenate(parts).astype(np.float32))]
+
+
+def replay(audio: np.ndarray, chunk_ms: int) -> dict:
+    """
+    Mirror the handler's buffering: returns seconds sent to STT, utterance count and,
+    per utterance, the sample index where its speech ended.
+    """
+    segmenter = new_segmenter(SAMPLE_RATE)
+    chunk = SAMPLE_RATE * chunk_ms // 1000
+    buffered = 0  # samples in the session buffer
+    sent = 0
+    utterances = 0
+    speech_ends = []
+    for i in range(0, len(audio), chunk):
+        piece = audio[i:i + chunk]
+        segmenter.push(piece)
+        buffered += len(piece)
+        if not segmenter.has_speech:
+            drop = segmenter.preroll_start()
+            segmenter.advance(drop)
+            buffered -= drop
+        duration = buffered / SAMPLE_RATE
+        ended = segmenter.has_speech and segmenter.silence_ms >= SILENCE_DURATION_MS
+        if (ended and duration >= MIN_BUFFER_DURATION_S) or duration >= MAX_BUFFER_DURATION_S:
+            if segmenter.has_speech:
+                start, end = segmenter.span()
+                sent += end - start
+                utterances += 1
+                speech_ends.append(segmenter.speech_end)
+            else:
+                end = buffered
+            segmenter.advance(end)
+            buffered -= end
+    return {
+        "audio_s": len(audio) / SAMPLE_RATE,
+        "sent_s": sent / SAMPLE_RATE,
+        "utterances": utterances,
+        "speech_ends": speech_ends,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="16-bit PCM WAV files")
+    parser.add_argument("--chunk-ms", type=int, default=250)
+    args = parser.parse_args()
+
+    corpus = [(path, load_wav(path)) for path in args.files] or synthetic_corpus()
+    total_audio = total_sent = 0.0
+    print(f"{'file':<32}{'audio s':>10}{'to STT s':>10}{'skipped':>10}{'utterances':>12}")
+    for name, audio in corpus:
+        r = replay(audio, args.chunk_ms)
+        total_audio += r["audio_s"]
+        total_sent += r["sent_s"]
+        skipped = 1 - r["sent_s"] / r["audio_s"] if r["audio_s"] else 0.0
+        print(f"{name[-32:]:<32}{r['audio_s']:>10.1f}{r['sent_s']:>10.1f}{skipped:>10.1%}{r['utterances']:>12}")
+    if total_audio:
+        print(f"{'total':<32}{total_audio:>10.1f}{total_sent:>10.1f}{1 - total_sent / total_audio:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
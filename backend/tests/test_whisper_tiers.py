@@ -0,0 +1,50 @@
+import pytest
+
+from app.config import get_settings
+from app.services.whisper_tiers import TierPolicy
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    monkeypatch.setenv("WHISPER_TIERS", '["tiny", "base", "small"]')
+    monkeypatch.setenv("WHISPER_MODEL_SIZE", "small")
+    monkeypatch.setenv("WHISPER_TIER_HOLD_S", "0")
+    get_settings.cache_clear()
+    yield TierPolicy()
+    get_settings.cache_clear()
+
+
+def _run(policy: TierPolicy, tier: str, rtf: float) -> None:
+    policy.begin()
+    policy.end(tier, rtf * 4.0, 4.0)
+
+
+def test_steps_down_when_slow(policy):
+    assert policy.choose() == "small"
+    _run(policy, "small", 0.75)
+    assert policy.choose() == "base"
+
+
+def test_steps_back_up_after_slow_reading_expires(policy, monkeypatch):
+    _run(policy, "small", 0.75)
+    assert policy.choose() == "base"
+    for _ in range(5):
+        _run(policy, "base", 0.05)
+    # The slow small reading is newer than the hold time: stay on base
+    monkeypatch.setattr(policy._settings, "whisper_tier_hold_s", 60.0)
+    policy._changed_at -= 60.0
+    assert policy.choose() == "base"
+    # Once it is older than the hold time it no longer blocks the step up
+    policy._rtf_at["small"] -= 60.0
+    policy._changed_at -= 60.0
+    assert policy.choose() == "small"
+    assert "small" not in policy._rtf  # re-measured on the bigger tier
+
+
+def test_does_not_step_up_while_busy(policy):
+    _run(policy, "small", 0.75)
+    assert policy.choose() == "base"
+    _run(policy, "base", 0.05)
+    for _ in range(get_settings().whisper_tier_up_queue + 1):
+        policy.begin()
+    assert policy.choose() == "base"
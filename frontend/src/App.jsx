@@ -142,8 +142,8 @@ export default function App() {
   });
 
   const onChunk = useCallback(
-    (base64, sampleRate) => {
-      sendChunk(base64, targetLang, sampleRate);
+    (pcm16, sampleRate) => {
+      sendChunk(pcm16, targetLang, sampleRate);
     },
     [sendChunk, targetLang]
   );
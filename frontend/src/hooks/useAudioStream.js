@@ -1,17 +1,13 @@
 import { useCallback, useRef, useState } from 'react';
 
-const SAMPLE_RATE = 16000;
 const CHUNK_MS = 250;
-const CHUNK_SAMPLES = (SAMPLE_RATE * CHUNK_MS) / 1000;
 
 /**
- * Capture microphone and emit raw PCM chunks (16-bit mono) at fixed intervals.
+ * Capture microphone and emit raw PCM chunks (16-bit mono Int16Array) at fixed intervals.
  * Uses ScriptProcessorNode for chunked capture (deprecated but widely supported).
  * Fallback: MediaRecorder with webm, then we'd need to decode on backend or use different pipeline.
- * For Whisper we need raw PCM 16kHz mono. So we use AudioContext with resampling or
- * request 16kHz from getUserMedia if supported. Actually browsers typically give 44.1k/48k.
- * We'll send chunks at 16kHz equivalent size: record at context.sampleRate, then
- * in backend we pass sample_rate from frontend so Whisper can handle.
+ * Audio is captured at the device's native rate (typically 44.1k/48k) and sent with
+ * that sample_rate; the backend resamples to 16kHz for Whisper.
  */
 export function useAudioStream({ onChunk, onError }) {
   const [isRecording, setIsRecording] = useState(false);
@@ -28,9 +24,7 @@ export function useAudioStream({ onChunk, onError }) {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       streamRef.current = stream;
-      const context = new (window.AudioContext || window.webkitAudioContext)({
-        sampleRate: SAMPLE_RATE,
-      });
+      const context = new (window.AudioContext || window.webkitAudioContext)();
       contextRef.current = context;
       const source = context.createMediaStreamSource(stream);
       sourceRef.current = source;
@@ -54,15 +48,7 @@ export function useAudioStream({ onChunk, onError }) {
             const s = Math.max(-1, Math.min(1, chunk[i]));
             pcm16[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
           }
-          const blob = new Blob([pcm16.buffer]);
-          const reader = new FileReader();
-          reader.onloadend = () => {
-            const base64 = btoa(
-              new Uint8Array(reader.result).reduce((acc, b) => acc + String.fromCharCode(b), '')
-            );
-            onChunk?.(base64, context.sampleRate);
-          };
-          reader.readAsArrayBuffer(blob);
+          onChunk?.(pcm16, context.sampleRate);
         }
       };
       processor.connect(context.destination);
@@ -1,5 +1,8 @@
 import { useCallback, useEffect, useRef, useState } from 'react';
 
+// Binary audio frame header: seq (u32), sample_rate (u32), flags (u16), reserved (u16), little-endian
+const AUDIO_HEADER_BYTES = 12;
+
 const getWsUrl = () => {
   const base = import.meta.env.VITE_WS_URL || '';
   if (base) return base;
@@ -13,6 +16,8 @@ export function useTranslationSocket({ onCaption, onError, onReady }) {
   const [socketError, setSocketError] = useState(null);
   const wsRef = useRef(null);
   const reconnectTimeoutRef = useRef(null);
+  const seqRef = useRef(0);
+  const sentTargetLangRef = useRef(null);
 
   const connect = useCallback(() => {
     if (wsRef.current?.readyState === WebSocket.OPEN) return;
@@ -20,7 +25,10 @@ export function useTranslationSocket({ onCaption, onError, onReady }) {
     setSocketError(null);
     try {
       const ws = new WebSocket(url);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
+      seqRef.current = 0;
+      sentTargetLangRef.current = null;
       ws.onopen = () => {
         setConnected(true);
         setSocketError(null);
@@ -68,15 +76,22 @@ export function useTranslationSocket({ onCaption, onError, onReady }) {
     setConnected(false);
   }, []);
 
-  const sendChunk = useCallback((audioBase64, targetLang, sampleRate = 16000) => {
-    if (wsRef.current?.readyState !== WebSocket.OPEN) return;
-    wsRef.current.send(
-      JSON.stringify({
-        audio: audioBase64,
-        target_lang: targetLang,
-        sample_rate: sampleRate,
-      })
-    );
+  const sendChunk = useCallback((pcm16, targetLang, sampleRate = 16000) => {
+    const ws = wsRef.current;
+    if (ws?.readyState !== WebSocket.OPEN) return;
+    // Control messages stay JSON; only send when the target changes
+    if (sentTargetLangRef.current !== targetLang) {
+      ws.send(JSON.stringify({ target_lang: targetLang }));
+      sentTargetLangRef.current = targetLang;
+    }
+    const frame = new ArrayBuffer(AUDIO_HEADER_BYTES + pcm16.byteLength);
+    const header = new DataView(frame);
+    header.setUint32(0, seqRef.current++ >>> 0, true);
+    header.setUint32(4, sampleRate, true);
+    header.setUint16(8, 0, true);
+    header.setUint16(10, 0, true);
+    new Int16Array(frame, AUDIO_HEADER_BYTES).set(pcm16);
+    ws.send(frame);
   }, []);
 
   useEffect(() => {